@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for double_factorial.
+Compares the product-tree implementation against the former term-by-term
+loop for odd and even n up to 10^6.
+
+Usage: python benchmarks/bench_double_factorial.py [max_n]
+The loop takes minutes at n = 10^6; pass a smaller max_n for a quick run.
+"""
+
+import gc
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calculator.modules.factorials import double_factorial
+
+
+def legacy_double_factorial(n):
+    """The one-term-at-a-time loop used before the product tree"""
+    result = 1
+    while n > 1:
+        result *= n
+        n -= 2
+    return result
+
+
+def best_time(func, n, repeat):
+    """Best-of-repeat wall time of func(n) in seconds"""
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(n)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best
+
+
+def run(max_n=10 ** 6):
+    """Run the benchmark and print timings for each n"""
+    print("double_factorial benchmark")
+    print("=" * 26)
+    print(f"{'n':>9}  {'loop':>10}  {'product tree':>12}  speedup")
+    n = 1000
+    while n <= max_n:
+        for value in (n, n + 1):
+            repeat = 5 if value <= 10 ** 4 else 1
+            tree = best_time(double_factorial, value, repeat)
+            loop = best_time(legacy_double_factorial, value, repeat)
+            print(f"{value:>9}  {loop:>9.4f}s  {tree:>11.4f}s  {loop / tree:6.1f}x")
+        n *= 10
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6)
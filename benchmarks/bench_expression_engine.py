@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the expression engine.
+Compares the former replace/whitelist/eval path with the compiling evaluator.
+"""
+
+import math
+import os
+import sys
+import timeit
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calculator.core.expression_parser import ExpressionParser
+
+EXPRESSIONS = [
+    "2 + 3",
+    "2 + 3 * 4",
+    "(2 + 3) * 4 - 10 / 5",
+    "2 ^ 10 - 1",
+    "3.14159 * 2.5 ^ 2",
+    "((1 + 2) * (3 + 4) - (5 - 6)) / 7",
+    "1 + 2 + 3 + 4 + 5 + 6 + 7 + 8 + 9 + 10",
+    "pi * 2 / 360",
+]
+
+
+def legacy_evaluate(expression):
+    """The string-rewriting eval() path used before the compiling evaluator"""
+    expression = expression.replace("pi", str(math.pi))
+    expression = expression.replace("e", str(math.e))
+    expression = expression.replace("^", "**")
+    allowed_chars = set("0123456789+-*/().e ")
+    if not all(c in allowed_chars for c in expression):
+        raise ValueError("Invalid characters in expression")
+    return eval(expression)
+
+
+def run(number=2000):
+    """Run the benchmark and print per-expression timings in microseconds"""
+    parser = ExpressionParser()
+    compiled = [parser.compile(expression) for expression in EXPRESSIONS]
+
+    legacy_time = timeit.timeit(
+        lambda: [legacy_evaluate(expression) for expression in EXPRESSIONS], number=number)
+    compile_time = timeit.timeit(
+        lambda: [parser.parse_and_evaluate(expression) for expression in EXPRESSIONS], number=number)
+    reuse_time = timeit.timeit(
+        lambda: [c.evaluate() for c in compiled], number=number)
+
+    calls = number * len(EXPRESSIONS)
+    print("Expression engine benchmark")
+    print("=" * 27)
+    print(f"legacy eval path:        {legacy_time / calls * 1e6:8.2f} us/expr")
+    print(f"compile + evaluate:      {compile_time / calls * 1e6:8.2f} us/expr "
+          f"({legacy_time / compile_time:.1f}x)")
+    print(f"evaluate precompiled:    {reuse_time / calls * 1e6:8.2f} us/expr "
+          f"({legacy_time / reuse_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the unchecked function kernels.
+Compares each validated public function in modules/* against its kernel,
+square and cube against the former validation + power() versions, and a
+compiled expression with and without kernel specialization.
+
+Usage: python benchmarks/bench_kernels.py [calls]
+"""
+
+import gc
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calculator.core.expression_parser import ExpressionParser
+from src.calculator.core.function_registry import default_registry
+from src.calculator.modules import logarithms, powers, trigonometry
+
+
+def legacy_square(x):
+    """square() before the kernel split: validation, then power(x, 2)"""
+    if not isinstance(x, (int, float)):
+        raise TypeError("Input must be a number")
+    return powers.power(x, 2)
+
+
+def legacy_cube(x):
+    """cube() before the kernel split: validation, then power(x, 3)"""
+    if not isinstance(x, (int, float)):
+        raise TypeError("Input must be a number")
+    return powers.power(x, 3)
+
+
+def best_time(func, args, calls, repeat=5):
+    """Best-of-repeat time of one func(*args) call in nanoseconds"""
+    best = float("inf")
+    loop = range(calls)
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in loop:
+                func(*args)
+            best = min(best, time.perf_counter_ns() - start)
+    finally:
+        gc.enable()
+    return best / calls
+
+
+def row(name, checked, fast):
+    print(f"{name:<28}{checked:>10.1f}{fast:>10.1f}{checked / fast:>9.2f}x")
+
+
+def run(calls=200000):
+    """Run the benchmark and print per-call timings"""
+    print("kernel benchmark (ns per call)")
+    print("=" * 30)
+    print(f"{'function':<28}{'checked':>10}{'kernel':>10}{'speedup':>10}")
+    for module in (trigonometry, logarithms, powers):
+        for func, kernel in module.KERNELS.items():
+            args = (0.5, 2) if func in (powers.power, logarithms.log) else (0.5,)
+            row(f"{module.__name__.rsplit('.', 1)[1]}.{func.__name__}",
+                best_time(func, args, calls), best_time(kernel, args, calls))
+    print()
+    for name, legacy, func in (("square", legacy_square, powers.square),
+                               ("cube", legacy_cube, powers.cube)):
+        for value in (7, 1.5):
+            row(f"{name}({value}) power -> multiply",
+                best_time(legacy, (value,), calls), best_time(func, (value,), calls))
+    print()
+    expression = "sqrt(square(x) + square(y)) + ln(2 + cos(sqrt(x)))"
+    bound = default_registry.bound(degrees=False)
+    # A plain dict has no kernels, so every call stays validated
+    checked = ExpressionParser({name: bound[name] for name in ("sqrt", "square", "ln", "cos")})
+    checked = checked.compile(expression, ["x", "y"])
+    specialized = ExpressionParser(bound).compile(expression, ["x", "y"])
+    variables = {"x": 3, "y": 4}
+    row("compiled expression", best_time(checked.evaluate, (variables,), calls // 4),
+        best_time(specialized.evaluate, (variables,), calls // 4))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the calculator engine.
+Times process_input, ExpressionParser.parse_and_evaluate, the functions in
+modules/*, format_output and HistoryManager.add_entry on fixed input corpora.
+
+Each benchmark is calibrated to run for at least --min-time seconds per
+sample, warmed up, then sampled --repeat times with garbage collection
+disabled. Results are per operation (one expression, call or entry).
+
+Usage:
+    python benchmarks/bench_suite.py                       # print a table
+    python benchmarks/bench_suite.py --json baseline.json  # also save results
+    python benchmarks/bench_suite.py --compare baseline.json [--threshold 0.1]
+    python benchmarks/bench_suite.py --filter modules. --quick
+
+With --compare, a benchmark whose median is more than --threshold slower
+than the baseline is flagged as a regression and the exit status is 1.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.expression_parser import ExpressionParser
+from src.calculator.core.history_manager import HistoryManager
+from src.calculator.modules import factorials, fractions, logarithms, powers, trigonometry
+
+# Fixed input corpora; keep them unchanged so results stay comparable
+CORPORA = {
+    "arithmetic": [
+        "2 + 3",
+        "2 + 3 * 4",
+        "(2 + 3) * 4 - 10 / 5",
+        "2 ^ 10 - 1",
+        "3.14159 * 2.5 ^ 2",
+        "((1 + 2) * (3 + 4) - (5 - 6)) / 7",
+        "-(4 - 6) * -3",
+        "1 + 2 + 3 + 4 + 5 + 6 + 7 + 8 + 9 + 10",
+    ],
+    "functions": [
+        "sin(30) + cos(60)",
+        "sqrt(square(3) + square(4))",
+        "log(100, 10) + ln(e)",
+        "factorial(10) / factorial(8)",
+        "exp(1.5) * tan(45)",
+        "cbrt(27) + log2(1024)",
+        "binomial(20, 10) - permutations(10, 3)",
+        "reciprocal(8) + power(2, 0.5)",
+    ],
+    "variables": [
+        "x * 2 + y",
+        "sqrt(x^2 + y^2)",
+        "(x + y) * (x - y)",
+        "sin(x) * cos(y) + x / y",
+    ],
+    "long": [
+        " + ".join(f"{i} * {i + 1}" for i in range(1, 101)),
+        "*".join(["(1 + 1/2)"] * 30),
+    ],
+}
+
+# Results passed to format_output
+FORMAT_CORPUS = [0, 42, -7, 3.5, 1e-12, 0.1 + 0.2, 2 ** 64, 1e300, 123456.789,
+                 "Error: division by zero"]
+
+# (name, function, arguments) for each function in modules/*
+MODULE_CALLS = [
+    ("trigonometry.sin", trigonometry.sin, (30, True)),
+    ("trigonometry.cos", trigonometry.cos, (0.5,)),
+    ("trigonometry.tan", trigonometry.tan, (45, True)),
+    ("trigonometry.asin", trigonometry.asin, (0.5,)),
+    ("trigonometry.acos", trigonometry.acos, (0.5,)),
+    ("trigonometry.atan", trigonometry.atan, (1,)),
+    ("trigonometry.sinh", trigonometry.sinh, (1.5,)),
+    ("trigonometry.cosh", trigonometry.cosh, (1.5,)),
+    ("trigonometry.tanh", trigonometry.tanh, (1.5,)),
+    ("logarithms.ln", logarithms.ln, (10,)),
+    ("logarithms.log10", logarithms.log10, (1000,)),
+    ("logarithms.log2", logarithms.log2, (1024,)),
+    ("logarithms.log", logarithms.log, (81, 3)),
+    ("powers.power", powers.power, (2, 10)),
+    ("powers.sqrt", powers.sqrt, (2,)),
+    ("powers.cbrt", powers.cbrt, (27,)),
+    ("powers.nth_root", powers.nth_root, (32, 5)),
+    ("powers.exp", powers.exp, (2,)),
+    ("powers.square", powers.square, (1.5,)),
+    ("powers.cube", powers.cube, (1.5,)),
+    ("powers.reciprocal", powers.reciprocal, (8,)),
+    ("factorials.factorial", factorials.factorial, (20,)),
+    ("factorials.factorial_large", factorials.factorial, (2000,)),
+    ("factorials.double_factorial", factorials.double_factorial, (21,)),
+    ("factorials.gamma", factorials.gamma, (4.5,)),
+    ("factorials.log_factorial", factorials.log_factorial, (1000,)),
+    ("factorials.binomial", factorials.binomial, (50, 25)),
+    ("factorials.permutations", factorials.permutations, (20, 5)),
+    ("fractions.simplify_fraction", fractions.simplify_fraction, (84, 126)),
+    ("fractions.add_fractions", fractions.add_fractions, (1, 3, 1, 6)),
+    ("fractions.subtract_fractions", fractions.subtract_fractions, (3, 4, 1, 6)),
+    ("fractions.multiply_fractions", fractions.multiply_fractions, (2, 3, 9, 4)),
+    ("fractions.divide_fractions", fractions.divide_fractions, (2, 3, 4, 9)),
+    ("fractions.decimal_to_fraction", fractions.decimal_to_fraction, (0.375,)),
+]
+
+# Entries already in the history when add_entry is timed
+HISTORY_SIZES = (0, 1000, 10000)
+
+
+class Benchmark(NamedTuple):
+    """A named zero-argument workload of ``ops`` operations"""
+    name: str
+    run: Callable[[], object]
+    ops: int = 1
+    cleanup: Optional[Callable[[], None]] = None
+
+
+def _process_input_benchmarks() -> List[Benchmark]:
+    benchmarks = []
+    for corpus, expressions in CORPORA.items():
+        warm = CalculatorController()
+        cold = CalculatorController(cache_size=0)
+        for controller in (warm, cold):
+            controller.set_variable("x", 3.5)
+            controller.set_variable("y", 1.25)
+        benchmarks.append(Benchmark(
+            f"process_input.cached.{corpus}",
+            lambda c=warm, e=expressions: [c.process_input(x) for x in e], len(expressions)))
+        benchmarks.append(Benchmark(
+            f"process_input.uncached.{corpus}",
+            lambda c=cold, e=expressions: [c.process_input(x) for x in e], len(expressions)))
+    return benchmarks
+
+
+def _parser_benchmarks() -> List[Benchmark]:
+    parser = CalculatorController().parser
+    bare = ExpressionParser()
+    return [
+        Benchmark("parse_and_evaluate.arithmetic",
+                  lambda e=CORPORA["arithmetic"]: [bare.parse_and_evaluate(x) for x in e],
+                  len(CORPORA["arithmetic"])),
+        Benchmark("parse_and_evaluate.functions",
+                  lambda e=CORPORA["functions"]: [parser.parse_and_evaluate(x) for x in e],
+                  len(CORPORA["functions"])),
+        Benchmark("parse_and_evaluate.long",
+                  lambda e=CORPORA["long"]: [bare.parse_and_evaluate(x) for x in e],
+                  len(CORPORA["long"])),
+    ]
+
+
+def _module_benchmarks() -> List[Benchmark]:
+    return [Benchmark(f"modules.{name}", lambda f=func, a=args: f(*a))
+            for name, func, args in MODULE_CALLS]
+
+
+def _format_benchmarks() -> List[Benchmark]:
+    controller = CalculatorController()
+    return [Benchmark("format_output",
+                      lambda: [controller.format_output(r) for r in FORMAT_CORPUS],
+                      len(FORMAT_CORPUS))]
+
+
+def _history_benchmarks() -> List[Benchmark]:
+    benchmarks = []
+    for size in HISTORY_SIZES:
+        directory = tempfile.mkdtemp(prefix="calc-bench-")
+        history = HistoryManager(os.path.join(directory, "history.jsonl"))
+        for i in range(size):
+            history.add_entry(f"{i} + 1", str(i + 1))
+
+        def cleanup(history=history, directory=directory):
+            history.close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        benchmarks.append(Benchmark(f"history.add_entry.{size}",
+                                    lambda h=history: h.add_entry("sqrt(16) + 1", "5"),
+                                    cleanup=cleanup))
+    return benchmarks
+
+
+def all_benchmarks() -> List[Benchmark]:
+    """Build every benchmark in the suite"""
+    return (_process_input_benchmarks() + _parser_benchmarks() + _module_benchmarks()
+            + _format_benchmarks() + _history_benchmarks())
+
+
+def _time(run: Callable[[], object], number: int) -> float:
+    """Seconds taken by number runs, without garbage collection"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure(benchmark: Benchmark, repeat: int = 7, min_time: float = 0.05,
+            warmup: int = 2) -> Dict[str, float]:
+    """
+    Time a benchmark.
+
+    Args:
+        benchmark (Benchmark): Workload to time
+        repeat (int): Number of samples
+        min_time (float): Least duration of one sample, in seconds
+        warmup (int): Samples run and discarded before measuring
+
+    Returns:
+        Dict[str, float]: Per-operation statistics in nanoseconds
+    """
+    # Calibrate the runs per sample; this also warms caches
+    number = 1
+    while True:
+        elapsed = _time(benchmark.run, number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    for _ in range(warmup):
+        _time(benchmark.run, number)
+    scale = 1e9 / (number * benchmark.ops)
+    samples = [_time(benchmark.run, number) * scale for _ in range(repeat)]
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    return {
+        "median_ns": statistics.median(samples),
+        "mean_ns": mean,
+        "stdev_ns": stdev,
+        "rsd": stdev / mean if mean else 0.0,
+        "min_ns": min(samples),
+        "max_ns": max(samples),
+        "runs_per_sample": number,
+        "samples": repeat,
+    }
+
+
+def run_suite(name_filter: str = "", repeat: int = 7, min_time: float = 0.05,
+              warmup: int = 2, output=sys.stdout) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmarks whose name contains name_filter.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Statistics of each benchmark by name
+    """
+    results = {}
+    benchmarks = all_benchmarks()
+    try:
+        print(f"{'benchmark':<42}{'median':>12}{'mean':>12}{'rsd':>8}", file=output)
+        for benchmark in benchmarks:
+            if name_filter not in benchmark.name:
+                continue
+            stats = results[benchmark.name] = measure(benchmark, repeat, min_time, warmup)
+            print(f"{benchmark.name:<42}{_format_ns(stats['median_ns']):>12}"
+                  f"{_format_ns(stats['mean_ns']):>12}{stats['rsd']:>7.1%}", file=output)
+    finally:
+        for benchmark in benchmarks:
+            if benchmark.cleanup is not None:
+                benchmark.cleanup()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = 0.10, output=sys.stdout) -> List[str]:
+    """
+    Compare medians against a baseline run.
+
+    Args:
+        results: Statistics of this run by benchmark name
+        baseline: Statistics of the baseline run by benchmark name
+        threshold (float): Relative slowdown counted as a regression
+        output: Stream for the comparison table
+
+    Returns:
+        List[str]: Names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':<42}{'baseline':>12}{'current':>12}{'change':>9}", file=output)
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ns"], stats["median_ns"]
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  improved"
+        print(f"{name:<42}{_format_ns(before):>12}{_format_ns(after):>12}{change:>+9.1%}{flag}",
+              file=output)
+    return regressions
+
+
+def _format_ns(nanoseconds: float) -> str:
+    if nanoseconds >= 1e6:
+        return f"{nanoseconds / 1e6:.2f} ms"
+    if nanoseconds >= 1e3:
+        return f"{nanoseconds / 1e3:.2f} us"
+    return f"{nanoseconds:.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Benchmark the calculator engine.")
+    parser.add_argument("--filter", default="", help="run only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7, help="samples per benchmark (default: 7)")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="least seconds per sample (default: 0.05)")
+    parser.add_argument("--warmup", type=int, default=2,
+                        help="discarded samples before measuring (default: 2)")
+    parser.add_argument("--quick", action="store_true", help="3 samples of at least 10 ms each")
+    parser.add_argument("--json", metavar="PATH", help="write the results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown counted as a regression (default: 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.01
+
+    results = run_suite(args.filter, args.repeat, args.min_time, args.warmup)
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "settings": {"repeat": args.repeat, "min_time": args.min_time, "warmup": args.warmup},
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
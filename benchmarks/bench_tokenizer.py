@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the expression tokenizer.
+Measures throughput in MB/s of expression text on long generated expressions,
+against the former pre-processing and character-concatenating tokenizer.
+"""
+
+import gc
+import math
+import os
+import random
+import re
+import sys
+import timeit
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calculator.core.expression_parser import ExpressionParser
+
+
+def legacy_tokenize(expression):
+    """The replace/re.sub pre-processing and tokenizer used before the regex tokenizer"""
+    expression = expression.replace('pi', str(math.pi))
+    expression = expression.replace('e', str(math.e))
+    expression = re.sub(r'(\d)([a-z])', r'\1*\2', expression)
+    expression = re.sub(r'([a-z])(\d)', r'\1*\2', expression)
+    expression = expression.replace(' ', '')
+    tokens = []
+    i = 0
+    while i < len(expression):
+        if expression[i].isdigit() or expression[i] == '.':
+            num = ''
+            while i < len(expression) and (expression[i].isdigit() or expression[i] == '.'):
+                num += expression[i]
+                i += 1
+            tokens.append(float(num))
+        elif expression[i] in '+-*/^()':
+            if expression[i] == '*' and i + 1 < len(expression) and expression[i+1] == '*':
+                tokens.append('**')
+                i += 2
+            else:
+                tokens.append(expression[i])
+                i += 1
+        elif expression[i].isalpha():
+            func = ''
+            while i < len(expression) and expression[i].isalpha():
+                func += expression[i]
+                i += 1
+            tokens.append(func)
+        else:
+            i += 1
+    return tokens
+
+
+def generate_formula(size, seed=1976):
+    """Generate a random formula of short tokens, roughly size characters long"""
+    rng = random.Random(seed)
+    terms = []
+    length = 0
+    while length < size:
+        term = rng.choice([
+            str(rng.randint(1, 99999)),
+            f"{rng.uniform(0, 1000):.6f}",
+            f"sqrt({rng.randint(1, 999)})",
+            f"({rng.randint(1, 99)} * pi)",
+            f"{rng.randint(1, 9)} ^ 2",
+        ])
+        terms.append(term)
+        length += len(term) + 3
+    return " + ".join(terms)
+
+
+def generate_numbers(size, digits=40, seed=1976):
+    """Generate a sum of long literals, roughly size characters long"""
+    rng = random.Random(seed)
+    count = max(1, size // (digits + 1))
+    return "+".join(str(rng.randrange(10 ** (digits - 1), 10 ** digits)) for _ in range(count))
+
+
+def throughput(func, text, number=5, repeat=5):
+    """Best-of-repeat throughput of func in MB/s of text"""
+    megabytes = len(text.encode("utf-8")) / 1e6
+    gc.disable()
+    try:
+        seconds = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    finally:
+        gc.enable()
+    return megabytes / seconds
+
+
+def run(size=50_000):
+    """Run the benchmark and print throughput for each corpus"""
+    parser = ExpressionParser(functions={"sqrt": math.sqrt})
+    print("Tokenizer benchmark")
+    print("=" * 19)
+    for label, expression in [("formula", generate_formula(size)),
+                              ("long literals", generate_numbers(size))]:
+        print(f"{label} ({len(expression) // 1000} KB):")
+        legacy = throughput(lambda: legacy_tokenize(expression), expression)
+        tokens = throughput(lambda: parser._tokenize(expression), expression)
+        parsed = throughput(lambda: parser.parse(expression), expression)
+        print(f"  legacy tokenizer    {legacy:8.2f} MB/s")
+        print(f"  regex tokenizer     {tokens:8.2f} MB/s ({tokens / legacy:.1f}x)")
+        print(f"  tokenize + parse    {parsed:8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    run()
@@ -33,9 +33,14 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "vectorized": ["numpy>=1.20"],
+    },
     entry_points={
         "console_scripts": [
             "scientific-calculator=calculator.main:main",
+            "scientific-calculator-batch=calculator.cli:main",
+            "scientific-calculator-server=calculator.server:main",
         ],
     },
     include_package_data=True,
@@ -0,0 +1,165 @@
+"""
+Scientific Calculator Batch CLI
+Headless entry point that evaluates expressions line by line.
+
+Each input line is one expression; each output line is its formatted result
+(or an error message), so output lines correspond one-to-one with input lines.
+Unordered output prefixes each result with its input line number and a tab.
+
+With one worker, ``name = expression`` lines bind variables for the lines
+that follow and ``ans`` holds the previous result. Several workers each see
+only some of the lines, so there every line is evaluated on its own:
+assignments are rejected and neither variables nor ``ans`` carry over, which
+keeps the output independent of the worker count and chunk size.
+"""
+
+import argparse
+import sys
+import os
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.calculator import CalculatorController
+from core.parallel_evaluator import ParallelEvaluator
+
+
+def evaluate_lines(controller: CalculatorController, lines: Iterable[str]) -> List[str]:
+    """
+    Evaluate expressions and format their results.
+
+    Args:
+        controller (CalculatorController): Controller used for evaluation
+        lines (Iterable[str]): Expressions, one per line
+
+    Returns:
+        List[str]: Formatted result for each line (blank lines stay blank)
+    """
+    return [_evaluate_line(controller, line) for line in lines]
+
+
+def evaluate_independent_lines(controller: CalculatorController, lines: Iterable[str]) -> List[str]:
+    """
+    Evaluate expressions that may not depend on each other.
+
+    Every line starts without variables or ``ans``, and assignments are
+    rejected, so the results do not depend on which lines a worker saw before.
+
+    Args:
+        controller (CalculatorController): Controller used for evaluation
+        lines (Iterable[str]): Expressions, one per line
+
+    Returns:
+        List[str]: Formatted result for each line (blank lines stay blank)
+    """
+    results = []
+    for line in lines:
+        controller.environment.clear()
+        if controller.parse_assignment(line.strip()) is not None:
+            results.append("Error: Assignments need a single worker")
+        else:
+            results.append(_evaluate_line(controller, line))
+    return results
+
+
+def _evaluate_line(controller: CalculatorController, line: str) -> str:
+    """Evaluate one line and format its result"""
+    expression = line.strip()
+    if not expression:
+        return ""
+    try:
+        return controller.format_output(controller.process_input(expression))
+    except Exception as e:
+        # One unprintable result must not end the whole stream
+        return f"Error: {str(e)}"
+
+
+def _line_function(workers: int):
+    """Pick the chunk function for a worker count"""
+    return evaluate_lines if workers == 1 else evaluate_independent_lines
+
+
+def stream_results(lines: Iterable[str], workers: int = 1, chunk_size: int = 256,
+                   ordered: bool = True, evaluator: Optional[ParallelEvaluator] = None) -> Iterator[str]:
+    """
+    Lazily evaluate lines and yield formatted results.
+
+    At most a bounded number of chunks are held in memory at any time.
+
+    Args:
+        lines (Iterable[str]): Expressions, one per line
+        workers (int): Number of worker processes (1 evaluates in-process,
+            with variables carried from line to line)
+        chunk_size (int): Lines sent to a worker at a time
+        ordered (bool): If True, results follow input order; otherwise they
+            are yielded as chunks complete, as "line number<TAB>result"
+        evaluator (Optional[ParallelEvaluator]): Evaluator to use instead of
+            one built from workers and chunk_size (it is left running)
+
+    Yields:
+        str: Formatted result for each line
+    """
+    if evaluator is None:
+        with ParallelEvaluator(workers, chunk_size, function=_line_function(workers)) as evaluator:
+            yield from stream_results(lines, ordered=ordered, evaluator=evaluator)
+        return
+    if ordered:
+        yield from evaluator.imap(lines)
+    else:
+        for index, result in evaluator.imap_unordered(lines):
+            yield f"{index + 1}\t{result}"
+
+
+def run_batch(source: TextIO, output: TextIO, workers: int = 1, chunk_size: int = 256,
+              ordered: bool = True, stats: Optional[TextIO] = None):
+    """
+    Evaluate every line of source and write results to output.
+
+    Args:
+        source (TextIO): Input stream of expressions
+        output (TextIO): Stream the results are written to
+        workers (int): Number of worker processes
+        chunk_size (int): Lines sent to a worker at a time
+        ordered (bool): Preserve input order in the output
+        stats (Optional[TextIO]): Stream that receives per-worker throughput
+    """
+    with ParallelEvaluator(workers, chunk_size, function=_line_function(workers)) as evaluator:
+        for result in stream_results(source, ordered=ordered, evaluator=evaluator):
+            output.write(result + "\n")
+        output.flush()
+        if stats is not None:
+            stats.write(evaluator.report() + "\n")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for headless batch evaluation"""
+    parser = argparse.ArgumentParser(
+        description="Evaluate calculator expressions line by line without the GUI.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file with one expression per line (default: stdin)")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of worker processes (default: 1); with more than "
+                             "one, every line is evaluated on its own and assignments are rejected")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="lines per work unit sent to a worker (default: 256)")
+    parser.add_argument("--unordered", action="store_true",
+                        help="emit results as soon as they are ready instead of in input order, "
+                             "each prefixed with its input line number and a tab")
+    parser.add_argument("--stats", action="store_true",
+                        help="report per-worker throughput on stderr when done")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error("--workers and --chunk-size must be at least 1")
+
+    stats = sys.stderr if args.stats else None
+    if args.input == "-":
+        run_batch(sys.stdin, sys.stdout, args.workers, args.chunk_size, not args.unordered, stats)
+    else:
+        with open(args.input, "r") as source:
+            run_batch(source, sys.stdout, args.workers, args.chunk_size, not args.unordered, stats)
+
+
+if __name__ == "__main__":
+    main()
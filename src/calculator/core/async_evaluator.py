@@ -0,0 +1,346 @@
+"""
+Async Evaluator
+asyncio front-end for the calculator engine.
+
+Cheap expressions are evaluated inline on the event loop, where the cached
+compiled form runs in microseconds. Expensive ones (large factorials, powers
+with variable or large exponents, very long expressions) are compiled and
+evaluated in a worker process, so a request such as ``factorial(100000)``
+never blocks the loop. Offloaded evaluations are limited by a concurrency
+cap and an optional per-request timeout.
+
+Whether an expression is cheap is decided once from its parse tree, before
+constant folding, since folding itself would run the expensive call.
+Workers only know the default function registry, so expressions calling
+functions registered on the controller are always evaluated inline.
+
+A worker cannot be stopped without stopping its pool: when a request times
+out, the pool is terminated and every other offloaded request running in it
+fails with an "interrupted" error. Callers that mix long and short work
+should give the long requests their own evaluator.
+"""
+
+import asyncio
+import os
+import sys
+from collections import deque
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculator import DEG, CalculatorController
+from core.cost_guard import CostLimits
+from core.expression_cache import ExpressionCache
+from core.expression_parser import BinaryOp, Call, Constant, Node
+from core.function_registry import default_registry
+from core.parallel_evaluator import worker_controller
+
+Expressions = Union[Iterable[str], AsyncIterable[str]]
+
+
+def _evaluate_remote(expression: str, variables: Dict[str, object], limits: CostLimits,
+                     precision: Optional[int] = None, rationals: bool = False,
+                     angle_mode: str = DEG):
+    """Evaluate an expression in a worker process against a snapshot of variables"""
+    controller = worker_controller()
+    if controller.limits != limits:
+        controller.limits = limits
+    controller.precision = precision
+    controller.rationals = rationals
+    controller.angle_mode = angle_mode
+    environment = controller.environment
+    environment.clear()
+    for name, value in variables.items():
+        environment.set(name, value)
+    return controller.process_input(expression)
+
+
+def is_cheap(tree: Node, max_nodes: int = 256, heavy_functions: Iterable[str] = (),
+             max_exponent: int = 64) -> bool:
+    """
+    Decide whether an expression tree is cheap enough to evaluate inline.
+
+    Args:
+        tree (Node): Parsed, unoptimized expression tree
+        max_nodes (int): Largest tree evaluated inline
+        heavy_functions (Iterable[str]): Functions whose cost grows with
+            their argument, e.g. "factorial"
+        max_exponent (int): Largest constant exponent evaluated inline
+
+    Returns:
+        bool: True if the tree can be evaluated without blocking noticeably
+    """
+    heavy_functions = frozenset(heavy_functions)
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if count > max_nodes:
+            return False
+        if isinstance(node, Call) and node.name in heavy_functions:
+            return False
+        if isinstance(node, BinaryOp) and node.symbol in ('^', '**'):
+            exponent = node.right
+            if not isinstance(exponent, Constant) or abs(exponent.value) > max_exponent:
+                return False
+        stack.extend(node.children)
+    return True
+
+
+def local_functions(tree: Node, functions) -> frozenset:
+    """
+    Find the functions a tree calls that a worker process would not know.
+
+    Args:
+        tree (Node): Parsed expression tree
+        functions (FunctionRegistry): Registry of the calling controller
+
+    Returns:
+        frozenset: Names registered or replaced on the controller rather
+        than taken from the default registry
+    """
+    names = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Call) and functions.get(node.name) is not default_registry.get(node.name):
+            names.add(node.name)
+        stack.extend(node.children)
+    return frozenset(names)
+
+
+class AsyncEvaluator:
+    """Evaluates expressions for a controller without blocking the event loop"""
+
+    def __init__(self, controller: CalculatorController, executor: Optional[Executor] = None,
+                 max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 max_inline_nodes: int = 256,
+                 heavy_functions: Iterable[str] = ("factorial", "double_factorial",
+                                                   "binomial", "permutations")):
+        """
+        Args:
+            controller (CalculatorController): Controller whose variables,
+                history and cache are used
+            executor (Optional[Executor]): Process-based executor for expensive
+                evaluations (default: a process pool created on first use)
+            max_concurrency (Optional[int]): Offloaded evaluations running at
+                once (default: one per CPU)
+            timeout (Optional[float]): Default per-request timeout in seconds;
+                a timeout also interrupts the other offloaded evaluations
+            max_inline_nodes (int): Largest expression tree evaluated inline
+            heavy_functions (Iterable[str]): Functions always offloaded
+        """
+        self.controller = controller
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_inline_nodes = max_inline_nodes
+        self.heavy_functions = frozenset(heavy_functions)
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Inline/offload decision for each normalized expression
+        self._decisions = ExpressionCache(controller.expression_cache.maxsize)
+        self._functions_version = controller.functions.version
+        self.inline_count = 0
+        self.offloaded_count = 0
+        self.timeout_count = 0
+
+    async def evaluate(self, expression: str, timeout: Optional[float] = None):
+        """
+        Evaluate an expression, offloading it if it is expensive.
+
+        Args:
+            expression (str): Expression or assignment to evaluate
+            timeout (Optional[float]): Seconds to wait for an offloaded
+                evaluation (default: the evaluator's timeout)
+
+        Returns:
+            Union[float, str]: Result of the calculation or error message
+        """
+        controller = self.controller
+        key = controller._normalize(expression)
+        if self.is_inline(key):
+            self.inline_count += 1
+            return controller.process_input(key)
+        timeout = self.timeout if timeout is None else timeout
+        assignment = controller.parse_assignment(key)
+        if assignment is None:
+            result = await self._offload(key, timeout)
+        else:
+            # A constant binding: compute the value remotely, bind it here
+            name, source = assignment
+            result = await self._offload(source, timeout)
+            if not isinstance(result, str):
+                try:
+                    controller.environment.set(name, result)
+                except ValueError as e:
+                    return f"Error: {str(e)}"
+        if not isinstance(result, str):
+            controller.record_result(key, result)
+        return result
+
+    async def stream(self, expressions: Expressions,
+                     timeout: Optional[float] = None) -> AsyncIterator:
+        """
+        Evaluate a stream of expressions concurrently, yielding results in input order.
+
+        Args:
+            expressions (Expressions): Iterable or async iterable of expressions
+            timeout (Optional[float]): Per-expression timeout
+
+        Yields:
+            Union[float, str]: Result or error message of each expression
+        """
+        window = self.max_concurrency * 2
+        pending = deque()
+        async for expression in self._iterate(expressions):
+            pending.append(asyncio.ensure_future(self.evaluate(expression, timeout)))
+            if len(pending) >= window:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+
+    async def stream_unordered(self, expressions: Expressions,
+                               timeout: Optional[float] = None) -> AsyncIterator[Tuple[int, object]]:
+        """
+        Evaluate a stream of expressions concurrently, yielding results as they finish.
+
+        Args:
+            expressions (Expressions): Iterable or async iterable of expressions
+            timeout (Optional[float]): Per-expression timeout
+
+        Yields:
+            Tuple[int, object]: Input index and result of each expression
+        """
+        window = self.max_concurrency * 2
+        pending = {}
+        index = 0
+        async for expression in self._iterate(expressions):
+            pending[asyncio.ensure_future(self.evaluate(expression, timeout))] = index
+            index += 1
+            if len(pending) >= window:
+                for item in await self._finished(pending):
+                    yield item
+        while pending:
+            for item in await self._finished(pending):
+                yield item
+
+    def is_inline(self, expression: str) -> bool:
+        """
+        Check whether a normalized expression is evaluated on the event loop.
+
+        Args:
+            expression (str): Normalized expression
+
+        Returns:
+            bool: True for cheap expressions, ones that call functions
+            registered on the controller and ones that fail to parse
+        """
+        functions = self.controller.functions
+        if self._functions_version != functions.version:
+            # A function was (re)registered since the decisions were made
+            self._decisions.clear()
+            self._functions_version = functions.version
+        decision = self._decisions.get(expression)
+        if decision is not None:
+            return decision
+        parser = self.controller.parser
+        assignment = self.controller.parse_assignment(expression)
+        if assignment is not None:
+            source = assignment[1]
+            if parser.free_variables(source):
+                # A formula binding is kept live by this controller, so it stays here
+                self._decisions.put(expression, True)
+                return True
+            variables = ()
+        else:
+            source = expression
+            variables = self.controller.environment.names()
+        try:
+            tree = parser.parse(source, variables)
+        except ValueError:
+            # Reported inline; not cached since binding a name can fix it
+            return True
+        decision = (is_cheap(tree, self.max_inline_nodes, self.heavy_functions)
+                    or bool(local_functions(tree, functions)))
+        self._decisions.put(expression, decision)
+        return decision
+
+    def close(self):
+        """Shut down the executor if this evaluator created it"""
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _offload(self, expression: str, timeout: Optional[float]):
+        """Evaluate an expression in the executor with a snapshot of the variables it reads"""
+        environment = self.controller.environment
+        variables = {name: environment[name]
+                     for name in self.controller.parser.free_variables(expression)
+                     if name in environment}
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            self.offloaded_count += 1
+            future = loop.run_in_executor(self._get_executor(), _evaluate_remote,
+                                          expression, variables, self.controller.limits,
+                                          self.controller.precision, self.controller.rationals,
+                                          self.controller.angle_mode)
+            try:
+                result = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                self.timeout_count += 1
+                self._terminate_executor()
+                return f"Error: Evaluation timed out after {timeout:g} s"
+            except BrokenExecutor:
+                # Another request timed out and its worker pool was terminated
+                return "Error: Evaluation was interrupted by another request's timeout"
+        return result
+
+    def _terminate_executor(self):
+        """
+        Stop a runaway evaluation by terminating the pool this evaluator created.
+
+        A running task cannot be cancelled, so without this the worker would
+        keep computing a result nobody waits for. Other evaluations in the
+        same pool are interrupted; the next one starts a fresh pool.
+
+        Reaching the worker processes relies on ProcessPoolExecutor's private
+        ``_processes``; where that is missing the pool is only shut down and
+        the runaway worker exits once its task finishes.
+        """
+        if self._executor is None or not self._owns_executor:
+            return
+        executor = self._executor
+        self._executor = None
+        # ProcessPoolExecutor has no public way to stop a running task
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        for process in processes:
+            process.terminate()
+        # The pool notices its workers died and fails their pending futures
+        executor.shutdown(wait=False)
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency,
+                                                 initializer=worker_controller)
+        return self._executor
+
+    async def _iterate(self, expressions: Expressions) -> AsyncIterator[str]:
+        """Iterate over a plain or async iterable"""
+        if hasattr(expressions, "__aiter__"):
+            async for expression in expressions:
+                yield expression
+        else:
+            for expression in expressions:
+                yield expression
+
+    async def _finished(self, pending: dict) -> list:
+        """Wait for at least one task and collect (index, result) of finished ones"""
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        return [(pending.pop(task), task.result()) for task in done]
@@ -0,0 +1,102 @@
+"""
+Calculation History
+Bounded in-memory record of evaluated expressions.
+
+Entries are kept in two parallel ring buffers (expression, result) instead
+of one formatted string per calculation. Expression strings are shared with
+the compiled expression that produced them, so repeated calculations only
+store references. Text is formatted lazily when the history is read.
+"""
+
+import os
+import sys
+from typing import Any, Iterable, List, Tuple
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.fractions import scientific
+
+
+def format_integer(value: int) -> str:
+    """Format an integer, in scientific form beyond the interpreter's str() digit limit"""
+    try:
+        return str(value)
+    except ValueError:
+        return scientific(value)
+
+
+def _text(value: Any) -> str:
+    """Format a result, falling back to scientific form for huge integers"""
+    if isinstance(value, int):
+        return format_integer(value)
+    return str(value)
+
+
+class CalculationHistory:
+    """Fixed-capacity ring buffer of (expression, result) pairs"""
+
+    __slots__ = ("maxlen", "_expressions", "_results", "_start", "_size")
+
+    def __init__(self, maxlen: int = 1000):
+        if maxlen < 1:
+            raise ValueError("History size must be at least 1")
+        self.maxlen = maxlen
+        self._expressions: List[Any] = [None] * maxlen
+        self._results: List[Any] = [None] * maxlen
+        self._start = 0
+        self._size = 0
+
+    def append(self, expression: str, result: Any):
+        """
+        Record a calculation, overwriting the oldest one when full.
+
+        Args:
+            expression (str): The evaluated expression
+            result (Any): Its result
+        """
+        if self._size < self.maxlen:
+            index = self._start + self._size
+            if index >= self.maxlen:
+                index -= self.maxlen
+            self._size += 1
+        else:
+            index = self._start
+            self._start = index + 1 if index + 1 < self.maxlen else 0
+        self._expressions[index] = expression
+        self._results[index] = result
+
+    def entries(self) -> List[Tuple[str, Any]]:
+        """
+        Get the recorded calculations, oldest first.
+
+        Returns:
+            List[Tuple[str, Any]]: List of (expression, result) tuples
+        """
+        return [(self._expressions[i], self._results[i]) for i in self._indices()]
+
+    def format(self) -> List[str]:
+        """
+        Format the recorded calculations for display, oldest first.
+
+        Returns:
+            List[str]: Lines of the form "expression = result"
+        """
+        return [f"{self._expressions[i]} = {_text(self._results[i])}" for i in self._indices()]
+
+    def clear(self):
+        """Remove all recorded calculations"""
+        self._expressions = [None] * self.maxlen
+        self._results = [None] * self.maxlen
+        self._start = 0
+        self._size = 0
+
+    def _indices(self) -> Iterable[int]:
+        """Buffer positions in chronological order"""
+        end = self._start + self._size
+        if end <= self.maxlen:
+            return range(self._start, end)
+        return list(range(self._start, self.maxlen)) + list(range(0, end - self.maxlen))
+
+    def __len__(self) -> int:
+        return self._size
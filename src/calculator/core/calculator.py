@@ -6,25 +6,65 @@ Handles input processing, expression evaluation, and output formatting.
 import math
 import sys
 import os
-from typing import Union
+import re
+from decimal import Decimal
+from typing import Callable, Optional, Tuple, Union
 
 # Add the calculator directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import mathematical modules
-from modules.trigonometry import sin, cos, tan, asin, acos, atan
-from modules.logarithms import ln, log10, log2
-from modules.powers import power, sqrt, cbrt, exp, square, cube, reciprocal
-from modules.factorials import factorial, double_factorial
 from modules.fractions import simplify_fraction, add_fractions, subtract_fractions, multiply_fractions, divide_fractions
 
+from core.calculation_history import CalculationHistory, format_integer
+from core.cost_guard import CostGuard, CostLimits
+from core.environment import Environment
+from core.expression_cache import ExpressionCache
+from core.expression_parser import ExpressionParser
+from core.function_registry import Arity, FunctionRegistry, default_registry
+from core.instrumentation import Instrumentation, clock, timed
+from core.precision import PrecisionParser
+from core.rationals import use_rationals
+from modules.fractions import Rational
+from core.vectorized import compile_vectorized
+
+# "name = expression" binds a variable; "==" is not an assignment
+_ASSIGNMENT = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*=(?!=)(.*)\Z", re.DOTALL)
+
+# Angle modes, in the order the GUI cycles through them
+DEG = "DEG"
+RAD = "RAD"
+GRAD = "GRAD"
+ANGLE_MODES = (DEG, RAD, GRAD)
+
 
 class CalculatorController:
     """Controller class for handling calculator operations"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 256, history_size: int = 1000,
+                 functions: Optional[FunctionRegistry] = None,
+                 limits: Optional[CostLimits] = None,
+                 compiled_cache: Optional[ExpressionCache] = None):
         self.last_result = 0
-        self.history = []
+        self.history = CalculationHistory(history_size)
+        self.expression_cache = ExpressionCache(cache_size)
+        # Parsed and compiled expressions shared with other controllers; unlike
+        # expression_cache its entries do not refer to this controller's state
+        self.compiled_cache = compiled_cache
+        self.functions = functions if functions is not None else default_registry.copy()
+        self._functions_version = self.functions.version
+        self._angle_mode = DEG
+        self._bound_functions = self.functions.bound(degrees=True)
+        self.parser = ExpressionParser(functions=self._bound_functions)
+        # Float parser, restored when precision mode is turned off
+        self._float_parser = self.parser
+        # Reject (or approximate) huge powers and factorials before computing them
+        self.limits = limits if limits is not None else CostLimits()
+        # Variables, formula bindings and "ans" (the last result)
+        self.environment = Environment(self.parser)
+        self._async_evaluator = None
+        # Per-stage timing histograms; None when disabled
+        self.instrumentation: Optional[Instrumentation] = None
     
     def process_input(self, input_str: str) -> Union[float, str]:
         """
@@ -37,82 +77,344 @@ class CalculatorController:
             Union[float, str]: Result of the calculation or error message
         """
         try:
-            # If input is a function call, process it directly
-            if self._is_function_call(input_str):
-                return self._evaluate_function(input_str)
-            
-            # Otherwise, evaluate as a mathematical expression
-            return self._evaluate_expression(input_str)
+            return self.compile(input_str)()
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def _is_function_call(self, input_str: str) -> bool:
-        """Check if input is a function call"""
-        functions = [
-            "sin", "cos", "tan", "asin", "acos", "atan",
-            "ln", "log10", "log2", "exp", "sqrt", "cbrt",
-            "factorial", "double_factorial", "square", "cube", "power", "reciprocal"
-        ]
-        return any(input_str.startswith(func + "(") for func in functions)
-    
-    def _evaluate_function(self, input_str: str) -> float:
-        """Evaluate a function call"""
-        try:
-            # Remove spaces
-            input_str = input_str.replace(" ", "")
+    def compile(self, input_str: str) -> Callable[[], float]:
+        """
+        Compile user input into a reusable evaluator, using the cache.
+        
+        The whole input, including nested and composed function calls such
+        as "sqrt(square(3)+square(4))", compiles into one expression tree.
+        Repeated inputs skip tokenizing and validation entirely; only the
+        compiled form is executed.
+        
+        Args:
+            input_str (str): User input string
             
-            # Extract function name and argument
-            func_name = input_str.split("(")[0]
-            arg_str = input_str[len(func_name)+1:-1]  # Remove function name and parentheses
+        Returns:
+            Callable[[], float]: Zero-argument callable producing the result
+        """
+        if self._functions_version != self.functions.version:
+            # Compiled forms may refer to replaced or removed functions
+            self.expression_cache.clear()
+            self._functions_version = self.functions.version
+        key = self._normalize(input_str)
+        # The angle mode is bound into compiled forms, so it is part of the key
+        cache_key = (self._angle_mode, key)
+        compiled = self.expression_cache.get(cache_key)
+        if compiled is None:
+            compiled = self._compile_expression(key)
+            self.expression_cache.put(cache_key, compiled)
+        return compiled
+    
+    def register_function(self, name: str, func: Callable, arity: Arity = 1,
+                          coerce: Optional[Callable] = None, angle_mode: bool = False,
+                          pure: bool = True, kernel: Optional[Callable] = None):
+        """
+        Register a function for use in expressions and function calls.
+        
+        Args:
+            name (str): Name used in expressions
+            func (Callable): Implementation
+            arity (Arity): Number of arguments, or a (min, max) range
+            coerce (Optional[Callable]): Conversion applied to each argument
+            angle_mode (bool): If True, the function receives ``degrees=``
+                (``gradians=True`` in gradian mode)
+            pure (bool): False if the result may change between identical calls
+            kernel (Optional[Callable]): func without argument validation,
+                called when the arguments are known to be ints or floats
+        """
+        self.functions.register(name, func, arity, coerce, angle_mode, pure, kernel)
+
+    def set_variable(self, name: str, value: float):
+        """
+        Bind a variable to a value.
+        
+        Formulas that depend on it are recomputed when next read.
+        
+        Args:
+            name (str): Variable name
+            value (float): Value
+        """
+        self.environment.set(name, value)
+    
+    def define_variable(self, name: str, expression: str):
+        """
+        Bind a variable to a formula over other variables, like "name = expression".
+        
+        Args:
+            name (str): Variable name
+            expression (str): Formula, e.g. "price * (1 + rate)"
+        """
+        self.environment.define(name, expression)
+    
+    @property
+    def limits(self) -> CostLimits:
+        """Cost limits applied to every expression"""
+        return self.parser.cost_guard.limits
+    
+    @limits.setter
+    def limits(self, limits: CostLimits):
+        self.parser.cost_guard = CostGuard(limits)
+        # Compiled forms were checked against the old limits
+        self.expression_cache.clear()
+    
+    @property
+    def angle_mode(self) -> str:
+        """Unit trigonometric functions take and return angles in: DEG, RAD or GRAD"""
+        return self._angle_mode
+    
+    @angle_mode.setter
+    def angle_mode(self, mode: str):
+        """
+        Switch the angle unit of sin, cos, tan and their inverses.
+        
+        The unit is bound into compiled expressions rather than checked on
+        each call. Compiled forms are cached per mode, so switching back
+        reuses them; formulas are recompiled for the new mode.
+        
+        Args:
+            mode (str): "DEG", "RAD" or "GRAD"
             
-            # Evaluate argument
-            arg = self._evaluate_expression(arg_str)
+        Raises:
+            ValueError: If the mode is not one of these
+        """
+        if mode not in ANGLE_MODES:
+            raise ValueError(f"Angle mode must be one of {', '.join(ANGLE_MODES)}")
+        if mode == self._angle_mode:
+            return
+        self._angle_mode = mode
+        self._bound_functions = self.functions.bound(degrees=mode == DEG, gradians=mode == GRAD)
+        self._float_parser.functions = self._bound_functions
+        self.parser.functions = self._bound_functions
+        self._change_mode(None, clear_cache=False)
+    
+    @property
+    def precision(self) -> Optional[int]:
+        """Significant digits of precision mode, or None for float evaluation"""
+        return getattr(self.parser, "precision", None)
+    
+    @precision.setter
+    def precision(self, digits: Optional[int]):
+        """
+        Switch between float evaluation and precision mode.
+        
+        In precision mode decimal literals are exact, integer and rational
+        expressions are evaluated exactly, and everything else in
+        ``decimal.Decimal`` with the given number of significant digits.
+        
+        Args:
+            digits (Optional[int]): Significant digits, or None for floats
+        """
+        if digits == self.precision:
+            return
+        if digits is None:
+            parser = self._float_parser
+        else:
+            parser = PrecisionParser(self._bound_functions, digits)
+        parser.cost_guard = self.parser.cost_guard
+        parser.instrumentation = self.instrumentation
+        self.parser = parser
+        self.environment.parser = parser
+        self._change_mode(Decimal if digits is None else None)
+    
+    @property
+    def rationals(self) -> bool:
+        """Whether integer division gives exact Rationals instead of floats"""
+        return self._float_parser.rewrite is use_rationals
+    
+    @rationals.setter
+    def rationals(self, enabled: bool):
+        """
+        Switch exact rational arithmetic on or off.
+        
+        When on, "1/3 + 1/6" evaluates to the Rational 1/2. Precision mode
+        takes precedence while it is active.
+        
+        Args:
+            enabled (bool): True for exact integer division
+        """
+        if enabled == self.rationals:
+            return
+        self._float_parser.rewrite = use_rationals if enabled else None
+        self._change_mode(None if enabled else Rational)
+    
+    def _change_mode(self, unsupported: Optional[type], clear_cache: bool = True):
+        """
+        Recompile what depends on the evaluation mode after it changes.
+        
+        Args:
+            unsupported (Optional[type]): Value type the new mode cannot
+                take; variables of this type are converted to floats
+            clear_cache (bool): False if cached compiled forms are keyed by
+                the mode, and stay valid
+        """
+        if clear_cache:
+            self.expression_cache.clear()
+        environment = self.environment
+        for name in environment.names():
+            formula = environment.formula(name)
+            if formula is not None:
+                environment.define(name, formula)
+            elif unsupported is not None and isinstance(environment[name], unsupported):
+                environment.set(name, float(environment[name]))
+        if unsupported is not None and isinstance(self.last_result, unsupported):
+            self.last_result = float(self.last_result)
+    
+    def enable_instrumentation(self, dump_interval: Optional[float] = None,
+                               output=None,
+                               instrumentation: Optional[Instrumentation] = None) -> Instrumentation:
+        """
+        Start timing each stage of handling an input.
+        
+        Tokenizing, parsing, compiling, evaluating, formatting and the
+        history append are recorded into histograms. While disabled none of
+        these stages is timed.
+        
+        Args:
+            dump_interval (Optional[float]): If set, write a report of the
+                timings every this many seconds
+            output: Stream for periodic reports (default: stderr)
+            instrumentation (Optional[Instrumentation]): Histograms to record
+                into, e.g. those of another controller (default: new ones)
             
-            # Apply function
-            if func_name == "sin":
-                return sin(arg, degrees=True)
-            elif func_name == "cos":
-                return cos(arg, degrees=True)
-            elif func_name == "tan":
-                return tan(arg, degrees=True)
-            elif func_name == "asin":
-                return asin(arg)
-            elif func_name == "acos":
-                return acos(arg)
-            elif func_name == "atan":
-                return atan(arg)
-            elif func_name == "ln":
-                return ln(arg)
-            elif func_name == "log10":
-                return log10(arg)
-            elif func_name == "log2":
-                return log2(arg)
-            elif func_name == "exp":
-                return exp(arg)
-            elif func_name == "sqrt":
-                return sqrt(arg)
-            elif func_name == "cbrt":
-                return cbrt(arg)
-            elif func_name == "factorial":
-                return factorial(int(arg))
-            elif func_name == "double_factorial":
-                return double_factorial(int(arg))
-            elif func_name == "square":
-                return square(arg)
-            elif func_name == "cube":
-                return cube(arg)
-            elif func_name == "power":
-                # For power function, we need to parse two arguments
-                # This is a special case as it needs to be handled differently
-                # We'll handle this in the GUI by creating an expression like "power(x,y)"
-                # But for direct function calls, we need to parse the arguments
-                raise ValueError("Power function requires two arguments, use expression evaluation instead")
-            elif func_name == "reciprocal":
-                return reciprocal(arg)
-            else:
-                raise ValueError(f"Unknown function: {func_name}")
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Error in function {func_name}: {str(e)}")
+        Returns:
+            Instrumentation: The histograms being recorded
+        """
+        if self.instrumentation is None:
+            self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+            self._float_parser.instrumentation = self.instrumentation
+            self.parser.instrumentation = self.instrumentation
+            # Cached evaluators were compiled without timing
+            self.expression_cache.clear()
+        if dump_interval is not None:
+            self.instrumentation.start_dump(dump_interval, output)
+        return self.instrumentation
+    
+    def disable_instrumentation(self):
+        """Stop timing stages and any periodic reports"""
+        if self.instrumentation is None:
+            return
+        self.instrumentation.stop_dump()
+        self.instrumentation = None
+        self._float_parser.instrumentation = None
+        self.parser.instrumentation = None
+        self.expression_cache.clear()
+    
+    def timing_stats(self) -> dict:
+        """Get latency statistics by stage, empty while instrumentation is disabled"""
+        return self.instrumentation.stats() if self.instrumentation is not None else {}
+    
+    def parse_assignment(self, input_str: str) -> Optional[Tuple[str, str]]:
+        """
+        Split "name = expression" input into its parts.
+        
+        Args:
+            input_str (str): User input string
+            
+        Returns:
+            Optional[Tuple[str, str]]: Name and expression, or None if the
+            input is not an assignment
+        """
+        match = _ASSIGNMENT.match(input_str)
+        if match is None:
+            return None
+        return match.group(1), match.group(2)
+    
+    def get_variable(self, name: str) -> float:
+        """Get the current value of a variable, recomputing it if stale"""
+        return self.environment[name]
+    
+    def explain(self, input_str: str) -> str:
+        """
+        Describe how an expression is optimized before evaluation.
+        
+        Args:
+            input_str (str): Expression to inspect
+            
+        Returns:
+            str: Parsed and optimized forms and the operations saved
+        """
+        return str(self.parser.explain(self._normalize(input_str)))
+    
+    @property
+    def async_evaluator(self):
+        """asyncio front-end (an AsyncEvaluator), created on first use"""
+        if self._async_evaluator is None:
+            # Imported here: the async module builds on this one
+            from core.async_evaluator import AsyncEvaluator
+            self._async_evaluator = AsyncEvaluator(self)
+        return self._async_evaluator
+    
+    async def aevaluate(self, input_str: str, timeout: Optional[float] = None) -> Union[float, str]:
+        """
+        Evaluate input without blocking the event loop.
+        
+        Cheap expressions run inline; expensive ones such as large factorials
+        run in a worker process.
+        
+        Args:
+            input_str (str): User input string
+            timeout (Optional[float]): Seconds to wait for an offloaded evaluation
+            
+        Returns:
+            Union[float, str]: Result of the calculation or error message
+        """
+        return await self.async_evaluator.evaluate(input_str, timeout)
+    
+    def astream(self, expressions, timeout: Optional[float] = None):
+        """
+        Evaluate an iterable or async iterable of expressions concurrently.
+        
+        Use as ``async for result in controller.astream(lines)``; results
+        follow input order.
+        
+        Args:
+            expressions: Iterable or async iterable of expressions
+            timeout (Optional[float]): Per-expression timeout
+            
+        Returns:
+            AsyncIterator: Result or error message of each expression
+        """
+        return self.async_evaluator.stream(expressions, timeout)
+    
+    def evaluate_batch(self, expression: str, **arrays):
+        """
+        Evaluate one expression over NumPy arrays of named variables.
+        
+        The expression is compiled once against the variable names and
+        evaluated element-wise; domain errors are reported per element
+        rather than raised.
+        
+        Args:
+            expression (str): Expression such as "sin(x)*exp(-x/10)"
+            **arrays: Array (or scalar) value for each variable name
+            
+        Returns:
+            BatchResult: Result values with per-element error codes and mask
+            
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If the expression is malformed
+        """
+        names = tuple(sorted(arrays))
+        mode = self._angle_mode
+        key = ("batch", mode, self._normalize(expression), names)
+        compiled = self.expression_cache.get(key)
+        if compiled is None:
+            compiled = compile_vectorized(expression, names, degrees=mode == DEG, gradians=mode == GRAD)
+            self.expression_cache.put(key, compiled)
+        return compiled.evaluate(**arrays)
+    
+    def cache_stats(self) -> dict:
+        """Get hit/miss/eviction counters of the compiled expression cache"""
+        return self.expression_cache.stats()
+    
+    def _normalize(self, input_str: str) -> str:
+        """Normalize input into a cache key by collapsing whitespace"""
+        return " ".join(input_str.split())
     
     def _evaluate_expression(self, expression: str) -> float:
         """
@@ -124,28 +426,105 @@ class CalculatorController:
         Returns:
             float: Result of the evaluation
         """
-        # Replace constants
-        expression = expression.replace("pi", str(math.pi))
-        expression = expression.replace("e", str(math.e))
+        return self._compile_expression(expression)()
+    
+    def _compile_expression(self, expression: str) -> Callable[[], float]:
+        """
+        Validate and compile a mathematical expression or assignment.
         
-        # For security, we'll only allow safe operations
-        # Replace power operator
-        expression = expression.replace("^", "**")
-        # In a real application, you would want to use a proper expression parser
-
-        allowed_chars = set("0123456789+-*/^().e ")
-        allowed_chars = set("0123456789+-*/().e ")
-        if not all(c in allowed_chars for c in expression):
-            raise ValueError("Invalid characters in expression")
+        Args:
+            expression (str): Mathematical expression, or "name = expression"
+            
+        Returns:
+            Callable[[], float]: Evaluator for the expression
+        """
+        assignment = self.parse_assignment(expression)
+        if assignment is not None:
+            return self._compile_assignment(expression, *assignment)
+        compiled = self._compile_parsed(expression, self.environment.names())
+        environment = self.environment
+        run = compiled.evaluate
+        if self.instrumentation is not None:
+            run = timed(run, self.instrumentation, "evaluate")
         
-        # Evaluate the expression
-        try:
-            result = eval(expression)
-            self.last_result = result
-            self.history.append(f"{expression} = {result}")
+        def evaluate() -> float:
+            try:
+                result = run(environment)
+            except (ArithmeticError, TypeError) as e:
+                raise ValueError(f"Invalid expression: {str(e)}")
+            except KeyError as e:
+                raise ValueError(f"Undefined variable: {e.args[0]}")
+            self.record_result(expression, result)
             return result
-        except Exception as e:
-            raise ValueError(f"Invalid expression: {str(e)}")
+        
+        return evaluate
+    
+    def _compile_parsed(self, expression: str, variables: frozenset):
+        """Compile an expression with the parser, through the shared compiled cache if any"""
+        shared = self.compiled_cache
+        if shared is None:
+            return self.parser.compile(expression, variables)
+        limits = self.limits
+        # Everything a compiled form depends on besides the expression itself
+        key = (id(self.functions), self.functions.version, self._angle_mode, self.precision,
+               self.rationals, limits.max_digits, limits.max_factorial, limits.approximate,
+               expression, variables)
+        compiled = shared.get(key)
+        if compiled is None:
+            compiled = self.parser.compile(expression, variables)
+            shared.put(key, compiled)
+        return compiled
+    
+    def _compile_assignment(self, source: str, name: str, expression: str) -> Callable[[], float]:
+        """
+        Compile "name = expression" into an evaluator that binds the name.
+        
+        An expression over other variables is bound as a formula and follows
+        their changes; a constant or self-referencing expression is evaluated
+        once and its value bound.
+        """
+        dependencies = self.parser.free_variables(expression)
+        compiled = self._compile_parsed(expression, dependencies)
+        environment = self.environment
+        instrumentation = self.instrumentation
+        
+        def assign() -> float:
+            try:
+                start = clock() if instrumentation is not None else 0
+                if dependencies and name not in dependencies:
+                    environment.bind(name, compiled, dependencies)
+                    result = environment[name]
+                else:
+                    # Constant or self-referencing ("x = x + 1"): store the value
+                    result = compiled.evaluate(environment)
+                    environment.set(name, result)
+                if instrumentation is not None:
+                    instrumentation.record("evaluate", clock() - start)
+            except (ArithmeticError, TypeError) as e:
+                raise ValueError(f"Invalid expression: {str(e)}")
+            except KeyError as e:
+                raise ValueError(f"Undefined variable: {e.args[0]}")
+            self.record_result(source, result)
+            return result
+        
+        return assign
+    
+    def record_result(self, expression: str, result: float):
+        """
+        Remember a result as the last result, "ans" and in the history.
+        
+        Args:
+            expression (str): The evaluated expression
+            result (float): Its result
+        """
+        self.last_result = result
+        self.environment.set("ans", result)
+        if self.instrumentation is None:
+            self.history.append(expression, result)
+        else:
+            start = clock()
+            self.history.append(expression, result)
+            self.instrumentation.record("history", clock() - start)
     
     def format_output(self, result: Union[float, str]) -> str:
         """
@@ -157,14 +536,22 @@ class CalculatorController:
         Returns:
             str: Formatted result
         """
+        if self.instrumentation is None:
+            return self._format(result)
+        start = clock()
+        formatted = self._format(result)
+        self.instrumentation.record("format", clock() - start)
+        return formatted
+    
+    def _format(self, result: Union[float, str]) -> str:
+        """Format a result without timing it"""
         if isinstance(result, str):
             return result
-        elif isinstance(result, (int, float)):
-            # Format numbers nicely
-            # Handle precision issues with trigonometric functions
-            if abs(result) < 1e-10:
-                return "0"
-            elif result == int(result):
+        elif isinstance(result, int):
+            return format_integer(int(result))
+        elif isinstance(result, float):
+            # Format numbers nicely (inf and nan have no integer form)
+            if math.isfinite(result) and result.is_integer():
                 return str(int(result))
             else:
                 return f"{result:.10g}"
@@ -173,7 +560,7 @@ class CalculatorController:
     
     def get_history(self) -> list:
         """Get calculation history"""
-        return self.history.copy()
+        return self.history.format()
     
     def clear_history(self):
         """Clear calculation history"""
@@ -0,0 +1,709 @@
+"""
+Cost Guard
+Resource limits for expressions whose exact results would be huge.
+
+Integer powers and factorials grow without bound: ``9^9^9`` has hundreds of
+millions of digits and ``factorial(10^7)`` takes minutes to compute. Before
+an expression is folded or evaluated, ``estimate_cost`` bounds the size of
+every integer it would produce and the largest factorial argument, working
+on the parse tree alone. Whatever the tree cannot bound statically (values
+of variables, results of functions) is checked again at evaluation time by
+guarded versions of the power and factorial kernels, which look at their
+actual operands before computing.
+
+An expression over the limits is either rejected with ``CostLimitError`` or,
+if ``CostLimits.approximate`` is set, evaluated in log space: every value is
+carried as a sign and a base-10 logarithm, so ``factorial(100000)`` comes
+out as ``2.824229408e+456573`` in microseconds.
+"""
+
+import math
+import numbers
+import os
+import sys
+from typing import Callable, List, Mapping, Optional, Tuple
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.expression_parser import BinaryOp, Call, Constant, Negate, Node, Variable, walk
+from modules.fractions import Rational
+
+LOG10_2 = math.log10(2)
+
+# log10 of the largest float
+FLOAT_MAX_LOG = math.log10(sys.float_info.max)
+
+# Functions whose exact integer result grows faster than their argument
+FACTORIALS = frozenset(("factorial", "double_factorial"))
+
+# Two-argument counting functions with exact integer results
+COMBINATIONS = frozenset(("binomial", "permutations"))
+
+# One-argument functions raising their argument to a fixed power
+FIXED_POWERS = {"square": 2, "cube": 3}
+
+# Upper bound on log10 of a value's magnitude (None if unknown) and whether
+# the value is an exact integer
+Bound = Tuple[Optional[float], bool]
+
+# Value in log space: sign (-1, 0 or 1) and log10 of the magnitude
+LogValue = Tuple[int, float]
+
+
+class CostLimitError(ValueError):
+    """Raised when an expression would exceed the configured cost limits"""
+
+
+class CostLimits:
+    """Limits on the work a single expression may cause"""
+
+    __slots__ = ("max_digits", "max_factorial", "approximate")
+
+    def __init__(self, max_digits: Optional[int] = 100_000, max_factorial: Optional[int] = 20_000,
+                 approximate: bool = False):
+        """
+        Args:
+            max_digits (Optional[int]): Largest integer, in decimal digits,
+                an expression may compute (None for no limit)
+            max_factorial (Optional[int]): Largest argument of factorial and
+                double_factorial (None for no limit)
+            approximate (bool): Evaluate expressions over the limits in log
+                space instead of rejecting them
+        """
+        self.max_digits = max_digits
+        self.max_factorial = max_factorial
+        self.approximate = approximate
+
+    @classmethod
+    def unlimited(cls) -> "CostLimits":
+        """Limits that accept every expression"""
+        return cls(None, None)
+
+    def violation(self, digits: float, factorial: float) -> Optional[str]:
+        """
+        Check estimated sizes against the limits.
+
+        Args:
+            digits (float): Digits of the largest integer computed
+            factorial (float): Largest factorial argument
+
+        Returns:
+            Optional[str]: Description of the first limit exceeded, or None
+        """
+        if self.max_factorial is not None and factorial > self.max_factorial:
+            return f"Factorial argument too large: {_amount(factorial)} (limit {self.max_factorial})"
+        if self.max_digits is not None and digits > self.max_digits:
+            return f"Result too large: {_amount(digits)} digits (limit {self.max_digits})"
+        return None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CostLimits):
+            return NotImplemented
+        return ((self.max_digits, self.max_factorial, self.approximate) ==
+                (other.max_digits, other.max_factorial, other.approximate))
+
+    def __repr__(self) -> str:
+        return (f"CostLimits(max_digits={self.max_digits}, max_factorial={self.max_factorial}, "
+                f"approximate={self.approximate})")
+
+
+class CostEstimate:
+    """Static upper bounds for one expression"""
+
+    __slots__ = ("digits", "factorial")
+
+    def __init__(self, digits: float = 0, factorial: float = 0):
+        # Digits of the largest integer the expression computes
+        self.digits = digits
+        # Largest factorial argument
+        self.factorial = factorial
+
+    def __repr__(self) -> str:
+        return f"CostEstimate(digits={self.digits:g}, factorial={self.factorial:g})"
+
+
+class ApproximateNumber:
+    """
+    Value beyond float range, produced by log-space evaluation.
+
+    It only supports display; arithmetic on it raises ``CostLimitError`` so
+    an expression reading it is evaluated in log space as well.
+    """
+
+    __slots__ = ("sign", "log10")
+
+    def __init__(self, sign: int, log10: float):
+        self.sign = sign
+        self.log10 = log10
+
+    def _escalate(self, *args):
+        raise CostLimitError("Value is beyond exact range")
+
+    __add__ = __radd__ = __sub__ = __rsub__ = _escalate
+    __mul__ = __rmul__ = __truediv__ = __rtruediv__ = _escalate
+    __pow__ = __rpow__ = __neg__ = __abs__ = __float__ = __int__ = _escalate
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ApproximateNumber):
+            return NotImplemented
+        return (self.sign, self.log10) == (other.sign, other.log10)
+
+    def __hash__(self) -> int:
+        return hash((self.sign, self.log10))
+
+    def __str__(self) -> str:
+        exponent = math.floor(self.log10)
+        mantissa = 10 ** (self.log10 - exponent)
+        return f"{'-' if self.sign < 0 else ''}{mantissa:.10g}e+{exponent}"
+
+    def __repr__(self) -> str:
+        return f"ApproximateNumber({self})"
+
+
+def _amount(value: float) -> str:
+    """Format a possibly astronomical count"""
+    if value < 1e15:
+        return f"about {value:.0f}"
+    if math.isfinite(value):
+        return f"about 10^{math.log10(value):.0f}"
+    return "more than 10^308"
+
+
+def _magnitude(value) -> float:
+    """log10 of the magnitude of a number, -inf for zero"""
+    if value == 0:
+        return -math.inf
+    return math.log10(abs(value))
+
+
+def _power_of_ten(exponent: float) -> float:
+    """10**exponent, saturating at infinity"""
+    return 10 ** exponent if exponent < FLOAT_MAX_LOG else math.inf
+
+
+def _log10_factorial(n: float) -> float:
+    """log10(n!) for n >= 0"""
+    if n > 1e300:
+        return math.inf
+    return math.lgamma(n + 1) / math.log(10)
+
+
+def _log10_double_factorial(n: float) -> float:
+    """log10(n!!) for n >= 0, via n!! = 2^k k! (n = 2k) or (2k)! / (2^k k!) (n = 2k - 1)"""
+    if n > 1e300:
+        return math.inf
+    if int(n) % 2 == 0:
+        k = n / 2
+        return k * LOG10_2 + _log10_factorial(k)
+    k = (n + 1) / 2
+    return _log10_factorial(2 * k) - k * LOG10_2 - _log10_factorial(k)
+
+
+def _log10_binomial(n: float, k: float) -> float:
+    """log10 of the binomial coefficient C(n, k)"""
+    if k > n:
+        return -math.inf
+    return _log10_factorial(n) - _log10_factorial(k) - _log10_factorial(n - k)
+
+
+def _log10_permutations(n: float, k: float) -> float:
+    """log10 of the number of k-permutations of n"""
+    if k > n:
+        return -math.inf
+    return _log10_factorial(n) - _log10_factorial(n - k)
+
+
+_COMBINATION_LOGS = {"binomial": _log10_binomial, "permutations": _log10_permutations}
+
+
+def _add_bound(a: Bound, b: Bound) -> Bound:
+    if a[0] is None or b[0] is None:
+        return None, False
+    return max(a[0], b[0]) + LOG10_2, a[1] and b[1]
+
+
+def _multiply_bound(a: Bound, b: Bound) -> Bound:
+    if a[0] is None or b[0] is None:
+        return None, False
+    if a[0] == -math.inf or b[0] == -math.inf:
+        return -math.inf, a[1] and b[1]
+    return a[0] + b[0], a[1] and b[1]
+
+
+def _power_bound(base: Bound, exponent: Bound) -> Bound:
+    integer = base[1] and exponent[1]
+    if base[0] is None or exponent[0] is None:
+        return None, integer
+    if base[0] <= 0:
+        # |base| <= 1 with a non-negative exponent
+        return 0.0, integer
+    return base[0] * _power_of_ten(exponent[0]), integer
+
+
+def _is_negative(node: Node) -> bool:
+    """Whether a node is a literal negative number"""
+    return isinstance(node, Negate) or (isinstance(node, Constant) and node.value < 0)
+
+
+# Static result bound of calls, by function name; others return floats of
+# unknown magnitude
+_CALL_BOUNDS = {
+    "sqrt": lambda a: (None if a[0] is None else a[0] / 2, False),
+    "cbrt": lambda a: (None if a[0] is None else a[0] / 3, False),
+    "square": lambda a: _multiply_bound(a, a),
+    "cube": lambda a: _multiply_bound(_multiply_bound(a, a), a),
+}
+
+
+def estimate_cost(tree: Node) -> CostEstimate:
+    """
+    Bound the integer sizes and factorial arguments of an expression.
+
+    Works on the parse tree without evaluating anything. Sub-trees over
+    variables or functions of unknown magnitude are left unbounded; the
+    guarded kernels check those at evaluation time.
+
+    Args:
+        tree (Node): Parsed, unfolded expression tree
+
+    Returns:
+        CostEstimate: Upper bounds for the whole expression
+    """
+    estimate = CostEstimate()
+
+    def visit(node: Node, bounds: List[Bound]) -> Bound:
+        if isinstance(node, Constant):
+            value = node.value
+            result = (_magnitude(value), isinstance(value, int))
+        elif isinstance(node, Variable):
+            return None, False
+        elif isinstance(node, Negate):
+            return bounds[0]
+        elif isinstance(node, BinaryOp):
+            symbol = node.symbol
+            if symbol in ('+', '-'):
+                result = _add_bound(*bounds)
+            elif symbol == '*':
+                result = _multiply_bound(*bounds)
+            elif symbol in ('^', '**') and not _is_negative(node.right):
+                result = _power_bound(*bounds)
+            else:
+                result = (None, False)
+        elif node.name in FACTORIALS:
+            argument = bounds[0][0] if bounds else None
+            if argument is None:
+                return None, True
+            n = _power_of_ten(argument)
+            estimate.factorial = max(estimate.factorial, n)
+            log = _log10_factorial if node.name == "factorial" else _log10_double_factorial
+            result = (log(n), True)
+        elif node.name in COMBINATIONS:
+            argument = bounds[0][0] if bounds else None
+            if argument is None:
+                return None, True
+            n = _power_of_ten(argument)
+            # C(n, k) <= 2^n and n! / (n-k)! <= n!; both are at most n^k
+            magnitude = n * LOG10_2 if node.name == "binomial" else _log10_factorial(n)
+            if len(bounds) == 2 and bounds[1][0] is not None and argument > 0:
+                magnitude = min(magnitude, _power_of_ten(bounds[1][0]) * argument)
+            result = (magnitude, True)
+        else:
+            model = _CALL_BOUNDS.get(node.name)
+            result = model(*bounds) if model is not None and len(bounds) == 1 else (None, False)
+        magnitude, integer = result
+        if magnitude is None:
+            return result
+        if integer:
+            digits = math.floor(magnitude) + 1 if math.isfinite(magnitude) else magnitude
+            estimate.digits = max(estimate.digits, digits)
+        else:
+            # A float never exceeds the float range; overflow raises at once
+            magnitude = min(magnitude, FLOAT_MAX_LOG)
+        return magnitude, integer
+
+    walk(tree, visit)
+    return estimate
+
+
+def _guard_power(func: Callable, limits: CostLimits) -> Callable:
+    """Wrap the power operator to check integer result sizes before computing"""
+    max_digits = limits.max_digits
+
+    def power(x, y):
+        if isinstance(x, int) and isinstance(y, int) and y > 0 and (x > 1 or x < -1):
+            digits = y * _magnitude(x)
+            if digits > max_digits:
+                raise CostLimitError(limits.violation(digits, 0))
+        elif isinstance(x, numbers.Rational) and isinstance(y, int) and y:
+            if isinstance(x, Rational):
+                x.reduce()
+            digits = abs(y) * max(_magnitude(x.numerator), _magnitude(x.denominator))
+            if digits > max_digits:
+                raise CostLimitError(limits.violation(digits, 0))
+        return func(x, y)
+
+    return power
+
+
+def _guard_fixed_power(func: Callable, limits: CostLimits, exponent: int) -> Callable:
+    """Wrap square or cube to check integer result sizes before computing"""
+    max_digits = limits.max_digits
+
+    def power(x):
+        if isinstance(x, int) and (x > 1 or x < -1):
+            digits = exponent * _magnitude(x)
+            if digits > max_digits:
+                raise CostLimitError(limits.violation(digits, 0))
+        return func(x)
+
+    return power
+
+
+def _guard_factorial(func: Callable, limits: CostLimits, log: Callable[[float], float]) -> Callable:
+    """Wrap a factorial function to check its argument before computing"""
+
+    def factorial(n):
+        if isinstance(n, (int, float)) and n > 0:
+            digits = log(n) + 1 if limits.max_digits is not None else 0
+            violation = limits.violation(digits, n)
+            if violation is not None:
+                raise CostLimitError(violation)
+        return func(n)
+
+    return factorial
+
+
+def _guard_combination(func: Callable, limits: CostLimits,
+                       log: Callable[[float, float], float]) -> Callable:
+    """Wrap binomial or permutations to check the result size before computing"""
+
+    def combination(n, k):
+        if isinstance(n, (int, float)) and isinstance(k, (int, float)) and n > 0 and k >= 0:
+            digits = log(n, k) + 1
+            if digits > limits.max_digits:
+                raise CostLimitError(limits.violation(digits, 0))
+        return func(n, k)
+
+    return combination
+
+
+def protect(tree: Node, limits: CostLimits) -> Node:
+    """
+    Replace the power and factorial kernels of a tree with guarded versions.
+
+    Runs after kernel specialization, which would otherwise replace the
+    guarded functions of calls.
+
+    Args:
+        tree (Node): Expression tree
+        limits (CostLimits): Limits the kernels enforce
+
+    Returns:
+        Node: Tree whose expensive operations check their operands first
+    """
+    # One wrapper per kernel, so identical sub-trees stay shareable
+    wrappers = {}
+
+    def guarded(func: Callable, make: Callable[[], Callable]) -> Callable:
+        wrapper = wrappers.get(func)
+        if wrapper is None:
+            wrapper = wrappers[func] = make()
+        return wrapper
+
+    def visit(node: Node, children: list) -> Node:
+        if not children:
+            return node
+        if isinstance(node, BinaryOp):
+            if node.symbol in ('^', '**') and limits.max_digits is not None:
+                func = guarded(node.func, lambda: _guard_power(node.func, limits))
+                return BinaryOp(node.symbol, func, *children)
+        elif (isinstance(node, Call) and node.name in FIXED_POWERS and len(children) == 1
+              and limits.max_digits is not None):
+            exponent = FIXED_POWERS[node.name]
+            func = guarded(node.func, lambda: _guard_fixed_power(node.func, limits, exponent))
+            return Call(node.name, func, children)
+        elif isinstance(node, Call) and node.name in FACTORIALS and len(children) == 1:
+            log = _log10_factorial if node.name == "factorial" else _log10_double_factorial
+            func = guarded(node.func, lambda: _guard_factorial(node.func, limits, log))
+            return Call(node.name, func, children)
+        elif (isinstance(node, Call) and node.name in COMBINATIONS and len(children) == 2
+              and limits.max_digits is not None):
+            log = _COMBINATION_LOGS[node.name]
+            func = guarded(node.func, lambda: _guard_combination(node.func, limits, log))
+            return Call(node.name, func, children)
+        if any(new is not old for new, old in zip(children, node.children)):
+            return node.with_children(children)
+        return node
+
+    return walk(tree, visit)
+
+
+def _to_log(value) -> LogValue:
+    """Convert an exact value to log space"""
+    if isinstance(value, ApproximateNumber):
+        return value.sign, value.log10
+    if value == 0:
+        return 0, -math.inf
+    return (1 if value > 0 else -1), math.log10(abs(value))
+
+
+def _to_real(value: LogValue) -> float:
+    """Convert a log-space value back to a float"""
+    sign, log = value
+    if sign == 0:
+        return 0.0
+    if log > FLOAT_MAX_LOG:
+        raise CostLimitError("Value is too large to approximate this function")
+    return sign * 10 ** log
+
+
+def _log_add(a: LogValue, b: LogValue) -> LogValue:
+    if a[0] == 0:
+        return b
+    if b[0] == 0:
+        return a
+    if a[1] < b[1]:
+        a, b = b, a
+    ratio = 10 ** (b[1] - a[1])
+    if a[0] == b[0]:
+        return a[0], a[1] + math.log10(1 + ratio)
+    if ratio >= 1:
+        return 0, -math.inf
+    return a[0], a[1] + math.log10(1 - ratio)
+
+
+def _log_divide(a: LogValue, b: LogValue) -> LogValue:
+    if b[0] == 0:
+        raise ZeroDivisionError("division by zero")
+    return a[0] * b[0], a[1] - b[1]
+
+
+def _log_power(a: LogValue, b: LogValue) -> LogValue:
+    y = _to_real(b)
+    # Undo the rounding error of the log round trip, so integer exponents
+    # keep their parity
+    nearest = round(y) if math.isfinite(y) else y
+    if math.isclose(y, nearest, rel_tol=1e-12):
+        y = nearest
+    if a[0] == 0:
+        if y < 0:
+            raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+        return (0, -math.inf) if y > 0 else (1, 0.0)
+    sign = 1
+    if a[0] < 0:
+        if not isinstance(y, int):
+            raise ValueError("Negative base with non-integer exponent is not supported")
+        sign = -1 if y % 2 else 1
+    return sign, a[1] * y
+
+
+def _to_natural(a: LogValue) -> int:
+    """Convert a log-space value to a non-negative integer, truncating like int()"""
+    n = _to_real(a)
+    if n < 0:
+        raise ValueError("Input must be non-negative")
+    # Undo the rounding error of the log round trip before truncating
+    nearest = round(n)
+    return nearest if math.isclose(n, nearest, rel_tol=1e-12) else math.floor(n)
+
+
+def _log_factorial(log: Callable[[float], float]) -> Callable[[LogValue], LogValue]:
+    def factorial(a: LogValue) -> LogValue:
+        return 1, log(_to_natural(a))
+    return factorial
+
+
+def _log_combination(log: Callable[[float, float], float]) -> Callable[[LogValue, LogValue], LogValue]:
+    def combination(a: LogValue, b: LogValue) -> LogValue:
+        n, k = _to_natural(a), _to_natural(b)
+        return (0, -math.inf) if k > n else (1, log(n, k))
+    return combination
+
+
+def _log_logarithm(base: float) -> Callable[[LogValue], LogValue]:
+    def logarithm(a: LogValue) -> LogValue:
+        if a[0] <= 0:
+            raise ValueError("Logarithm requires a positive argument")
+        return _to_log(a[1] / math.log10(base))
+    return logarithm
+
+
+def _log_exp(a: LogValue) -> LogValue:
+    return 1, _to_real(a) * math.log10(math.e)
+
+
+def _log_root(degree: int) -> Callable[[LogValue], LogValue]:
+    def root(a: LogValue) -> LogValue:
+        if a[0] < 0 and degree % 2 == 0:
+            raise ValueError("Cannot calculate square root of negative number")
+        return a[0], a[1] / degree
+    return root
+
+
+def _log_reciprocal(a: LogValue) -> LogValue:
+    if a[0] == 0:
+        raise ValueError("Cannot calculate reciprocal of zero")
+    return a[0], -a[1]
+
+
+_LOG_OPERATORS = {
+    '+': _log_add,
+    '-': lambda a, b: _log_add(a, (-b[0], b[1])),
+    '*': lambda a, b: (a[0] * b[0], a[1] + b[1]),
+    '/': _log_divide,
+    '^': _log_power,
+    '**': _log_power,
+}
+
+# Log-space versions of functions, by name; others are called on floats
+_LOG_FUNCTIONS = {
+    "factorial": _log_factorial(_log10_factorial),
+    "double_factorial": _log_factorial(_log10_double_factorial),
+    "binomial": _log_combination(_log10_binomial),
+    "permutations": _log_combination(_log10_permutations),
+    "square": lambda a: (a[0] * a[0], 2 * a[1]),
+    "cube": lambda a: (a[0], 3 * a[1]),
+    "power": _log_power,
+    "sqrt": _log_root(2),
+    "cbrt": _log_root(3),
+    "exp": _log_exp,
+    "ln": _log_logarithm(math.e),
+    "log10": _log_logarithm(10),
+    "log2": _log_logarithm(2),
+    "reciprocal": _log_reciprocal,
+}
+
+
+def evaluate_log_space(tree: Node, variables: Optional[Mapping[str, object]] = None):
+    """
+    Evaluate an expression approximately, carrying each value as a logarithm.
+
+    Args:
+        tree (Node): Expression tree
+        variables (Optional[Mapping[str, object]]): Values of its variables
+
+    Returns:
+        Union[float, ApproximateNumber]: A float when the result fits in
+        float range, otherwise an ApproximateNumber
+
+    Raises:
+        KeyError: If a variable has no value
+        ValueError: On a domain error, or a function that cannot take an
+            argument beyond float range
+    """
+    def visit(node: Node, values: List[LogValue]) -> LogValue:
+        if isinstance(node, Constant):
+            return _to_log(node.value)
+        if isinstance(node, Variable):
+            return _to_log(variables[node.name])
+        if isinstance(node, Negate):
+            return -values[0][0], values[0][1]
+        if isinstance(node, BinaryOp):
+            return _LOG_OPERATORS[node.symbol](*values)
+        function = _LOG_FUNCTIONS.get(node.name)
+        if function is not None:
+            return function(*values)
+        return _to_log(node.func(*[_to_real(value) for value in values]))
+
+    sign, log = walk(tree, visit)
+    if sign == 0:
+        return 0.0
+    if log < FLOAT_MAX_LOG:
+        return sign * 10 ** log
+    return ApproximateNumber(sign, log)
+
+
+class ApproximateExpression:
+    """Expression over the cost limits, evaluated in log space"""
+
+    __slots__ = ("source", "tree")
+
+    def __init__(self, source: str, tree: Node):
+        self.source = source
+        self.tree = tree
+
+    def evaluate(self, variables: Optional[Mapping[str, object]] = None):
+        return evaluate_log_space(self.tree, variables)
+
+    def __repr__(self) -> str:
+        return f"ApproximateExpression({self.source!r})"
+
+
+class GuardedExpression:
+    """Compiled expression that falls back to log space when a value grows too large"""
+
+    __slots__ = ("source", "tree", "compiled")
+
+    def __init__(self, source: str, tree: Node, compiled):
+        self.source = source
+        # Unguarded tree for the log-space fallback
+        self.tree = tree
+        self.compiled = compiled
+
+    def evaluate(self, variables: Optional[Mapping[str, object]] = None):
+        try:
+            return self.compiled.evaluate(variables)
+        except (CostLimitError, OverflowError):
+            return evaluate_log_space(self.tree, variables)
+
+    def __repr__(self) -> str:
+        return f"GuardedExpression({self.source!r})"
+
+
+class CostGuard:
+    """Applies cost limits when an ExpressionParser compiles an expression"""
+
+    def __init__(self, limits: CostLimits):
+        """
+        Args:
+            limits (CostLimits): Limits to enforce
+        """
+        self.limits = limits
+
+    def review(self, tree: Node) -> Node:
+        """
+        Check a parsed tree against the limits and guard its expensive kernels.
+
+        Args:
+            tree (Node): Parsed, unfolded expression tree
+
+        Returns:
+            Node: Tree with guarded power and factorial kernels
+
+        Raises:
+            CostLimitError: If the expression is statically over the limits
+        """
+        estimate = estimate_cost(tree)
+        violation = self.limits.violation(estimate.digits, estimate.factorial)
+        if violation is not None:
+            raise CostLimitError(violation)
+        return protect(tree, self.limits)
+
+    def compile(self, source: str, tree: Node, compile_tree: Callable[[Node], object]):
+        """
+        Compile a parsed tree under the limits.
+
+        Args:
+            source (str): Expression text
+            tree (Node): Parsed, unfolded expression tree
+            compile_tree (Callable[[Node], object]): Compiles a tree into an
+                object with an ``evaluate(variables)`` method
+
+        Returns:
+            The compiled expression, or a log-space one in approximate mode
+
+        Raises:
+            CostLimitError: If the expression is over the limits and
+                approximation is off
+        """
+        try:
+            guarded = self.review(tree)
+        except CostLimitError:
+            if not self.limits.approximate:
+                raise
+            return ApproximateExpression(source, tree)
+        compiled = compile_tree(guarded)
+        if self.limits.approximate:
+            return GuardedExpression(source, tree, compiled)
+        return compiled
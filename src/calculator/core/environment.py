@@ -0,0 +1,215 @@
+"""
+Environment
+Named variables and formula bindings for expression evaluation.
+
+A binding is either a plain value (``x = 5``) or a formula over other
+names (``total = price * (1 + rate)``). Bindings form a dependency graph:
+changing a name only marks the formulas that depend on it, directly or
+through other formulas, as stale, and a stale formula is recomputed the
+next time it is read. Formulas that do not depend on the changed name keep
+their cached values, so what-if sweeps over one input only redo the work
+downstream of it.
+"""
+
+import re
+from typing import Dict, Iterator, List, Mapping, Optional, Set
+
+from core.expression_parser import CompiledExpression, ExpressionParser
+
+_NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*\Z")
+
+
+class Environment(Mapping):
+    """Mapping of variable names to values, with formula bindings kept up to date"""
+
+    def __init__(self, parser: ExpressionParser):
+        """
+        Args:
+            parser (ExpressionParser): Parser used to compile formulas
+        """
+        self.parser = parser
+        self._values: Dict[str, object] = {}
+        self._formulas: Dict[str, CompiledExpression] = {}
+        # name -> names its formula reads, and the reverse edges
+        self._dependencies: Dict[str, frozenset] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._stale: Set[str] = set()
+        self._names: Optional[frozenset] = frozenset()
+        # Number of formula evaluations, for monitoring incremental updates
+        self.recomputations = 0
+
+    def set(self, name: str, value):
+        """
+        Bind a name to a value, replacing any formula bound to it.
+
+        Args:
+            name (str): Variable name
+            value: New value
+        """
+        self._check_name(name)
+        if name in self._formulas:
+            self._unlink(name)
+            self._stale.discard(name)
+        elif name not in self._values:
+            self._names = None
+        self._values[name] = value
+        self._invalidate(name)
+
+    def define(self, name: str, expression: str):
+        """
+        Bind a name to a formula over other names.
+
+        Args:
+            name (str): Variable name
+            expression (str): Formula, e.g. "price * (1 + rate)"
+
+        Raises:
+            ValueError: If the formula is malformed or refers back to name
+        """
+        dependencies = self.parser.free_variables(expression)
+        self.bind(name, self.parser.compile(expression, dependencies), dependencies)
+
+    def bind(self, name: str, compiled: CompiledExpression, dependencies: frozenset):
+        """
+        Bind a name to an already compiled formula.
+
+        Args:
+            name (str): Variable name
+            compiled (CompiledExpression): Formula compiled against dependencies
+            dependencies (frozenset): Names the formula reads
+
+        Raises:
+            ValueError: If the formula refers back to name
+        """
+        self._check_name(name)
+        if self._reaches(dependencies, name):
+            raise ValueError(f"Circular reference: {name}")
+        if name in self._formulas:
+            self._unlink(name)
+        elif name not in self._values:
+            self._names = None
+        self._formulas[name] = compiled
+        self._dependencies[name] = dependencies
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(name)
+        self._values.pop(name, None)
+        self._invalidate(name)
+
+    def unset(self, name: str):
+        """
+        Remove a binding. Formulas that use the name fail until it is bound again.
+
+        Args:
+            name (str): Variable name
+        """
+        if name not in self._values and name not in self._formulas:
+            raise KeyError(name)
+        if name in self._formulas:
+            self._unlink(name)
+        self._values.pop(name, None)
+        self._invalidate(name)
+        self._stale.discard(name)
+        self._names = None
+
+    def clear(self):
+        """Remove every binding"""
+        self._values.clear()
+        self._formulas.clear()
+        self._dependencies.clear()
+        self._dependents.clear()
+        self._stale.clear()
+        self._names = frozenset()
+
+    def names(self) -> frozenset:
+        """Get the bound names, for compiling expressions against them"""
+        if self._names is None:
+            self._names = frozenset(self._values.keys() | self._formulas.keys())
+        return self._names
+
+    def formula(self, name: str) -> Optional[str]:
+        """Get the source of the formula bound to name, if any"""
+        compiled = self._formulas.get(name)
+        return compiled.source if compiled is not None else None
+
+    def dependencies(self, name: str) -> frozenset:
+        """Get the names the formula bound to name reads directly"""
+        return self._dependencies.get(name, frozenset())
+
+    def dependents(self, name: str) -> frozenset:
+        """Get the formulas that read name directly"""
+        return frozenset(self._dependents.get(name, ()))
+
+    def __getitem__(self, name: str):
+        if name in self._stale:
+            self._refresh(name)
+        return self._values[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._values or name in self._formulas
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def _check_name(self, name: str):
+        """Reject names that could not be read back in an expression"""
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid variable name: {name}")
+        if name in self.parser.constants or name in self.parser.functions:
+            raise ValueError(f"Cannot bind reserved name: {name}")
+
+    def _unlink(self, name: str):
+        """Drop the dependency edges of the formula bound to name"""
+        for dependency in self._dependencies.pop(name, ()):
+            dependents = self._dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(name)
+                if not dependents:
+                    del self._dependents[dependency]
+        del self._formulas[name]
+
+    def _reaches(self, names: frozenset, target: str) -> bool:
+        """Check whether target is among names or their transitive dependencies"""
+        seen = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name == target:
+                return True
+            if name not in seen:
+                seen.add(name)
+                stack.extend(self._dependencies.get(name, ()))
+        return False
+
+    def _invalidate(self, name: str):
+        """Mark every formula downstream of name as stale"""
+        if name in self._formulas:
+            self._stale.add(name)
+        stack = list(self._dependents.get(name, ()))
+        stale = self._stale
+        while stack:
+            dependent = stack.pop()
+            if dependent not in stale:
+                stale.add(dependent)
+                self._values.pop(dependent, None)
+                stack.extend(self._dependents.get(dependent, ()))
+
+    def _refresh(self, name: str):
+        """Recompute a stale formula and the stale formulas it reads, dependencies first"""
+        stale = self._stale
+        stack: List[str] = [name]
+        while stack:
+            current = stack[-1]
+            if current not in stale:
+                stack.pop()
+                continue
+            pending = [dependency for dependency in self._dependencies[current] if dependency in stale]
+            if pending:
+                stack.extend(pending)
+                continue
+            self._values[current] = self._formulas[current].evaluate(self._values)
+            self.recomputations += 1
+            stale.discard(current)
+            stack.pop()
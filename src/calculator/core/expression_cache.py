@@ -0,0 +1,93 @@
+"""
+Expression Cache
+Bounded LRU cache for compiled expressions.
+
+Lookups and insertions take a lock, so one cache can be shared by
+controllers running on different threads.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ExpressionCache:
+    """Least-recently-used cache mapping normalized input to a compiled form"""
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 0:
+            raise ValueError("Cache size must be non-negative")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a compiled entry and mark it as most recently used.
+
+        Args:
+            key (Hashable): Normalized expression key
+
+        Returns:
+            Optional[Any]: The cached entry, or None on a miss
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a compiled entry, evicting the least recently used one if full.
+
+        Args:
+            key (Hashable): Normalized expression key
+            value (Any): Compiled form of the expression
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters for sizing.
+
+        Returns:
+            Dict[str, int]: hits, misses, evictions, current size and maxsize
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -1,131 +1,892 @@
 """
 Expression Parser
 Parses and evaluates mathematical expressions.
+
+Expressions are split into typed tokens by a single pass of one compiled
+regular expression (numbers may use scientific notation, ``6.02e23``), and
+each token keeps its source position for error messages. Tokens are parsed
+into a tree of nodes in which function calls are ordinary nodes, so a
+composite formula such as ``sqrt(square(3)+square(4))`` becomes one tree.
+The tree is compiled into a compact postfix instruction list that is evaluated on a value stack,
+without ``eval``.
+
+Before compilation the tree is optimized: sub-trees whose operands are all
+constants are folded into a single constant, and structurally identical
+sub-trees are evaluated once per evaluation, their value kept in a
+temporary slot and recalled where the sub-tree appears again.
+``ExpressionParser.explain`` shows the optimized form.
 """
 
 import math
+import operator
 import re
-from typing import Union
+import time
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+Number = Union[int, float]
+
+# Instruction opcodes
+CONST = 0
+NEG = 1
+BINARY = 2
+LOAD = 3
+CALL = 4
+STORE = 5
+RECALL = 6
+
+Instruction = Tuple[int, object]
+
+# Token kinds
+NUMBER = "number"
+NAME = "name"
+OPERATOR = "operator"
+LPAREN = "lparen"
+RPAREN = "rparen"
+COMMA = "comma"
+
+# Tokens are (kind, value, position) tuples; value is an int or float for
+# numbers and the source text otherwise, position is its offset in the source
+Token = Tuple[str, Union[int, float, str], int]
+
+# One match per token, including any whitespace before it. A single group-free
+# pattern lets findall build the token strings without per-match objects.
+_TOKEN_PATTERN = re.compile(r"\s*(?:[0-9.]+(?:[eE][-+]?[0-9]+)?|[A-Za-z_][A-Za-z0-9_]*|\*\*|\S)")
+
+# Token kind by first character
+_TOKEN_KINDS = dict.fromkeys("0123456789.", NUMBER)
+_TOKEN_KINDS.update(dict.fromkeys("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_", NAME))
+_TOKEN_KINDS.update(dict.fromkeys("+-*/^", OPERATOR))
+_TOKEN_KINDS.update({"(": LPAREN, ")": RPAREN, ",": COMMA})
+
+
+def _power(x: Number, y: Number) -> Number:
+    """Raise x to the power y, rejecting complex results"""
+    result = x ** y
+    if isinstance(result, complex):
+        raise ValueError("Negative base with non-integer exponent is not supported")
+    return result
+
+
+class Node:
+    """Base class of expression tree nodes"""
+
+    __slots__ = ()
+
+    @property
+    def children(self) -> tuple:
+        return ()
+
+    def instruction(self) -> Instruction:
+        """The instruction that evaluates this node once its children are on the stack"""
+        raise NotImplementedError
+
+    def signature(self, child_keys: list) -> tuple:
+        """Structural key of the node given the keys of its children"""
+        raise NotImplementedError
+
+    def with_children(self, children: list) -> "Node":
+        """Copy of the node with its children replaced"""
+        return self
+
+    def apply(self, values: list) -> Number:
+        """Compute the node's value from the values of its children"""
+        raise NotImplementedError
+
+    def __str__(self) -> str:
+        return walk(self, lambda node, parts: node._format(parts))
+
+
+class Constant(Node):
+    """Numeric literal or named constant"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Number):
+        self.value = value
+
+    def instruction(self) -> Instruction:
+        return (CONST, self.value)
+
+    def signature(self, child_keys: list) -> tuple:
+        value = self.value
+        # Keep 1 and 1.0, and 0.0 and -0.0, apart
+        sign = math.copysign(1.0, value) if isinstance(value, float) else 0
+        return (CONST, type(value), value, sign)
+
+    def _format(self, parts: list) -> str:
+        return repr(self.value)
+
+
+class Variable(Node):
+    """Named variable looked up at evaluation time"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def instruction(self) -> Instruction:
+        return (LOAD, self.name)
+
+    def signature(self, child_keys: list) -> tuple:
+        return (LOAD, self.name)
+
+    def _format(self, parts: list) -> str:
+        return self.name
+
+
+class Negate(Node):
+    """Unary minus"""
+
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: Node):
+        self.operand = operand
+
+    @property
+    def children(self) -> tuple:
+        return (self.operand,)
+
+    def instruction(self) -> Instruction:
+        return (NEG, None)
+
+    def signature(self, child_keys: list) -> tuple:
+        return (NEG, child_keys[0])
+
+    def with_children(self, children: list) -> Node:
+        return Negate(children[0])
+
+    def apply(self, values: list) -> Number:
+        return -values[0]
+
+    def _format(self, parts: list) -> str:
+        return f"(-{parts[0]})"
+
+
+class BinaryOp(Node):
+    """Binary operator applied to two operands"""
+
+    __slots__ = ("symbol", "func", "left", "right")
+
+    def __init__(self, symbol: str, func: Callable, left: Node, right: Node):
+        self.symbol = symbol
+        self.func = func
+        self.left = left
+        self.right = right
+
+    @property
+    def children(self) -> tuple:
+        return (self.left, self.right)
+
+    def instruction(self) -> Instruction:
+        return (BINARY, self.func)
+
+    def signature(self, child_keys: list) -> tuple:
+        return (BINARY, self.func, child_keys[0], child_keys[1])
+
+    def with_children(self, children: list) -> Node:
+        return BinaryOp(self.symbol, self.func, children[0], children[1])
+
+    def apply(self, values: list) -> Number:
+        return self.func(values[0], values[1])
+
+    def _format(self, parts: list) -> str:
+        return f"({parts[0]} {self.symbol} {parts[1]})"
+
+
+class Call(Node):
+    """Function call with any number of argument sub-trees"""
+
+    __slots__ = ("name", "func", "args")
+
+    def __init__(self, name: str, func: Callable, args: List[Node]):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+
+    @property
+    def children(self) -> tuple:
+        return self.args
+
+    def instruction(self) -> Instruction:
+        return (CALL, (self.func, len(self.args)))
+
+    def signature(self, child_keys: list) -> tuple:
+        return (CALL, self.func) + tuple(child_keys)
+
+    def with_children(self, children: list) -> Node:
+        return Call(self.name, self.func, children)
+
+    def apply(self, values: list) -> Number:
+        return self.func(*values)
+
+    def _format(self, parts: list) -> str:
+        return f"{self.name}({', '.join(parts)})"
+
+
+def walk(tree: Node, visit: Callable[[Node, list], object]):
+    """
+    Combine a tree bottom-up without recursion.
+
+    Deeply nested expressions (long generated sums) would exceed the
+    interpreter's recursion limit with a recursive traversal.
+
+    Args:
+        tree (Node): Root of the tree
+        visit (Callable[[Node, list], object]): Called with each node and
+            the results of its children, children before parents
+
+    Returns:
+        object: Result of visiting the root
+    """
+    results = []
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = node.children
+        if expanded or not children:
+            count = len(children)
+            if count:
+                values = results[-count:]
+                del results[-count:]
+            else:
+                values = []
+            results.append(visit(node, values))
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+    return results[0]
+
+
+def emit_instructions(tree: Node) -> List[Instruction]:
+    """
+    Compile a tree into a postfix instruction list.
+
+    Args:
+        tree (Node): Root of the tree
+
+    Returns:
+        List[Instruction]: Instructions in evaluation order
+    """
+    output = []
+    walk(tree, lambda node, parts: output.append(node.instruction()))
+    return output
+
+
+def count_operations(tree: Node) -> int:
+    """Count the operator and call nodes of a tree"""
+    return walk(tree, lambda node, counts: sum(counts) + 1 if counts else 0)
+
+
+def fold_constants(tree: Node, is_pure: Callable[[str], bool]) -> Tuple[Node, int]:
+    """
+    Replace sub-trees whose operands are all constants by their value.
+
+    A sub-tree that fails to evaluate (``1/0``) is left in place so the
+    error is still raised when the expression is evaluated.
+
+    Args:
+        tree (Node): Root of the tree
+        is_pure (Callable[[str], bool]): Whether a function may be called
+            at compile time
+
+    Returns:
+        Tuple[Node, int]: Folded tree and the number of operations folded
+    """
+    folded = [0]
+
+    def visit(node: Node, children: list) -> Node:
+        if not children:
+            return node
+        if any(new is not old for new, old in zip(children, node.children)):
+            node = node.with_children(children)
+        if not all(isinstance(child, Constant) for child in children):
+            return node
+        if isinstance(node, Call) and not is_pure(node.name):
+            return node
+        try:
+            value = node.apply([child.value for child in children])
+        except Exception:
+            return node
+        folded[0] += 1
+        return Constant(value)
+
+    return walk(tree, visit), folded[0]
+
+
+def specialize_calls(tree: Node, kernel: Callable[[str], Optional[Callable]]) -> Node:
+    """
+    Call unchecked kernels where arguments are known to be numbers.
+
+    A sub-tree is known to produce an int or float when its leaves are int
+    or float constants and calls of functions that have a kernel (which
+    validate their arguments and return numbers); variables may hold any
+    type. Calls whose arguments are all known numbers skip the validation.
+
+    Args:
+        tree (Node): Root of the tree
+        kernel (Callable[[str], Optional[Callable]]): Kernel of a function
+            by name, or None if it has none
+
+    Returns:
+        Node: Tree calling kernels where possible
+    """
+    def visit(node: Node, children: list) -> Tuple[Node, bool]:
+        if not children:
+            return node, type(node) is Constant and type(node.value) in (int, float)
+        numeric = all(known for _, known in children)
+        nodes = [child for child, _ in children]
+        if any(new is not old for new, old in zip(nodes, node.children)):
+            node = node.with_children(nodes)
+        if isinstance(node, Call):
+            func = kernel(node.name)
+            if func is None:
+                return node, False
+            if numeric:
+                node = Call(node.name, func, nodes)
+            # Validated or not, the call returns a number
+            return node, True
+        return node, numeric
+
+    return walk(tree, visit)[0]
+
+
+def _structure_keys(tree: Node, is_pure: Callable[[str], bool]) -> Dict[int, int]:
+    """
+    Number the distinct sub-tree structures of a tree.
+
+    Returns:
+        Dict[int, int]: Structure number for each node, keyed by ``id(node)``
+    """
+    numbers = {}
+    keys = {}
+
+    def visit(node: Node, child_keys: list) -> int:
+        if isinstance(node, Call) and not is_pure(node.name):
+            # Every call to an impure function is distinct
+            signature = (CALL, id(node))
+        else:
+            signature = node.signature(child_keys)
+        key = numbers.setdefault(signature, len(numbers))
+        keys[id(node)] = key
+        return key
+
+    walk(tree, visit)
+    return keys
+
+
+def _schedule(tree: Node, keys: Dict[int, int]) -> Iterator[Tuple[Node, bool]]:
+    """
+    Yield nodes in evaluation order.
+
+    A node whose structure was already computed is yielded with True and
+    its children are skipped.
+    """
+    computed = set()
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        children = node.children
+        key = keys[id(node)]
+        if expanded or not children:
+            computed.add(key)
+            yield node, False
+        elif key in computed:
+            yield node, True
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+
+
+def emit_shared_instructions(tree: Node, is_pure: Callable[[str], bool],
+                             listing: Optional[List[str]] = None) -> Tuple[List[Instruction], int]:
+    """
+    Compile a tree, evaluating repeated sub-trees only once.
+
+    The first occurrence of a repeated sub-tree is followed by a STORE into
+    a temporary slot; later occurrences become a single RECALL.
+
+    Args:
+        tree (Node): Root of the tree
+        is_pure (Callable[[str], bool]): Whether calls to a function may be shared
+        listing (Optional[List[str]]): If given, receives a readable line
+            per instruction
+
+    Returns:
+        Tuple[List[Instruction], int]: Instructions and number of slots used
+    """
+    keys = _structure_keys(tree, is_pure)
+    shared = {keys[id(node)] for node, recalled in _schedule(tree, keys) if recalled}
+    output = []
+    slots = {}
+    for node, recalled in _schedule(tree, keys):
+        key = keys[id(node)]
+        if recalled:
+            output.append((RECALL, slots[key]))
+            if listing is not None:
+                listing.append(f"RECALL t{slots[key]}")
+            continue
+        output.append(node.instruction())
+        if listing is not None:
+            listing.append(_describe(node))
+        if key in shared:
+            slot = slots[key] = len(slots)
+            output.append((STORE, slot))
+            if listing is not None:
+                listing.append(f"STORE t{slot}")
+    return output, len(slots)
+
+
+def _describe(node: Node) -> str:
+    """Readable form of the instruction a node compiles to"""
+    if isinstance(node, Constant):
+        return f"CONST {node.value!r}"
+    if isinstance(node, Variable):
+        return f"LOAD {node.name}"
+    if isinstance(node, Negate):
+        return "NEG"
+    if isinstance(node, BinaryOp):
+        return f"BINARY {node.symbol}"
+    return f"CALL {node.name}/{len(node.args)}"
+
+
+class OptimizationReport:
+    """Result of optimizing an expression, for debugging"""
+
+    def __init__(self, source: str, original: str, optimized: str, listing: List[str],
+                 operations_before: int, operations_after: int,
+                 constants_folded: int, subexpressions_shared: int):
+        self.source = source
+        self.original = original
+        self.optimized = optimized
+        self.listing = listing
+        self.operations_before = operations_before
+        self.operations_after = operations_after
+        self.constants_folded = constants_folded
+        self.subexpressions_shared = subexpressions_shared
+
+    @property
+    def operations_saved(self) -> int:
+        """Operations no longer performed per evaluation"""
+        return self.operations_before - self.operations_after
+
+    def __str__(self) -> str:
+        lines = [
+            f"expression: {self.source}",
+            f"parsed:     {self.original}",
+            f"optimized:  {self.optimized}",
+            f"operations: {self.operations_before} -> {self.operations_after} "
+            f"(saved {self.operations_saved}; {self.constants_folded} folded, "
+            f"{self.subexpressions_shared} shared sub-expressions)",
+            "instructions:",
+        ]
+        lines.extend("  " + line for line in self.listing)
+        return "\n".join(lines)
+
+
+class CompiledExpression:
+    """Compiled, reusable form of a mathematical expression"""
+
+    __slots__ = ("source", "instructions", "tree", "slots")
+
+    def __init__(self, source: str, instructions: List[Instruction], tree: Optional[Node] = None,
+                 slots: int = 0):
+        self.source = source
+        self.instructions = tuple(instructions)
+        self.tree = tree
+        # Temporaries holding shared sub-expression values
+        self.slots = slots
+
+    def evaluate(self, variables: Optional[Mapping[str, Number]] = None) -> Number:
+        """
+        Evaluate the compiled instruction list.
+
+        Args:
+            variables (Optional[Mapping[str, Number]]): Values for the
+                variable names the expression was compiled against
+
+        Returns:
+            Number: Result of the evaluation
+
+        Raises:
+            KeyError: If a variable has no value
+        """
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        temps = [None] * self.slots if self.slots else None
+        for opcode, arg in self.instructions:
+            if opcode == CONST:
+                push(arg)
+            elif opcode == BINARY:
+                b = pop()
+                stack[-1] = arg(stack[-1], b)
+            elif opcode == LOAD:
+                push(variables[arg])
+            elif opcode == CALL:
+                func, argc = arg
+                if argc == 1:
+                    stack[-1] = func(stack[-1])
+                else:
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                    push(func(*args))
+            elif opcode == NEG:
+                stack[-1] = -stack[-1]
+            elif opcode == STORE:
+                temps[arg] = stack[-1]
+            else:
+                push(temps[arg])
+        return stack[0]
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r})"
 
 
 class ExpressionParser:
     """Parser for mathematical expressions"""
-    
-    def __init__(self):
+
+    def __init__(self, functions: Optional[Mapping[str, Callable]] = None):
         self.operators = {
-            '+': (1, lambda x, y: x + y),
-            '-': (1, lambda x, y: x - y),
-            '*': (2, lambda x, y: x * y),
-            '/': (2, lambda x, y: x / y),
-            '^': (3, lambda x, y: x ** y),
-            '**': (3, lambda x, y: x ** y)
+            '+': (1, operator.add),
+            '-': (1, operator.sub),
+            '*': (2, operator.mul),
+            '/': (2, operator.truediv),
+            '^': (3, _power),
+            '**': (3, _power)
+        }
+        self.right_associative = {'^', '**'}
+        # Unary minus binds tighter than * and / but looser than ^
+        self.unary_precedence = 2.5
+        self.constants = {
+            'pi': math.pi,
+            'e': math.e
         }
-    
+        # Any name -> callable mapping; kept by reference so functions
+        # registered later become available
+        self.functions = functions if functions is not None else {}
+        # Evaluate constant sub-trees at compile time
+        self.fold_constants = True
+        # Read non-integer literals as exact Decimals instead of floats
+        self.decimal_literals = False
+        # Optional core.cost_guard.CostGuard checking trees before they are
+        # folded or evaluated
+        self.cost_guard = None
+        # Optional callable rewriting checked trees before they are folded,
+        # such as core.rationals.use_rationals
+        self.rewrite = None
+        # Optional core.instrumentation.Instrumentation timing each stage
+        self.instrumentation = None
+
     def parse_and_evaluate(self, expression: str) -> float:
         """
         Parse and evaluate a mathematical expression.
-        
+
         Args:
             expression (str): Mathematical expression to evaluate
-            
+
         Returns:
             float: Result of the evaluation
         """
-        # Replace constants
-        expression = expression.replace('pi', str(math.pi))
-        expression = expression.replace('e', str(math.e))
-        
-        # Handle implicit multiplication (e.g., 2pi -> 2*pi)
-        expression = re.sub(r'(\d)([a-z])', r'\1*\2', expression)
-        expression = re.sub(r'([a-z])(\d)', r'\1*\2', expression)
-        
-        # Convert to postfix notation and evaluate
+        return self.compile(expression).evaluate()
+
+    def parse(self, expression: str, variables: Iterable[str] = ()) -> Node:
+        """
+        Parse an expression into a tree.
+
+        Args:
+            expression (str): Mathematical expression to parse
+            variables (Iterable[str]): Names to parse as variables
+
+        Returns:
+            Node: Root of the expression tree
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self._build_tree(self._tokenize(expression), frozenset(variables))
+        start = time.perf_counter_ns()
+        tokens = self._tokenize(expression)
+        tokenized = time.perf_counter_ns()
+        tree = self._build_tree(tokens, frozenset(variables))
+        instrumentation.record("tokenize", tokenized - start)
+        instrumentation.record("parse", time.perf_counter_ns() - tokenized)
+        return tree
+
+    def free_variables(self, expression: str) -> frozenset:
+        """
+        Find the names an expression would read as variables.
+
+        These are the identifiers that are neither function calls nor
+        constants.
+
+        Args:
+            expression (str): Mathematical expression
+
+        Returns:
+            frozenset: Variable names used by the expression
+
+        Raises:
+            ValueError: If the expression cannot be tokenized
+        """
         tokens = self._tokenize(expression)
-        postfix = self._infix_to_postfix(tokens)
-        return self._evaluate_postfix(postfix)
-    
-    def _tokenize(self, expression: str) -> list:
-        """Tokenize the expression"""
-        # Remove spaces
-        expression = expression.replace(' ', '')
-        
-        # Split into tokens
+        names = set()
+        for i, (kind, value, _) in enumerate(tokens):
+            if kind != NAME or value in self.constants:
+                continue
+            if value in self.functions and i + 1 < len(tokens) and tokens[i+1][0] == LPAREN:
+                continue
+            names.add(value)
+        return frozenset(names)
+
+    def compile(self, expression: str, variables: Iterable[str] = (),
+                optimize: bool = True) -> CompiledExpression:
+        """
+        Parse an expression and compile its tree into a reusable instruction list.
+
+        Args:
+            expression (str): Mathematical expression to compile
+            variables (Iterable[str]): Names to compile as variable lookups
+            optimize (bool): Fold constants and share repeated sub-expressions
+
+        Returns:
+            CompiledExpression: Compiled form of the expression
+
+        Raises:
+            ValueError: If the expression is malformed, or over the cost
+                guard's limits
+        """
+        # Specialize first so the cost guard wraps the functions actually called
+        tree = self._specialize(self.parse(expression, variables))
+        instrumentation = self.instrumentation
+        start = time.perf_counter_ns() if instrumentation is not None else 0
+        if self.cost_guard is not None:
+            compiled = self.cost_guard.compile(
+                expression, tree, lambda tree: self._compile_tree(expression, tree, optimize))
+        else:
+            compiled = self._compile_tree(expression, tree, optimize)
+        if instrumentation is not None:
+            instrumentation.record("compile", time.perf_counter_ns() - start)
+        return compiled
+
+    def explain(self, expression: str, variables: Iterable[str] = ()) -> OptimizationReport:
+        """
+        Show how an expression is optimized.
+
+        Args:
+            expression (str): Mathematical expression to compile
+            variables (Iterable[str]): Names to compile as variable lookups
+
+        Returns:
+            OptimizationReport: Parsed and optimized forms, the instruction
+            listing and the number of operations saved
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        parsed = self._specialize(self.parse(expression, variables))
+        if self.cost_guard is not None:
+            parsed = self.cost_guard.review(parsed)
+        if self.rewrite is not None:
+            parsed = self.rewrite(parsed)
+        tree, folded = self._fold(parsed)
+        listing = []
+        instructions, slots = emit_shared_instructions(tree, self._is_pure, listing)
+        after = sum(1 for opcode, _ in instructions if opcode in (NEG, BINARY, CALL))
+        before = count_operations(parsed)
+        return OptimizationReport(expression, str(parsed), str(tree), listing,
+                                  before, after, folded, slots)
+
+    def _compile_tree(self, expression: str, tree: Node, optimize: bool) -> CompiledExpression:
+        """Optimize a specialized tree and emit its instructions"""
+        if self.rewrite is not None:
+            tree = self.rewrite(tree)
+        if not optimize:
+            return CompiledExpression(expression, emit_instructions(tree), tree)
+        tree, _ = self._fold(tree)
+        instructions, slots = emit_shared_instructions(tree, self._is_pure)
+        return CompiledExpression(expression, instructions, tree, slots)
+
+    def _specialize(self, tree: Node) -> Node:
+        """Call kernels where the function mapping provides them"""
+        kernel = getattr(self.functions, "kernel", None)
+        if kernel is None:
+            return tree
+        return specialize_calls(tree, kernel)
+
+    def _fold(self, tree: Node) -> Tuple[Node, int]:
+        """Fold constant sub-trees if enabled"""
+        if not self.fold_constants:
+            return tree, 0
+        return fold_constants(tree, self._is_pure)
+
+    def _is_pure(self, name: str) -> bool:
+        """Check whether a function always returns the same value for the same arguments"""
+        is_pure = getattr(self.functions, "is_pure", None)
+        # Calls introduced by a rewrite are pure
+        return is_pure is None or name not in self.functions or is_pure(name)
+
+    def _tokenize(self, expression: str) -> List[Token]:
+        """
+        Split the expression into typed tokens in a single regex pass.
+
+        Raises:
+            ValueError: On a malformed number or an invalid character
+        """
         tokens = []
-        i = 0
-        while i < len(expression):
-            if expression[i].isdigit() or expression[i] == '.':
-                # Number
-                num = ''
-                while i < len(expression) and (expression[i].isdigit() or expression[i] == '.'):
-                    num += expression[i]
-                    i += 1
-                tokens.append(float(num))
-            elif expression[i] in '+-*/^()':
-                # Operator or parenthesis
-                if expression[i] == '*' and i + 1 < len(expression) and expression[i+1] == '*':
-                    tokens.append('**')
-                    i += 2
-                else:
-                    tokens.append(expression[i])
-                    i += 1
-            elif expression[i].isalpha():
-                # Function or variable
-                func = ''
-                while i < len(expression) and expression[i].isalpha():
-                    func += expression[i]
-                    i += 1
-                tokens.append(func)
+        append = tokens.append
+        kinds = _TOKEN_KINDS
+        real = Decimal if self.decimal_literals else float
+        end = 0
+        for text in _TOKEN_PATTERN.findall(expression):
+            position = end
+            end += len(text)
+            kind = kinds.get(text[0])
+            if kind is None and text[0].isspace():
+                text = text.lstrip()
+                position = end - len(text)
+                kind = kinds.get(text[0])
+            if kind == NUMBER:
+                try:
+                    value = int(text) if text.isdigit() else real(text)
+                except (ValueError, ArithmeticError):
+                    raise ValueError(f"Invalid number: {text} (at position {position})") from None
+                append((NUMBER, value, position))
+            elif kind is None:
+                raise ValueError(f"Invalid character in expression: {text} (at position {position})")
             else:
-                i += 1
-                
+                append((kind, text, position))
         return tokens
-    
-    def _infix_to_postfix(self, tokens: list) -> list:
-        """Convert infix notation to postfix notation"""
+
+    def _build_tree(self, tokens: List[Token], variables: frozenset = frozenset()) -> Node:
+        """Build an expression tree from infix tokens (shunting-yard)"""
         output = []
         operator_stack = []
-        
-        for token in tokens:
-            if isinstance(token, (int, float)):
-                output.append(token)
-            elif token in self.operators:
-                while (operator_stack and 
-                       operator_stack[-1] != '(' and
-                       operator_stack[-1] in self.operators and
-                       self.operators[operator_stack[-1]][0] >= self.operators[token][0]):
-                    output.append(operator_stack.pop())
-                operator_stack.append(token)
-            elif token == '(':
-                operator_stack.append(token)
-            elif token == ')':
+        arg_counts = []
+        expect_operand = True
+        calling = False
+
+        for i, (kind, value, position) in enumerate(tokens):
+            if calling:
+                # Opening parenthesis of a function call
+                calling = False
+                operator_stack.append('(')
+                arg_counts.append(1)
+                continue
+            if kind == NUMBER or kind == NAME or kind == LPAREN:
+                if not expect_operand:
+                    # Implicit multiplication only follows a number ("2pi", "2(3+1)")
+                    # or joins parentheses ("(1+2)(3+4)"); "2 3" is a missing operator
+                    previous = tokens[i-1][0]
+                    if not (previous == NUMBER and kind != NUMBER
+                            or previous == RPAREN and kind == LPAREN):
+                        raise ValueError(f"Invalid expression: missing operator before "
+                                         f"'{value}' (at position {position})")
+                    self._push_operator('*', operator_stack, output)
+                expect_operand = True
+                if kind == LPAREN:
+                    operator_stack.append('(')
+                    continue
+                if kind == NAME:
+                    name = value
+                    followed_by_paren = i + 1 < len(tokens) and tokens[i+1][0] == LPAREN
+                    if name in variables:
+                        output.append(Variable(name))
+                    elif followed_by_paren and name in self.functions:
+                        operator_stack.append(('call', name, position))
+                        calling = True
+                        continue
+                    elif name in self.constants:
+                        output.append(Constant(self.constants[name]))
+                    elif followed_by_paren:
+                        raise ValueError(f"Unknown function: {name} (at position {position})")
+                    else:
+                        raise ValueError(f"Unknown identifier: {name} (at position {position})")
+                else:
+                    output.append(Constant(value))
+                expect_operand = False
+            elif kind == RPAREN or kind == COMMA:
+                if expect_operand:
+                    raise ValueError(f"Invalid expression: unexpected '{value}' "
+                                     f"(at position {position})")
                 while operator_stack and operator_stack[-1] != '(':
-                    output.append(operator_stack.pop())
-                if operator_stack:
-                    operator_stack.pop()  # Remove '('
-        
+                    self._reduce(operator_stack.pop(), output)
+                if not operator_stack:
+                    if kind == COMMA:
+                        raise ValueError("Unexpected comma outside of function call "
+                                         f"(at position {position})")
+                    raise ValueError(f"Mismatched parentheses (at position {position})")
+                in_call = len(operator_stack) > 1 and isinstance(operator_stack[-2], tuple)
+                if kind == COMMA:
+                    if not in_call:
+                        raise ValueError("Unexpected comma outside of function call "
+                                         f"(at position {position})")
+                    arg_counts[-1] += 1
+                    expect_operand = True
+                    continue
+                operator_stack.pop()  # Remove '('
+                if in_call:
+                    _, name, call_position = operator_stack.pop()
+                    argc = arg_counts.pop()
+                    accepts = getattr(self.functions, "accepts", None)
+                    if accepts is not None and not accepts(name, argc):
+                        raise ValueError(f"Wrong number of arguments for {name}: {argc} "
+                                         f"(at position {call_position})")
+                    args = output[-argc:]
+                    del output[-argc:]
+                    output.append(Call(name, self.functions[name], args))
+            else:
+                symbol = value
+                if expect_operand:
+                    if symbol == '-':
+                        operator_stack.append('neg')
+                    elif symbol != '+':
+                        raise ValueError(f"Invalid expression: unexpected '{symbol}' "
+                                         f"(at position {position})")
+                else:
+                    self._push_operator(symbol, operator_stack, output)
+                    expect_operand = True
+
+        if expect_operand:
+            raise ValueError("Invalid expression: unexpected end of input")
+
         while operator_stack:
-            output.append(operator_stack.pop())
-            
-        return output
-    
-    def _evaluate_postfix(self, postfix: list) -> float:
-        """Evaluate postfix expression"""
-        stack = []
-        
-        for token in postfix:
-            if isinstance(token, (int, float)):
-                stack.append(token)
-            elif token in self.operators:
-                if len(stack) < 2:
-                    raise ValueError("Invalid expression")
-                b = stack.pop()
-                a = stack.pop()
-                result = self.operators[token][1](a, b)
-                stack.append(result)
+            token = operator_stack.pop()
+            if token == '(':
+                raise ValueError("Mismatched parentheses")
+            self._reduce(token, output)
+
+        return output[0]
+
+    def _precedence(self, token: str) -> float:
+        """Get the binding precedence of a stacked operator"""
+        if token == 'neg':
+            return self.unary_precedence
+        return self.operators[token][0]
+
+    def _push_operator(self, token: str, operator_stack: list, output: list):
+        """Push a binary operator, reducing operators that bind tighter"""
+        precedence = self.operators[token][0]
+        right = token in self.right_associative
+        while operator_stack and operator_stack[-1] != '(':
+            top = self._precedence(operator_stack[-1])
+            if top > precedence or (top == precedence and not right):
+                self._reduce(operator_stack.pop(), output)
             else:
-                raise ValueError(f"Unknown token: {token}")
-                
-        if len(stack) != 1:
-            raise ValueError("Invalid expression")
-            
-        return stack[0]
\ No newline at end of file
+                break
+        operator_stack.append(token)
+
+    def _reduce(self, token: str, output: list):
+        """Replace the operands of a stacked operator with its node"""
+        if token == 'neg':
+            output[-1] = Negate(output[-1])
+            return
+        right = output.pop()
+        output[-1] = BinaryOp(token, self.operators[token][1], output[-1], right)
+
+    def _evaluate_postfix(self, postfix: List[Instruction]) -> float:
+        """Evaluate postfix expression"""
+        return CompiledExpression("", postfix).evaluate()
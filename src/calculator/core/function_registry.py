@@ -0,0 +1,278 @@
+"""
+Function Registry
+Table of named calculator functions shared by the controller, the
+expression parser and the GUI.
+
+Each entry records the callable, how many arguments it takes, how arguments
+are coerced and whether it takes or returns an angle. Lookups are
+dictionary based, and new functions can be plugged in with ``register``
+without touching any dispatch code.
+"""
+
+import sys
+import os
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import functools
+from modules.trigonometry import sin, cos, tan, asin, acos, atan, sinh, cosh, tanh, KERNELS as TRIGONOMETRY_KERNELS
+from modules.logarithms import ln, log10, log2, log, KERNELS as LOGARITHM_KERNELS
+from modules.powers import power, sqrt, cbrt, exp, square, cube, reciprocal, KERNELS as POWER_KERNELS
+from modules.factorials import factorial, double_factorial, gamma, log_factorial, binomial, permutations
+
+Arity = Union[int, Tuple[int, int]]
+
+
+def _angle_unit(degrees: bool, gradians: bool) -> Dict[str, bool]:
+    """Keyword arguments selecting the angle unit of an angle-mode function"""
+    return {"gradians": True} if gradians else {"degrees": degrees}
+
+
+class FunctionSpec:
+    """Description of one registered function"""
+
+    __slots__ = ("name", "func", "min_args", "max_args", "coerce", "angle_mode", "pure", "kernel")
+
+    def __init__(self, name: str, func: Callable, arity: Arity = 1,
+                 coerce: Optional[Callable] = None, angle_mode: bool = False,
+                 pure: bool = True, kernel: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        if isinstance(arity, tuple):
+            self.min_args, self.max_args = arity
+        else:
+            self.min_args = self.max_args = arity
+        self.coerce = coerce
+        self.angle_mode = angle_mode
+        # Pure functions may be folded and shared by the expression optimizer
+        self.pure = pure
+        # func without argument validation, for arguments known to be numbers
+        self.kernel = kernel
+
+    def accepts(self, argc: int) -> bool:
+        """Check whether the function can be called with argc arguments"""
+        return self.min_args <= argc <= self.max_args
+
+    def bind(self, degrees: bool = True, gradians: bool = False) -> Callable:
+        """
+        Build a plain callable with argument coercion and angle mode applied.
+
+        Args:
+            degrees (bool): Angle unit passed to angle-mode functions
+            gradians (bool): Pass ``gradians=True`` instead of ``degrees=``
+
+        Returns:
+            Callable: Function taking the evaluated arguments
+        """
+        func = self.func
+        coerce = self.coerce
+        if self.angle_mode:
+            unit = _angle_unit(degrees, gradians)
+            if coerce is None:
+                return functools.partial(func, **unit)
+            return lambda *args: func(*map(coerce, args), **unit)
+        if coerce is None:
+            return func
+        return lambda *args: func(*map(coerce, args))
+
+    def bind_kernel(self, degrees: bool = True, gradians: bool = False) -> Optional[Callable]:
+        """
+        Build a plain callable from the unchecked kernel, if there is one.
+
+        Args:
+            degrees (bool): Angle unit passed to angle-mode functions
+            gradians (bool): Pass ``gradians=True`` instead of ``degrees=``
+
+        Returns:
+            Optional[Callable]: Kernel taking int or float arguments, or None
+        """
+        kernel = self.kernel
+        if kernel is None or self.coerce is not None:
+            return None
+        if self.angle_mode:
+            return functools.partial(kernel, **_angle_unit(degrees, gradians))
+        return kernel
+
+    def __repr__(self) -> str:
+        return f"FunctionSpec({self.name!r})"
+
+
+class FunctionRegistry:
+    """Registry mapping function names to their specifications"""
+
+    def __init__(self):
+        self._specs: Dict[str, FunctionSpec] = {}
+        # Incremented on every change so dependants can drop stale compiled forms
+        self.version = 0
+
+    def register(self, name: str, func: Optional[Callable] = None, arity: Arity = 1,
+                 coerce: Optional[Callable] = None, angle_mode: bool = False,
+                 pure: bool = True, kernel: Optional[Callable] = None):
+        """
+        Register a function, replacing any existing one with the same name.
+
+        Can also be used as a decorator: ``@registry.register("sec")``.
+
+        Args:
+            name (str): Name used in expressions
+            func (Optional[Callable]): Implementation
+            arity (Arity): Number of arguments, or a (min, max) range
+            coerce (Optional[Callable]): Conversion applied to each argument
+            angle_mode (bool): If True, the function receives ``degrees=``
+                (``gradians=True`` in gradian mode)
+            pure (bool): False for functions whose result may change between
+                calls with the same arguments (e.g. random numbers)
+            kernel (Optional[Callable]): Same function without argument
+                validation, called by compiled expressions when the arguments
+                are known to be ints or floats
+
+        Returns:
+            FunctionSpec or decorator
+        """
+        if func is None:
+            def decorator(f: Callable) -> Callable:
+                self.register(name, f, arity, coerce, angle_mode, pure, kernel)
+                return f
+            return decorator
+        if not (name[0].isalpha() or name[0] == "_") or not all(c.isalnum() or c == "_" for c in name):
+            raise ValueError(f"Invalid function name: {name}")
+        spec = FunctionSpec(name, func, arity, coerce, angle_mode, pure, kernel)
+        self._specs[name] = spec
+        self.version += 1
+        return spec
+
+    def unregister(self, name: str):
+        """Remove a registered function"""
+        del self._specs[name]
+        self.version += 1
+
+    def get(self, name: str) -> Optional[FunctionSpec]:
+        """Look up a function specification by name"""
+        return self._specs.get(name)
+
+    def copy(self) -> "FunctionRegistry":
+        """Create an independent registry with the same functions"""
+        registry = FunctionRegistry()
+        registry._specs = dict(self._specs)
+        return registry
+
+    def bound(self, degrees: bool = True, gradians: bool = False) -> "BoundFunctions":
+        """Get a name -> callable view for the expression parser"""
+        return BoundFunctions(self, degrees, gradians)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+
+class BoundFunctions:
+    """Live name -> callable view of a registry with angle mode applied"""
+
+    __slots__ = ("registry", "degrees", "gradians", "_bound", "_kernels", "_version")
+
+    def __init__(self, registry: FunctionRegistry, degrees: bool = True, gradians: bool = False):
+        self.registry = registry
+        self.degrees = degrees and not gradians
+        self.gradians = gradians
+        self._bound: Dict[str, Callable] = {}
+        self._kernels: Dict[str, Optional[Callable]] = {}
+        self._version = registry.version
+
+    def accepts(self, name: str, argc: int) -> bool:
+        """Check the arity of a registered function"""
+        return self.registry._specs[name].accepts(argc)
+
+    def is_pure(self, name: str) -> bool:
+        """Check whether a registered function may be folded and shared"""
+        return self.registry._specs[name].pure
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.registry._specs
+
+    def kernel(self, name: str) -> Optional[Callable]:
+        """Get the unchecked kernel of a registered function, if it has one"""
+        self._check_version()
+        try:
+            return self._kernels[name]
+        except KeyError:
+            kernel = self._kernels[name] = self.registry._specs[name].bind_kernel(self.degrees, self.gradians)
+            return kernel
+
+    def __getitem__(self, name: str) -> Callable:
+        self._check_version()
+        try:
+            return self._bound[name]
+        except KeyError:
+            bound = self._bound[name] = self.registry._specs[name].bind(self.degrees, self.gradians)
+            return bound
+
+    def _check_version(self):
+        """Drop bound callables if the registry changed"""
+        if self._version != self.registry.version:
+            self._bound.clear()
+            self._kernels.clear()
+            self._version = self.registry.version
+
+
+def _to_int(value) -> int:
+    """Coerce an evaluated argument to an integer"""
+    return int(value)
+
+
+# Public module functions -> their unchecked kernels
+_KERNELS = {**TRIGONOMETRY_KERNELS, **LOGARITHM_KERNELS, **POWER_KERNELS}
+
+default_registry = FunctionRegistry()
+
+default_registry.register("sin", sin, angle_mode=True, kernel=_KERNELS[sin])
+default_registry.register("cos", cos, angle_mode=True, kernel=_KERNELS[cos])
+default_registry.register("tan", tan, angle_mode=True, kernel=_KERNELS[tan])
+default_registry.register("asin", asin, angle_mode=True, kernel=_KERNELS[asin])
+default_registry.register("acos", acos, angle_mode=True, kernel=_KERNELS[acos])
+default_registry.register("atan", atan, angle_mode=True, kernel=_KERNELS[atan])
+default_registry.register("sinh", sinh, kernel=_KERNELS[sinh])
+default_registry.register("cosh", cosh, kernel=_KERNELS[cosh])
+default_registry.register("tanh", tanh, kernel=_KERNELS[tanh])
+default_registry.register("ln", ln, kernel=_KERNELS[ln])
+default_registry.register("log10", log10, kernel=_KERNELS[log10])
+default_registry.register("log2", log2, kernel=_KERNELS[log2])
+default_registry.register("log", log, arity=(1, 2), kernel=_KERNELS[log])
+default_registry.register("exp", exp, kernel=_KERNELS[exp])
+default_registry.register("sqrt", sqrt, kernel=_KERNELS[sqrt])
+default_registry.register("cbrt", cbrt, kernel=_KERNELS[cbrt])
+default_registry.register("factorial", factorial, coerce=_to_int)
+default_registry.register("double_factorial", double_factorial, coerce=_to_int)
+default_registry.register("gamma", gamma)
+default_registry.register("log_factorial", log_factorial)
+default_registry.register("binomial", binomial, arity=2, coerce=_to_int)
+default_registry.register("permutations", permutations, arity=2, coerce=_to_int)
+default_registry.register("square", square, kernel=_KERNELS[square])
+default_registry.register("cube", cube, kernel=_KERNELS[cube])
+default_registry.register("power", power, arity=2, kernel=_KERNELS[power])
+default_registry.register("reciprocal", reciprocal, kernel=_KERNELS[reciprocal])
+
+
+def register_function(name: str, func: Optional[Callable] = None, arity: Arity = 1,
+                      coerce: Optional[Callable] = None, angle_mode: bool = False,
+                      pure: bool = True, kernel: Optional[Callable] = None):
+    """
+    Register a function in the default registry used by new controllers.
+
+    Args:
+        name (str): Name used in expressions
+        func (Optional[Callable]): Implementation (omit to use as a decorator)
+        arity (Arity): Number of arguments, or a (min, max) range
+        coerce (Optional[Callable]): Conversion applied to each argument
+        angle_mode (bool): If True, the function receives ``degrees=``
+            (``gradians=True`` in gradian mode)
+        pure (bool): False if the result may change between identical calls
+        kernel (Optional[Callable]): Same function without argument validation
+    """
+    return default_registry.register(name, func, arity, coerce, angle_mode, pure, kernel)
@@ -1,61 +1,457 @@
 """
 History Manager
 Manages calculation history.
+
+History is stored as an append-only JSON Lines log: each entry is one
+``[expression, result]`` record appended to the file, so adding an entry
+costs the same regardless of how long the history is. Writes are fsynced in
+batches, a truncated last line left by a crash is dropped on load, and the
+log is compacted in the background once it holds too many stale records.
+
+Entries are not held in memory. The log is memory-mapped and a compact
+array of record offsets is built on load, so entries are decoded only when
+they are read through ``get_history(start, stop)``, ``last(n)`` or indexing.
+
+If the log cannot be written, the manager keeps the history in memory
+instead, and writes it out again on the next successful ``save_history``.
 """
 
-from typing import List, Tuple
+from array import array
+from typing import BinaryIO, List, Optional, Tuple, Union
 import json
+import mmap
 import os
+import tempfile
+import threading
+import time
+
+# Default log file, and the single-list JSON file used before it
+DEFAULT_HISTORY_FILE = "calculator_history.jsonl"
+LEGACY_HISTORY_FILE = "calculator_history.json"
 
 
 class HistoryManager:
     """Manager for calculation history"""
-    
-    def __init__(self, history_file: str = "calculator_history.json"):
+
+    def __init__(self, history_file: str = DEFAULT_HISTORY_FILE,
+                 max_entries: Optional[int] = None, sync_every: int = 32,
+                 sync_interval: float = 1.0):
+        """
+        Args:
+            history_file (str): Path of the JSON Lines history log; with the
+                default name, a legacy calculator_history.json next to it is
+                migrated if the log does not exist yet
+            max_entries (Optional[int]): Keep only the most recent entries
+                (None keeps everything)
+            sync_every (int): fsync after this many appended entries
+            sync_interval (float): fsync when this many seconds have passed
+                since the last sync
+        """
         self.history_file = history_file
-        self.history: List[Tuple[str, str]] = []  # List of (expression, result) tuples
+        self.max_entries = max_entries
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._lock = threading.RLock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compactor: Optional[threading.Thread] = None
+        # Byte offset where each record starts, and where the last one ends
+        self._offsets = array("Q")
+        self._end = 0
+        # Index of the first live record (earlier ones are trimmed)
+        self._first = 0
+        # Live entries once writing the log has failed, otherwise None
+        self._memory: Optional[List[Tuple[str, str]]] = None
+        # Bumped whenever the file is replaced, so a stale compaction aborts
+        self._generation = 0
+        self._reader = None
+        self._map = None
+        self._mapped_size = 0
         self.load_history()
-    
+
     def add_entry(self, expression: str, result: str):
         """
         Add an entry to the history.
-        
+
         Args:
             expression (str): The mathematical expression
             result (str): The result of the expression
         """
-        self.history.append((expression, result))
-        self.save_history()
-    
-    def get_history(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            self._append_record((expression, result))
+            if self.max_entries is not None and len(self) > self.max_entries:
+                if self._memory is not None:
+                    del self._memory[:-self.max_entries]
+                else:
+                    self._first = len(self._offsets) - self.max_entries
+        self._maybe_compact()
+
+    def get_history(self, start: Optional[int] = None,
+                    stop: Optional[int] = None) -> List[Tuple[str, str]]:
         """
-        Get the calculation history.
-        
+        Get the calculation history, or a slice of it.
+
+        Only the requested entries are decoded.
+
+        Args:
+            start (Optional[int]): First entry to return (negative counts from the end)
+            stop (Optional[int]): Entry to stop before (negative counts from the end)
+
         Returns:
             List[Tuple[str, str]]: List of (expression, result) tuples
         """
-        return self.history.copy()
-    
+        with self._lock:
+            first, last, _ = slice(start, stop).indices(len(self))
+            return [self._read(self._first + index) for index in range(first, last)]
+
+    def last(self, n: int) -> List[Tuple[str, str]]:
+        """
+        Get the n most recent entries, oldest first.
+
+        Args:
+            n (int): Number of entries
+
+        Returns:
+            List[Tuple[str, str]]: List of (expression, result) tuples
+        """
+        if n <= 0:
+            return []
+        return self.get_history(-n)
+
     def clear_history(self):
         """Clear the calculation history"""
-        self.history.clear()
-        self.save_history()
-    
+        with self._lock:
+            if self._memory is not None:
+                self._memory.clear()
+            else:
+                self._first = len(self._offsets)
+            self.save_history()
+
     def save_history(self):
-        """Save history to file"""
+        """Rewrite the history file so it holds exactly the current entries"""
+        with self._lock:
+            if self._memory is not None:
+                self._save_memory()
+            else:
+                self._rewrite(self._first, self._generation)
+
+    def load_history(self):
+        """Index the history file, recovering from a truncated last record"""
+        with self._lock:
+            self._close_file()
+            self._generation += 1
+            self._offsets = array("Q")
+            self._end = 0
+            self._first = 0
+            self._memory = None
+            try:
+                if os.path.exists(self.history_file):
+                    self._index_log()
+                else:
+                    self._migrate_legacy_default()
+            except Exception:
+                # If we can't load from file, start with empty history
+                self._offsets = array("Q")
+                self._end = 0
+            if self.max_entries is not None and len(self) > self.max_entries:
+                self._first = len(self._offsets) - self.max_entries
+
+    def flush(self):
+        """Force buffered entries to disk"""
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._sync()
+                except Exception:
+                    pass
+
+    def close(self):
+        """Flush pending entries, wait for compaction and close the log"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self.flush()
+            self._close_file()
+
+    def __len__(self) -> int:
+        if self._memory is not None:
+            return len(self._memory)
+        return len(self._offsets) - self._first
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError("History slices do not support a step")
+            return self.get_history(index.start, index.stop)
+        with self._lock:
+            size = len(self)
+            if index < 0:
+                index += size
+            if not 0 <= index < size:
+                raise IndexError("History index out of range")
+            return self._read(self._first + index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _index_log(self):
+        """Build the record offset index, truncating a partially written last line"""
+        size = os.path.getsize(self.history_file)
+        if size == 0:
+            return
+        with open(self.history_file, "rb") as f:
+            head = f.read(2)
+            if head == b"[[" or head == b"[]":
+                # Legacy format: a single JSON list rewritten on every change
+                f.seek(0)
+                entries = json.loads(f.read().decode("utf-8"))
+            else:
+                entries = None
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if entries is not None:
+            self._write_legacy(entries)
+            return
+        try:
+            offsets = self._offsets
+            start = 0
+            find = data.find
+            while True:
+                newline = find(b"\n", start)
+                if newline < 0:
+                    break
+                # Skip garbled records without decoding them
+                if data[start:start + 1] == b"[" and data[newline - 1:newline] == b"]":
+                    offsets.append(start)
+                start = newline + 1
+        finally:
+            data.close()
+        self._end = start
+        if start < size:
+            # Crash mid-write: the final record never completed
+            with open(self.history_file, "r+b") as f:
+                f.truncate(start)
+
+    def _migrate_legacy_default(self):
+        """Convert the history file of earlier versions when the default log is new"""
+        if os.path.basename(self.history_file) != DEFAULT_HISTORY_FILE:
+            return
+        legacy = os.path.join(os.path.dirname(self.history_file), LEGACY_HISTORY_FILE)
+        if not os.path.isfile(legacy):
+            return
+        with open(legacy, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        # The old file is left in place; it is not read again once the log exists
+        self._write_legacy(entries)
+
+    def _write_legacy(self, entries: list):
+        """Convert a legacy history list into the log format"""
+        with open(self.history_file, "wb") as f:
+            for entry in entries:
+                self._offsets.append(f.tell())
+                f.write(self._encode(tuple(entry)))
+            self._end = f.tell()
+
+    def _encode(self, entry: Tuple[str, str]) -> bytes:
+        """Encode one entry as a log line"""
+        return (json.dumps(entry) + "\n").encode("utf-8")
+
+    def _read(self, index: int) -> Tuple[str, str]:
+        """Decode the record at an absolute index"""
+        if self._memory is not None:
+            return self._memory[index]
+        start = self._offsets[index]
+        end = self._map.find(b"\n", start) if self._map is not None else -1
+        if end < 0:
+            # Not mapped yet, or appended since the last mapping
+            self._remap()
+            end = self._map.find(b"\n", start)
+        expression, result = json.loads(self._map[start:end])
+        return (expression, result)
+
+    def _remap(self):
+        """Map the log file, picking up records appended since the last mapping"""
+        self._unmap()
+        self._reader = open(self.history_file, "rb")
+        self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_size = len(self._map)
+
+    def _unmap(self):
+        """Release the memory mapping"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self._mapped_size = 0
+
+    def _append_record(self, entry: Tuple[str, str]):
+        """Append one record to the log, syncing in batches"""
+        if self._memory is not None:
+            self._memory.append(entry)
+            return
+        line = self._encode(entry)
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history, f)
+            if self._file is None:
+                self._file = open(self.history_file, "ab")
+            self._file.write(line)
+            self._file.flush()
         except Exception:
-            # If we can't save to file, just continue
+            # If we can't save to file, keep the history in memory
+            self._fall_back_to_memory()
+            self._memory.append(entry)
+            return
+        # Only a completely written record is indexed
+        self._offsets.append(self._end)
+        self._end += len(line)
+        self._unsynced += 1
+        if (self._unsynced >= self.sync_every or
+                time.monotonic() - self._last_sync >= self.sync_interval):
+            try:
+                self._sync()
+            except Exception:
+                pass
+
+    def _fall_back_to_memory(self):
+        """Switch to in-memory history after a failed write, dropping any partial record"""
+        self._close_file()
+        try:
+            os.truncate(self.history_file, self._end)
+        except OSError:
             pass
-    
-    def load_history(self):
-        """Load history from file"""
         try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r') as f:
-                    self.history = json.load(f)
+            memory = [self._read(index) for index in range(self._first, len(self._offsets))]
         except Exception:
-            # If we can't load from file, start with empty history
-            self.history = []
\ No newline at end of file
+            memory = []
+        self._unmap()
+        self._memory = memory
+        self._first = 0
+
+    def _save_memory(self):
+        """Write the in-memory history as a new log, resuming logging if that works"""
+        temp_file = None
+        try:
+            temp_file, target = self._open_temp()
+            with target:
+                for entry in self._memory:
+                    target.write(self._encode(entry))
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_file, self.history_file)
+        except Exception:
+            # Still unwritable: keep the history in memory
+            if temp_file is not None and os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+            return
+        self.load_history()
+
+    def _open_temp(self) -> Tuple[str, BinaryIO]:
+        """
+        Create a temporary file next to the log.
+
+        Each rewrite gets its own file, so a background compaction and a
+        synchronous save cannot clobber each other's output.
+        """
+        descriptor, path = tempfile.mkstemp(
+            prefix=os.path.basename(self.history_file) + ".", suffix=".tmp",
+            dir=os.path.dirname(os.path.abspath(self.history_file)))
+        return path, os.fdopen(descriptor, "wb")
+
+    def _sync(self):
+        """fsync the log file"""
+        if self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _maybe_compact(self):
+        """Start a background compaction when stale records dominate the log"""
+        if self.max_entries is None:
+            return
+        if self._first <= self.max_entries + self.sync_every:
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        with self._lock:
+            first, generation = self._first, self._generation
+        self._compactor = threading.Thread(target=self._rewrite, args=(first, generation), daemon=True)
+        self._compactor.start()
+
+    def _rewrite(self, first: int, generation: int):
+        """
+        Atomically replace the log with the records from index first on.
+
+        Raw record bytes are copied without decoding. The bulk copy runs
+        without holding the lock; records appended meanwhile are carried
+        over under the lock before the new file replaces the old one.
+        """
+        source = target = temp_file = None
+        try:
+            with self._lock:
+                if self._memory is not None:
+                    return
+                base = self._offsets[first] if first < len(self._offsets) else self._end
+                snapshot_end = self._end
+            temp_file, target = self._open_temp()
+            source = open(self.history_file, "rb")
+            source.seek(base)
+            self._copy(source, target, snapshot_end - base)
+            with self._lock:
+                if generation != self._generation or self._memory is not None:
+                    # The file was replaced while copying
+                    return
+                self._copy(source, target, self._end - snapshot_end)
+                target.flush()
+                os.fsync(target.fileno())
+                # Close every handle first so the replace also works on Windows
+                target.close()
+                source.close()
+                self._close_file()
+                os.replace(temp_file, self.history_file)
+                self._generation += 1
+                self._offsets = array("Q", (offset - base for offset in self._offsets[first:]))
+                self._end -= base
+                # Trimming may have advanced while copying
+                self._first -= first
+                self._unsynced = 0
+        except Exception:
+            # If we can't save to file, just continue
+            pass
+        finally:
+            for handle in (source, target):
+                if handle is not None:
+                    handle.close()
+            if temp_file is not None and os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+
+    def _copy(self, source, target, length: int):
+        """Copy length bytes from one open file to another"""
+        while length > 0:
+            chunk = source.read(min(length, 1 << 20))
+            if not chunk:
+                break
+            target.write(chunk)
+            length -= len(chunk)
+
+    def _close_file(self):
+        """Close the append handle and mapping, syncing pending records"""
+        if self._file is not None:
+            try:
+                self._sync()
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+        self._unmap()
@@ -0,0 +1,197 @@
+"""
+Instrumentation
+Opt-in per-stage timing histograms.
+
+When enabled, the parser and controller time each stage of handling an
+input (tokenize, parse, compile, evaluate, format, history) into
+histograms with power-of-two nanosecond buckets. Recording a sample is an
+integer bit_length and a list increment, so the histograms can stay on in
+production; when instrumentation is disabled nothing is timed at all.
+"""
+
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional, TextIO
+
+# Stages in the order an input passes through them
+STAGES = ("tokenize", "parse", "compile", "evaluate", "format", "history")
+
+# Bucket i holds samples of fewer than 2**i nanoseconds (up to about 9 minutes)
+BUCKETS = 40
+
+clock = time.perf_counter_ns
+
+
+class Histogram:
+    """Latency histogram with power-of-two nanosecond buckets"""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, nanoseconds: int):
+        """Add one sample, in nanoseconds"""
+        self.counts[min(nanoseconds.bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += nanoseconds
+        if self.min is None or nanoseconds < self.min:
+            self.min = nanoseconds
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile from the buckets.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            float: Percentile in nanoseconds, interpolated within its
+            bucket and clamped to the smallest and largest samples
+        """
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = 2 ** (i - 1) if i else 0
+                estimate = low + (2 ** i - low) * (rank - seen) / count
+                return min(max(estimate, self.min), self.max)
+            seen += count
+        return self.max
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Summarize the samples.
+
+        Returns:
+            Dict[str, float]: count, total in milliseconds, and mean, min,
+            p50, p90, p99 and max in microseconds
+        """
+        count = self.count
+        return {
+            "count": count,
+            "total_ms": self.total / 1e6,
+            "mean_us": self.total / count / 1e3 if count else 0.0,
+            "min_us": (self.min or 0) / 1e3,
+            "p50_us": self.percentile(0.50) / 1e3,
+            "p90_us": self.percentile(0.90) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max / 1e3,
+        }
+
+
+class Instrumentation:
+    """Timing histograms by stage name"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self._dump_stop: Optional[threading.Event] = None
+
+    def record(self, stage: str, nanoseconds: int):
+        """
+        Add a timing sample to a stage.
+
+        Args:
+            stage (str): Stage name; stages outside STAGES are added on first use
+            nanoseconds (int): Duration
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.record(nanoseconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the summary of each stage that has samples"""
+        return {stage: histogram.stats()
+                for stage, histogram in self.histograms.items() if histogram.count}
+
+    def reset(self):
+        """Discard all samples"""
+        for histogram in self.histograms.values():
+            histogram.__init__()
+
+    def report(self) -> str:
+        """
+        Format the stage summaries as a table.
+
+        Returns:
+            str: One line per stage with its count and latencies in microseconds
+        """
+        lines = [f"{'stage':<10}{'count':>10}{'mean':>10}{'p50':>10}{'p90':>10}"
+                 f"{'p99':>10}{'max':>10}"]
+        for stage, stats in self.stats().items():
+            lines.append(f"{stage:<10}{stats['count']:>10}{stats['mean_us']:>10.1f}"
+                         f"{stats['p50_us']:>10.1f}{stats['p90_us']:>10.1f}"
+                         f"{stats['p99_us']:>10.1f}{stats['max_us']:>10.1f}")
+        return "\n".join(lines)
+
+    def start_dump(self, interval: float, output: Optional[TextIO] = None,
+                   write: Optional[Callable[[str], None]] = None):
+        """
+        Write the report periodically from a background thread.
+
+        Args:
+            interval (float): Seconds between reports
+            output (Optional[TextIO]): Stream to write to (default: stderr)
+            write (Optional[Callable[[str], None]]): Called with each report
+                instead of writing to a stream
+        """
+        if interval <= 0:
+            raise ValueError("Dump interval must be positive")
+        self.stop_dump()
+        if write is None:
+            stream = output if output is not None else sys.stderr
+            write = lambda report: (stream.write(report + "\n"), stream.flush())
+        stop = self._dump_stop = threading.Event()
+
+        def dump():
+            while not stop.wait(interval):
+                write(self.report())
+
+        threading.Thread(target=dump, name="instrumentation-dump", daemon=True).start()
+
+    def stop_dump(self):
+        """Stop periodic reports, if running"""
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_stop = None
+
+    def __repr__(self) -> str:
+        samples = sum(histogram.count for histogram in self.histograms.values())
+        return f"Instrumentation({samples} samples)"
+
+
+def timed(func: Callable, instrumentation: Instrumentation, stage: str) -> Callable:
+    """
+    Wrap a function to record each call's duration under a stage.
+
+    Args:
+        func (Callable): Function to time
+        instrumentation (Instrumentation): Where samples are recorded
+        stage (str): Stage name
+
+    Returns:
+        Callable: Function with the same arguments and result
+    """
+    histogram = instrumentation.histograms.get(stage)
+    if histogram is None:
+        histogram = instrumentation.histograms[stage] = Histogram()
+    record = histogram.record
+
+    def call(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(clock() - start)
+
+    return call
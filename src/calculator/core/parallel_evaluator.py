@@ -0,0 +1,264 @@
+"""
+Parallel Evaluator
+Evaluates large numbers of expressions across worker processes.
+
+Expression evaluation is CPU-bound Python, so one controller can only use
+one core. ``ParallelEvaluator`` splits a list or iterator of expressions
+into chunks and evaluates them on a pool of worker processes. Each worker
+builds its own controller once, when it starts, and keeps it (with its
+imported modules and compiled expression cache) for every later chunk.
+Variables bound by one expression are only seen by later expressions that
+happen to reach the same worker, so with several workers the expressions
+should not depend on each other (the batch CLI evaluates each line on its
+own in that case).
+Results come back in input order or as chunks complete, and the time each
+worker spends evaluating is recorded so per-worker throughput can be
+reported.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.calculator import CalculatorController
+
+# Evaluates one chunk of expressions with a controller
+ChunkFunction = Callable[[CalculatorController, List[str]], list]
+
+# Controller owned by each worker process
+_worker_controller = None
+
+
+def evaluate_chunk(controller: CalculatorController, expressions: List[str]) -> list:
+    """
+    Evaluate a chunk of expressions with one controller.
+
+    Args:
+        controller (CalculatorController): Controller used for evaluation
+        expressions (List[str]): Expressions to evaluate
+
+    Returns:
+        list: Result (or error message) of each expression
+    """
+    return [controller.process_input(expression) for expression in expressions]
+
+
+def _init_worker():
+    """Create the worker's controller, importing the function modules once"""
+    global _worker_controller
+    _worker_controller = CalculatorController()
+
+
+def worker_controller() -> CalculatorController:
+    """
+    Get the controller of the current worker process, creating it on first use.
+
+    Returns:
+        CalculatorController: Controller kept for the life of the process
+    """
+    if _worker_controller is None:
+        _init_worker()
+    return _worker_controller
+
+
+def _warm_up() -> int:
+    """Run in each worker at start-up so later chunks find it ready"""
+    return os.getpid()
+
+
+def _run_chunk(function: ChunkFunction, expressions: List[str]) -> Tuple[int, float, list]:
+    """Evaluate a chunk in a worker process and time it"""
+    start = time.perf_counter()
+    results = function(_worker_controller, expressions)
+    return os.getpid(), time.perf_counter() - start, results
+
+
+def _chunks(expressions: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Split an iterable of expressions into lists of at most size expressions"""
+    iterator = iter(expressions)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class WorkerStats:
+    """Work done by one worker process"""
+
+    __slots__ = ("pid", "chunks", "expressions", "seconds")
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.chunks = 0
+        self.expressions = 0
+        self.seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Expressions evaluated per second of evaluation time"""
+        return self.expressions / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"WorkerStats(pid={self.pid}, chunks={self.chunks}, "
+                f"expressions={self.expressions}, throughput={self.throughput:.0f}/s)")
+
+
+class ParallelEvaluator:
+    """Evaluator that shards expressions across a pool of worker processes"""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256,
+                 function: Optional[ChunkFunction] = None):
+        """
+        Args:
+            workers (Optional[int]): Number of worker processes (default: one
+                per CPU); 1 evaluates in the calling process
+            chunk_size (int): Expressions sent to a worker at a time
+            function (Optional[ChunkFunction]): Module-level function that
+                evaluates a chunk with a controller (default: ``evaluate_chunk``)
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or chunk_size < 1:
+            raise ValueError("workers and chunk_size must be at least 1")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.function = function if function is not None else evaluate_chunk
+        # Chunks in flight at once; bounds memory on unbounded iterators
+        self.max_pending = workers * 2
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._controller: Optional[CalculatorController] = None
+        self._stats: Dict[int, WorkerStats] = {}
+
+    def start(self):
+        """Start the worker processes and wait until each one is ready"""
+        if self.workers == 1:
+            if self._controller is None:
+                self._controller = CalculatorController()
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            for future in [self._executor.submit(_warm_up) for _ in range(self.workers)]:
+                future.result()
+
+    def evaluate(self, expressions: Iterable[str]) -> list:
+        """
+        Evaluate expressions and return their results in input order.
+
+        Args:
+            expressions (Iterable[str]): Expressions to evaluate
+
+        Returns:
+            list: Result (or error message) of each expression
+        """
+        return list(self.imap(expressions))
+
+    def imap(self, expressions: Iterable[str]) -> Iterator:
+        """
+        Lazily evaluate expressions, yielding results in input order.
+
+        Args:
+            expressions (Iterable[str]): Expressions to evaluate
+
+        Yields:
+            Result (or error message) of each expression
+        """
+        for _, results in self._run(expressions, ordered=True):
+            yield from results
+
+    def imap_unordered(self, expressions: Iterable[str]) -> Iterator[Tuple[int, object]]:
+        """
+        Lazily evaluate expressions, yielding results as chunks complete.
+
+        Args:
+            expressions (Iterable[str]): Expressions to evaluate
+
+        Yields:
+            Tuple[int, object]: Input index and result of each expression
+        """
+        for start, results in self._run(expressions, ordered=False):
+            yield from enumerate(results, start)
+
+    def stats(self) -> Dict[int, WorkerStats]:
+        """
+        Get per-worker statistics for the work done so far.
+
+        Returns:
+            Dict[int, WorkerStats]: Statistics keyed by worker process id
+        """
+        return dict(self._stats)
+
+    def report(self) -> str:
+        """Format per-worker throughput as text"""
+        workers = sorted(self._stats.values(), key=lambda stats: stats.pid)
+        lines = [f"worker {stats.pid}: {stats.expressions} expressions in "
+                 f"{stats.chunks} chunks, {stats.throughput:.0f} expr/s" for stats in workers]
+        lines.append(f"total: {sum(stats.expressions for stats in workers)} expressions, "
+                     f"{sum(stats.throughput for stats in workers):.0f} expr/s combined")
+        return "\n".join(lines)
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._controller = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self, expressions: Iterable[str], ordered: bool) -> Iterator[Tuple[int, list]]:
+        """Yield (index of first expression, results) for each evaluated chunk"""
+        self.start()
+        chunks = _chunks(expressions, self.chunk_size)
+        if self._executor is None:
+            start = 0
+            for chunk in chunks:
+                began = time.perf_counter()
+                results = self.function(self._controller, chunk)
+                self._record(os.getpid(), time.perf_counter() - began, len(chunk))
+                yield start, results
+                start += len(chunk)
+            return
+
+        # Futures in submission order, with the index of their first expression
+        pending: Dict[Future, int] = {}
+        start = 0
+        for chunk in chunks:
+            pending[self._executor.submit(_run_chunk, self.function, chunk)] = start
+            start += len(chunk)
+            if len(pending) >= self.max_pending:
+                yield from self._drain(pending, ordered)
+        while pending:
+            yield from self._drain(pending, ordered)
+
+    def _drain(self, pending: Dict[Future, int], ordered: bool) -> Iterator[Tuple[int, list]]:
+        """Yield the next finished chunk (the oldest one if ordered)"""
+        if ordered:
+            done = [next(iter(pending))]
+        else:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            start = pending.pop(future)
+            pid, seconds, results = future.result()
+            self._record(pid, seconds, len(results))
+            yield start, results
+
+    def _record(self, pid: int, seconds: float, count: int):
+        """Add one evaluated chunk to a worker's statistics"""
+        stats = self._stats.get(pid)
+        if stats is None:
+            stats = self._stats[pid] = WorkerStats(pid)
+        stats.chunks += 1
+        stats.expressions += count
+        stats.seconds += seconds
@@ -0,0 +1,441 @@
+"""
+Precision Mode
+Exact and arbitrary-precision evaluation of parsed expressions.
+
+Floats cannot represent most decimal fractions, so ``0.1 + 0.2`` gives
+``0.30000000000000004``. In precision mode the parser reads non-integer
+literals as exact ``Decimal`` values and each expression is evaluated by
+the cheapest backend that is exact for it:
+
+* integer: only integers with ``+ - *`` and non-negative integer powers;
+  evaluated by the ordinary compiled form, since Python ints are exact.
+* rational: literals, variables and ``+ - * /`` with integer powers;
+  evaluated exactly with ``fractions.Fraction``.
+* decimal: anything else (functions, ``pi``, non-integer powers);
+  evaluated with ``decimal.Decimal`` at the configured precision.
+
+The backend is chosen from the tree's structure once, then confirmed for
+each evaluation from the types of the variables' values.
+"""
+
+import math
+import numbers
+import os
+import sys
+import time
+from decimal import Decimal, DivisionByZero, InvalidOperation, Overflow, localcontext
+from fractions import Fraction
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.expression_parser import (BinaryOp, Call, CompiledExpression, Constant, ExpressionParser,
+                                    Negate, Node, Variable, emit_instructions, walk)
+
+INTEGER = "integer"
+RATIONAL = "rational"
+DECIMAL = "decimal"
+
+# Extra digits carried through decimal evaluation and rounded off at the end
+GUARD_DIGITS = 5
+
+Exact = Union[int, Fraction, Decimal]
+
+
+def decimal_pi() -> Decimal:
+    """Compute pi to the current context precision"""
+    with localcontext() as context:
+        context.prec += 2
+        three = Decimal(3)
+        last, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != last:
+            last = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+    return +s
+
+
+def _series(x: Decimal, first: Decimal, i: int) -> Decimal:
+    """Sum the alternating sine (i=1) or cosine (i=0) Taylor series"""
+    last, s, fact, num, sign = 0, first, 1, first, 1
+    while s != last:
+        last = s
+        i += 2
+        fact *= i * (i - 1)
+        num *= x * x
+        sign = -sign
+        s += num / fact * sign
+    return s
+
+
+def _trig(x: Decimal, degrees: bool, gradians: bool, i: int) -> Decimal:
+    """Sine (i=1) or cosine (i=0) at the current context precision"""
+    with localcontext() as context:
+        digits = context.prec
+        # Guard digits absorb the error of the reduction and the series
+        context.prec += 8
+        if degrees:
+            # Exact in decimal arithmetic, so multiples of 90 stay exact
+            x = (x % 360) * decimal_pi() / 180
+        elif gradians:
+            x = (x % 400) * decimal_pi() / 200
+        else:
+            x = x % (2 * decimal_pi())
+        value = _series(x, x if i else Decimal(1), i)
+        # Round away the residue left where the function is exactly zero
+        if abs(value) < Decimal(10) ** -(digits + 2):
+            value = Decimal(0)
+    return +value
+
+
+def decimal_sin(x: Decimal, degrees: bool = False, gradians: bool = False) -> Decimal:
+    """Sine at the current context precision"""
+    return _trig(x, degrees, gradians, 1)
+
+
+def decimal_cos(x: Decimal, degrees: bool = False, gradians: bool = False) -> Decimal:
+    """Cosine at the current context precision"""
+    return _trig(x, degrees, gradians, 0)
+
+
+def decimal_tan(x: Decimal, degrees: bool = False, gradians: bool = False) -> Decimal:
+    """Tangent at the current context precision"""
+    cos = decimal_cos(x, degrees, gradians)
+    if cos == 0:
+        raise ValueError("Tangent is undefined for this angle")
+    return decimal_sin(x, degrees, gradians) / cos
+
+
+def _positive(x: Decimal, message: str = "Input must be positive") -> Decimal:
+    if x <= 0:
+        raise ValueError(message)
+    return x
+
+
+def _sqrt(x: Decimal) -> Decimal:
+    if x < 0:
+        raise ValueError("Cannot calculate square root of negative number")
+    return x.sqrt()
+
+
+def _cbrt(x: Decimal) -> Decimal:
+    if x == 0:
+        return x
+    root = (abs(x).ln() / 3).exp()
+    return root if x > 0 else -root
+
+
+def _log(x: Decimal, base: Optional[Decimal] = None) -> Decimal:
+    _positive(x, "x must be positive")
+    if base is None:
+        return x.ln()
+    if base <= 0 or base == 1:
+        raise ValueError("Base must be positive and not equal to 1")
+    return x.ln() / base.ln()
+
+
+def _power(x: Decimal, y: Decimal) -> Decimal:
+    if x < 0 and y != y.to_integral_value():
+        raise ValueError("Negative base with non-integer exponent is not supported")
+    if x == 0 and y < 0:
+        raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+    return x ** y
+
+
+def _reciprocal(x: Decimal) -> Decimal:
+    if x == 0:
+        raise ValueError("Cannot calculate reciprocal of zero")
+    return 1 / x
+
+
+# Decimal versions of registered functions; angle functions take ``degrees``
+# and ``gradians``
+_DECIMAL_FUNCTIONS: Dict[str, Callable] = {
+    "sqrt": _sqrt,
+    "cbrt": _cbrt,
+    "exp": lambda x: x.exp(),
+    "ln": lambda x: _positive(x).ln(),
+    "log10": lambda x: _positive(x).log10(),
+    "log2": lambda x: _positive(x).ln() / Decimal(2).ln(),
+    "log": _log,
+    "square": lambda x: x * x,
+    "cube": lambda x: x * x * x,
+    "power": _power,
+    "reciprocal": _reciprocal,
+}
+_ANGLE_FUNCTIONS: Dict[str, Callable] = {
+    "sin": decimal_sin,
+    "cos": decimal_cos,
+    "tan": decimal_tan,
+}
+# Functions of integers, exact whatever the precision
+_INTEGER_FUNCTIONS = frozenset(("factorial", "double_factorial", "binomial", "permutations"))
+
+
+def to_fraction(value) -> Fraction:
+    """Convert a number to an exact Fraction; floats by their shortest repr"""
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    return Fraction(value)
+
+
+def to_decimal(value) -> Decimal:
+    """Convert a number to a Decimal, rounding fractions to the context precision"""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, numbers.Rational) and not isinstance(value, int):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def _is_integer_constant(node: Node) -> bool:
+    if isinstance(node, Negate):
+        node = node.operand
+    return isinstance(node, Constant) and isinstance(node.value, int)
+
+
+def classify(tree: Node, irrational: Iterable[object] = ()) -> str:
+    """
+    Find the cheapest exact backend for an expression's structure.
+
+    Args:
+        tree (Node): Parsed expression tree
+        irrational (Iterable[object]): Constant values that are only
+            approximations (pi, e)
+
+    Returns:
+        str: INTEGER, RATIONAL or DECIMAL
+    """
+    irrational = list(irrational)
+    kinds = {INTEGER: 0, RATIONAL: 1, DECIMAL: 2}
+
+    def visit(node: Node, children: List[str]) -> str:
+        if isinstance(node, Constant):
+            if any(node.value is value for value in irrational):
+                return DECIMAL
+            return INTEGER if isinstance(node.value, int) else RATIONAL
+        if isinstance(node, Variable):
+            return INTEGER
+        if isinstance(node, Call):
+            return DECIMAL
+        kind = max(children, key=kinds.get) if children else INTEGER
+        if isinstance(node, BinaryOp):
+            if node.symbol == '/':
+                return max(kind, RATIONAL, key=kinds.get)
+            if node.symbol in ('^', '**'):
+                if not _is_integer_constant(node.right):
+                    return DECIMAL
+                if isinstance(node.right, Negate) or node.right.value < 0:
+                    return max(kind, RATIONAL, key=kinds.get)
+        return kind
+
+    return walk(tree, visit)
+
+
+class PreciseExpression:
+    """Expression evaluated exactly or at a fixed decimal precision"""
+
+    __slots__ = ("source", "tree", "precision", "kind", "degrees", "gradians", "_compiled")
+
+    def __init__(self, source: str, tree: Node, precision: int, kind: str, degrees: bool = False,
+                 gradians: bool = False):
+        """
+        Args:
+            source (str): Expression text
+            tree (Node): Parsed expression tree
+            precision (int): Significant digits of decimal results
+            kind (str): Backend chosen from the structure (see ``classify``)
+            degrees (bool): Angle unit of trigonometric functions
+            gradians (bool): Angles are in gradians instead
+        """
+        self.source = source
+        self.tree = tree
+        self.precision = precision
+        self.kind = kind
+        self.degrees = degrees
+        self.gradians = gradians
+        self._compiled = (CompiledExpression(source, emit_instructions(tree), tree)
+                          if kind == INTEGER else None)
+
+    def backend(self, variables: Optional[Mapping[str, object]] = None) -> str:
+        """
+        Choose the backend for the current variable values.
+
+        Args:
+            variables (Optional[Mapping[str, object]]): Values of the variables
+
+        Returns:
+            str: INTEGER, RATIONAL or DECIMAL
+        """
+        kind = self.kind
+        if kind == DECIMAL or not variables:
+            return kind
+        for node in self._variables():
+            value = variables[node.name]
+            if isinstance(value, int):
+                continue
+            if isinstance(value, Decimal):
+                finite = value.is_finite()
+            elif isinstance(value, float):
+                finite = math.isfinite(value)
+            elif isinstance(value, numbers.Rational):
+                finite = True
+            else:
+                finite = False
+            if not finite:
+                return DECIMAL
+            kind = RATIONAL
+        return kind
+
+    def evaluate(self, variables: Optional[Mapping[str, object]] = None) -> Exact:
+        """
+        Evaluate with the cheapest exact backend.
+
+        Args:
+            variables (Optional[Mapping[str, object]]): Values of the variables
+
+        Returns:
+            Exact: An int, or a Decimal rounded to the precision
+
+        Raises:
+            KeyError: If a variable has no value
+        """
+        backend = self.backend(variables)
+        try:
+            if backend == INTEGER:
+                return self._compiled.evaluate(variables)
+            with localcontext() as context:
+                if backend == RATIONAL:
+                    value = self._evaluate_rational(variables)
+                else:
+                    # Guard digits keep rounding errors out of the result
+                    context.prec = self.precision + GUARD_DIGITS
+                    value = self._evaluate_decimal(variables)
+                context.prec = self.precision
+                return self._tidy(value)
+        except (ZeroDivisionError, DivisionByZero):
+            raise ZeroDivisionError("division by zero") from None
+        except InvalidOperation:
+            raise ValueError("Invalid operation") from None
+        except Overflow:
+            raise OverflowError("Result too large") from None
+
+    def _variables(self) -> List[Variable]:
+        """Variable nodes of the tree"""
+        found = []
+        walk(self.tree, lambda node, _: found.append(node) if isinstance(node, Variable) else None)
+        return found
+
+    def _evaluate_rational(self, variables: Optional[Mapping[str, object]]) -> Fraction:
+        def visit(node: Node, values: List[Fraction]) -> Fraction:
+            if isinstance(node, Constant):
+                return to_fraction(node.value)
+            if isinstance(node, Variable):
+                return to_fraction(variables[node.name])
+            if isinstance(node, Negate):
+                return -values[0]
+            left, right = values
+            if node.symbol in ('^', '**'):
+                # node.func is the cost guard's power when limits apply
+                return node.func(left, int(right))
+            return node.func(left, right)
+
+        return walk(self.tree, visit)
+
+    def _evaluate_decimal(self, variables: Optional[Mapping[str, object]]) -> Decimal:
+        degrees = self.degrees
+        gradians = self.gradians
+
+        def visit(node: Node, values: List[Decimal]) -> Decimal:
+            if isinstance(node, Constant):
+                return to_decimal(node.value)
+            if isinstance(node, Variable):
+                return to_decimal(variables[node.name])
+            if isinstance(node, Negate):
+                return -values[0]
+            if isinstance(node, BinaryOp):
+                if node.symbol in ('^', '**'):
+                    return _power(*values)
+                return node.func(*values)
+            function = _DECIMAL_FUNCTIONS.get(node.name)
+            if function is not None:
+                return function(*values)
+            function = _ANGLE_FUNCTIONS.get(node.name)
+            if function is not None:
+                return function(*values, degrees=degrees, gradians=gradians)
+            if node.name in _INTEGER_FUNCTIONS:
+                return Decimal(node.func(*[int(value) for value in values]))
+            # No decimal version: evaluate in floating point
+            return to_decimal(node.func(*[float(value) for value in values]))
+
+        return walk(self.tree, visit)
+
+    def _tidy(self, value: Union[Fraction, Decimal]) -> Exact:
+        """Turn a result into an int or a Decimal without trailing zeros"""
+        if isinstance(value, Fraction):
+            if value.denominator == 1:
+                return value.numerator
+            value = to_decimal(value)
+        value = +value
+        if value == value.to_integral_value() and value.adjusted() < self.precision:
+            return int(value)
+        return value.normalize()
+
+    def __repr__(self) -> str:
+        return f"PreciseExpression({self.source!r}, {self.kind})"
+
+
+class PrecisionParser(ExpressionParser):
+    """Parser compiling expressions for exact or arbitrary-precision evaluation"""
+
+    def __init__(self, functions: Optional[Mapping[str, Callable]] = None, precision: int = 28):
+        """
+        Args:
+            functions (Optional[Mapping[str, Callable]]): Name -> callable mapping
+            precision (int): Significant digits of decimal results
+        """
+        super().__init__(functions)
+        if precision < 1:
+            raise ValueError("Precision must be at least 1 digit")
+        self.precision = precision
+        self.decimal_literals = True
+        # The tree is evaluated as parsed; folding would compute in floats
+        self.fold_constants = False
+        with localcontext() as context:
+            context.prec = precision + GUARD_DIGITS
+            self.constants = {'pi': decimal_pi(), 'e': Decimal(1).exp()}
+
+    def compile(self, expression: str, variables: Iterable[str] = (),
+                optimize: bool = True) -> PreciseExpression:
+        """
+        Parse an expression for precise evaluation.
+
+        Args:
+            expression (str): Mathematical expression to compile
+            variables (Iterable[str]): Names to compile as variable lookups
+            optimize (bool): Unused; precise expressions are not folded
+
+        Returns:
+            PreciseExpression: Expression with its backend chosen
+
+        Raises:
+            ValueError: If the expression is malformed, or over the cost
+                guard's limits
+        """
+        tree = self.parse(expression, variables)
+        instrumentation = self.instrumentation
+        start = time.perf_counter_ns() if instrumentation is not None else 0
+        if self.cost_guard is not None:
+            tree = self.cost_guard.review(tree)
+        kind = classify(tree, self.constants.values())
+        degrees = getattr(self.functions, "degrees", False)
+        gradians = getattr(self.functions, "gradians", False)
+        compiled = PreciseExpression(expression, tree, self.precision, kind, degrees, gradians)
+        if instrumentation is not None:
+            instrumentation.record("compile", time.perf_counter_ns() - start)
+        return compiled
@@ -0,0 +1,142 @@
+"""
+Rational Arithmetic
+Tree rewrite that keeps integer division exact.
+
+With rational arithmetic enabled, ``1/3 + 1/6`` evaluates to the Rational
+``1/2`` instead of ``0.5``. The rewrite runs on parsed trees before they are
+folded and compiled:
+
+* ``/`` divides with ``modules.fractions.divide``, which returns a Rational
+  for two integers and divides other operands as usual.
+* Chains of ``+`` and ``-`` with at least SUM_TERMS terms become one call
+  of ``sum_fractions``, which adds exact terms over a common denominator.
+  The call is named SUM_NAME, which no expression can call or register.
+* ``^`` raises an integer to a negative integer power as a Rational, through
+  the tree's (possibly cost-guarded) power function.
+* Functions receive Rational arguments as ints when they are whole and as
+  floats otherwise; ``square``, ``cube`` and ``reciprocal`` stay exact.
+"""
+
+import os
+import sys
+from typing import Callable, Dict, List
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.fractions import Rational, divide, sum_fractions
+from core.expression_parser import BinaryOp, Call, Negate, Node, walk
+
+# Fewest terms of a sum compiled into a single sum_fractions call
+SUM_TERMS = 4
+
+# Name of the sum call; not an identifier, so it cannot clash with a function
+SUM_NAME = "$sum"
+
+
+def _plain(value):
+    """Convert a Rational to an int when whole, otherwise to a float"""
+    if type(value) is Rational:
+        value.reduce()
+        return value.numerator if value.denominator == 1 else float(value)
+    return value
+
+
+def _reciprocal(x: Rational) -> Rational:
+    if not x:
+        raise ValueError("Cannot calculate reciprocal of zero")
+    return 1 / x
+
+
+# Exact versions of functions, used when their argument is a Rational
+_EXACT_FUNCTIONS: Dict[str, Callable] = {
+    "square": lambda x: x * x,
+    "cube": lambda x: x * x * x,
+    "reciprocal": _reciprocal,
+}
+
+
+def _exact_power(func: Callable) -> Callable:
+    """Wrap the power operator so integers raised to negative integers stay exact"""
+
+    def power(x, y):
+        if isinstance(x, int) and isinstance(y, int) and y < 0:
+            x = Rational(x)
+        return func(x, y)
+
+    return power
+
+
+def _accept_rationals(name: str, func: Callable) -> Callable:
+    """Wrap a function so it can take Rational arguments"""
+    exact = _EXACT_FUNCTIONS.get(name)
+
+    def call(*args):
+        if exact is not None and len(args) == 1 and type(args[0]) is Rational:
+            return exact(args[0])
+        return func(*[_plain(arg) for arg in args])
+
+    return call
+
+
+def is_sum(node: Node) -> bool:
+    """Whether a node is a sum produced by the rewrite"""
+    return isinstance(node, Call) and node.name == SUM_NAME
+
+
+def use_rationals(tree: Node) -> Node:
+    """
+    Rewrite a tree to evaluate with exact rational arithmetic.
+
+    Args:
+        tree (Node): Parsed expression tree
+
+    Returns:
+        Node: Equivalent tree whose integer divisions are exact
+    """
+    # One wrapper per function, so identical sub-trees stay shareable
+    wrappers = {}
+    # Terms of the +/- chain rooted at each rewritten node, by node id
+    chains: Dict[int, List[Node]] = {}
+
+    def finish(node: Node) -> Node:
+        """Turn a long +/- chain into one sum call"""
+        terms = chains.pop(id(node), None)
+        if terms is None or len(terms) < SUM_TERMS:
+            return node
+        return Call(SUM_NAME, sum_fractions, terms)
+
+    def terms_of(node: Node) -> List[Node]:
+        terms = chains.pop(id(node), None)
+        return terms if terms is not None else [node]
+
+    def visit(node: Node, children: list) -> Node:
+        if not children:
+            return node
+        if isinstance(node, BinaryOp) and node.symbol in ('+', '-'):
+            left, right = children
+            terms = terms_of(left)
+            if node.symbol == '+':
+                terms.extend(terms_of(right))
+            else:
+                right = finish(right)
+                terms.append(Negate(right))
+            result = BinaryOp(node.symbol, node.func, left, right)
+            chains[id(result)] = terms
+            return result
+        children = [finish(child) for child in children]
+        if isinstance(node, BinaryOp) and node.symbol == '/':
+            return BinaryOp('/', divide, *children)
+        if isinstance(node, BinaryOp) and node.symbol in ('^', '**'):
+            func = wrappers.get(('^', node.func))
+            if func is None:
+                func = wrappers[('^', node.func)] = _exact_power(node.func)
+            return BinaryOp(node.symbol, func, *children)
+        if isinstance(node, Call):
+            func = wrappers.get(node.func)
+            if func is None:
+                func = wrappers[node.func] = _accept_rationals(node.name, node.func)
+            return Call(node.name, func, children)
+        return node.with_children(children)
+
+    return finish(walk(tree, visit))
@@ -0,0 +1,429 @@
+"""
+Vectorized Evaluation
+Evaluates a compiled expression over NumPy arrays of named variables.
+
+Functions from the trigonometry, logarithms and powers modules are mapped
+onto their NumPy ufunc equivalents. Instead of raising, domain errors are
+recorded per element as error codes, and the affected values become NaN.
+"""
+
+import functools
+import sys
+import os
+from typing import Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+# Add the calculator directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.expression_parser import ExpressionParser, CONST, NEG, BINARY, LOAD, CALL, STORE, RECALL
+from modules.trigonometry import (DEGREES_PER_TURN, GRADIANS_PER_TURN, EXACT_ASIN, EXACT_ATAN,
+                                  EXACT_OFFSETS)
+
+# Per-element error codes
+OK = 0
+DOMAIN_ERROR = 1
+DIVISION_BY_ZERO = 2
+OVERFLOW = 3
+
+ERROR_MESSAGES = {
+    OK: "",
+    DOMAIN_ERROR: "Math domain error",
+    DIVISION_BY_ZERO: "Division by zero",
+    OVERFLOW: "Result too large",
+}
+
+
+def _require_numpy():
+    """Raise a helpful error if NumPy is not installed"""
+    if np is None:
+        raise ImportError("Batch evaluation requires NumPy; install it with: pip install numpy")
+
+
+def _flag(errors, mask, code: int):
+    """Record an error code for elements in mask that have no error yet"""
+    mask = np.broadcast_to(mask, errors.shape)
+    errors[(errors == OK) & mask] = code
+
+
+def _flag_overflow(errors, result, *args):
+    """Flag infinite results produced from finite arguments"""
+    finite = np.isfinite(result)
+    for arg in args:
+        finite = finite | ~np.isfinite(arg)
+    _flag(errors, ~finite, OVERFLOW)
+
+
+# Binary operators
+
+def _add(errors, a, b):
+    result = np.add(a, b)
+    _flag_overflow(errors, result, a, b)
+    return result
+
+
+def _subtract(errors, a, b):
+    result = np.subtract(a, b)
+    _flag_overflow(errors, result, a, b)
+    return result
+
+
+def _multiply(errors, a, b):
+    result = np.multiply(a, b)
+    _flag_overflow(errors, result, a, b)
+    return result
+
+
+def _divide(errors, a, b):
+    _flag(errors, np.equal(b, 0), DIVISION_BY_ZERO)
+    result = np.divide(a, b)
+    _flag_overflow(errors, result, a, b)
+    return result
+
+
+def _power(errors, a, b):
+    _flag(errors, (np.less(a, 0)) & (np.not_equal(b, np.floor(b))), DOMAIN_ERROR)
+    _flag(errors, (np.equal(a, 0)) & (np.less(b, 0)), DIVISION_BY_ZERO)
+    result = np.power(np.asarray(a, dtype=float), b)
+    _flag_overflow(errors, result, a, b)
+    return result
+
+
+# Trigonometric functions; turn is the number of angle units in a full turn
+# (360 for degrees, 400 for gradians) or None for radians. As in
+# modules.trigonometry, infinite angles are a domain error and NaN passes through
+
+def _reduce_angles(x, turn):
+    """
+    Reduce angles like modules.trigonometry.
+
+    Returns:
+        Tuple: Quadrant of abs(x) modulo a turn, and the sine and cosine of
+        its offset within the quadrant
+    """
+    quarter = turn // 4
+    angle = np.fmod(np.abs(np.asarray(x, dtype=float)), turn)
+    quadrant = np.floor_divide(angle, quarter)
+    offset = angle - quarter * quadrant
+    small = offset <= quarter / 2
+    radians = np.where(small, offset, quarter - offset) * (np.pi / (turn // 2))
+    sine, cosine = np.sin(radians), np.cos(radians)
+    sine, cosine = np.where(small, sine, cosine), np.where(small, cosine, sine)
+    for exact, (exact_sine, exact_cosine) in EXACT_OFFSETS[turn].items():
+        hit = offset == exact
+        sine = np.where(hit, exact_sine, sine)
+        cosine = np.where(hit, exact_cosine, cosine)
+    return np.nan_to_num(quadrant).astype(int), sine, cosine
+
+
+def _to_angles(radians, x, exact, turn, complement=False):
+    """Convert inverse function results from radians, exactly for special values"""
+    if turn is None:
+        return radians
+    angles = radians * ((turn // 2) / np.pi)
+    magnitude = np.abs(x)
+    for value, degrees in exact.items():
+        angle = np.copysign(degrees * turn / 360, x)
+        if complement:
+            angle = turn / 4 - angle
+        angles = np.where(magnitude == value, angle, angles)
+    return angles
+
+
+def _sin(errors, x, turn=DEGREES_PER_TURN):
+    _flag(errors, np.isinf(x), DOMAIN_ERROR)
+    if turn is None:
+        return np.sin(x)
+    quadrant, sine, cosine = _reduce_angles(x, turn)
+    result = np.choose(quadrant, [sine, cosine, 0.0 - sine, 0.0 - cosine])
+    return np.where(np.less(x, 0), 0.0 - result, result)
+
+
+def _cos(errors, x, turn=DEGREES_PER_TURN):
+    _flag(errors, np.isinf(x), DOMAIN_ERROR)
+    if turn is None:
+        return np.cos(x)
+    quadrant, sine, cosine = _reduce_angles(x, turn)
+    return np.choose(quadrant, [cosine, 0.0 - sine, 0.0 - cosine, sine])
+
+
+def _tan(errors, x, turn=DEGREES_PER_TURN):
+    _flag(errors, np.isinf(x), DOMAIN_ERROR)
+    if turn is None:
+        _flag(errors, np.abs(np.cos(x)) < 1e-15, DOMAIN_ERROR)
+        return np.tan(x)
+    quadrant, sine, cosine = _reduce_angles(x, turn)
+    odd = quadrant % 2 == 1
+    _flag(errors, odd & (sine == 0), DOMAIN_ERROR)
+    result = np.where(odd, 0.0 - cosine / sine, sine / cosine)
+    return np.where(np.less(x, 0), 0.0 - result, result)
+
+
+def _asin(errors, x, turn=DEGREES_PER_TURN):
+    _flag(errors, (np.less(x, -1)) | (np.greater(x, 1)), DOMAIN_ERROR)
+    return _to_angles(np.arcsin(x), x, EXACT_ASIN, turn)
+
+
+def _acos(errors, x, turn=DEGREES_PER_TURN):
+    _flag(errors, (np.less(x, -1)) | (np.greater(x, 1)), DOMAIN_ERROR)
+    return _to_angles(np.arccos(x), x, EXACT_ASIN, turn, complement=True)
+
+
+def _atan(errors, x, turn=DEGREES_PER_TURN):
+    return _to_angles(np.arctan(x), x, EXACT_ATAN, turn)
+
+
+def _sinh(errors, x):
+    result = np.sinh(x)
+    _flag_overflow(errors, result, x)
+    return result
+
+
+def _cosh(errors, x):
+    result = np.cosh(x)
+    _flag_overflow(errors, result, x)
+    return result
+
+
+def _tanh(errors, x):
+    return np.tanh(x)
+
+
+# Logarithmic functions
+
+def _ln(errors, x):
+    _flag(errors, np.less_equal(x, 0), DOMAIN_ERROR)
+    return np.log(x)
+
+
+def _log10(errors, x):
+    _flag(errors, np.less_equal(x, 0), DOMAIN_ERROR)
+    return np.log10(x)
+
+
+def _log2(errors, x):
+    _flag(errors, np.less_equal(x, 0), DOMAIN_ERROR)
+    return np.log2(x)
+
+
+def _log(errors, x, base=None):
+    _flag(errors, np.less_equal(x, 0), DOMAIN_ERROR)
+    if base is None:
+        return np.log(x)
+    _flag(errors, (np.less_equal(base, 0)) | (np.equal(base, 1)), DOMAIN_ERROR)
+    return np.log(x) / np.log(base)
+
+
+# Power functions
+
+def _sqrt(errors, x):
+    _flag(errors, np.less(x, 0), DOMAIN_ERROR)
+    return np.sqrt(x)
+
+
+def _cbrt(errors, x):
+    return np.cbrt(x)
+
+
+def _nth_root(errors, x, n):
+    _flag(errors, (np.less_equal(n, 0)) | (np.not_equal(n, np.floor(n))), DOMAIN_ERROR)
+    _flag(errors, (np.less(x, 0)) & (np.equal(np.mod(n, 2), 0)), DOMAIN_ERROR)
+    return np.sign(x) * np.power(np.abs(x), 1.0 / np.asarray(n, dtype=float))
+
+
+def _exp(errors, x):
+    result = np.exp(x)
+    _flag_overflow(errors, result, x)
+    return result
+
+
+def _square(errors, x):
+    result = np.multiply(x, x)
+    _flag_overflow(errors, result, x)
+    return result
+
+
+def _cube(errors, x):
+    result = np.multiply(np.multiply(x, x), x)
+    _flag_overflow(errors, result, x)
+    return result
+
+
+def _reciprocal(errors, x):
+    _flag(errors, np.equal(x, 0), DIVISION_BY_ZERO)
+    return np.divide(1.0, x)
+
+
+VECTOR_OPERATORS = {
+    '+': _add,
+    '-': _subtract,
+    '*': _multiply,
+    '/': _divide,
+    '^': _power,
+    '**': _power,
+}
+
+VECTOR_FUNCTIONS = {
+    "sin": _sin, "cos": _cos, "tan": _tan,
+    "asin": _asin, "acos": _acos, "atan": _atan,
+    "sinh": _sinh, "cosh": _cosh, "tanh": _tanh,
+    "ln": _ln, "log10": _log10, "log2": _log2, "log": _log,
+    "power": _power, "sqrt": _sqrt, "cbrt": _cbrt, "nth_root": _nth_root,
+    "exp": _exp, "square": _square, "cube": _cube, "reciprocal": _reciprocal,
+}
+
+# Argument counts as (min, max) for functions that do not take exactly one
+VECTOR_ARITY = {
+    "log": (1, 2),
+    "power": (2, 2),
+    "nth_root": (2, 2),
+}
+
+# Functions whose arguments or results are angles
+ANGLE_FUNCTIONS = {
+    "sin": _sin, "cos": _cos, "tan": _tan,
+    "asin": _asin, "acos": _acos, "atan": _atan,
+}
+
+
+class _VectorFunctions(dict):
+    """Kernels by name that check their arity for the parser, like BoundFunctions"""
+
+    def accepts(self, name: str, argc: int) -> bool:
+        """Check whether a function can be called with argc arguments"""
+        low, high = VECTOR_ARITY.get(name, (1, 1))
+        return low <= argc <= high
+
+
+class BatchResult:
+    """Result of a vectorized evaluation with per-element error codes"""
+
+    __slots__ = ("values", "errors")
+
+    def __init__(self, values, errors):
+        self.values = values
+        self.errors = errors
+
+    @property
+    def mask(self):
+        """Boolean array that is True where evaluation failed"""
+        return self.errors != OK
+
+    @property
+    def error_count(self) -> int:
+        """Number of elements that failed to evaluate"""
+        return int(np.count_nonzero(self.errors))
+
+    def __repr__(self) -> str:
+        return f"BatchResult(size={self.values.size}, errors={self.error_count})"
+
+
+class VectorizedExpression:
+    """Expression compiled once against named variables for array evaluation"""
+
+    __slots__ = ("source", "variables", "instructions", "slots")
+
+    def __init__(self, source: str, variables: Tuple[str, ...], instructions, slots: int = 0):
+        self.source = source
+        self.variables = variables
+        self.instructions = instructions
+        self.slots = slots
+
+    def evaluate(self, **arrays) -> BatchResult:
+        """
+        Evaluate the expression element-wise over the given arrays.
+
+        Args:
+            **arrays: One array (or scalar) per compiled variable name
+
+        Returns:
+            BatchResult: Values (NaN where failed) and per-element error codes
+
+        Raises:
+            ValueError: If a variable is missing or arrays cannot be broadcast
+        """
+        missing = [name for name in self.variables if name not in arrays]
+        if missing:
+            raise ValueError(f"Missing values for variables: {', '.join(missing)}")
+        inputs = {name: np.asarray(arrays[name], dtype=float) for name in self.variables}
+        shape = np.broadcast_shapes(*(a.shape for a in inputs.values())) if inputs else ()
+        errors = np.zeros(shape, dtype=np.int8)
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        temps = [None] * self.slots
+        with np.errstate(all="ignore"):
+            for opcode, arg in self.instructions:
+                if opcode == CONST:
+                    push(arg)
+                elif opcode == LOAD:
+                    push(inputs[arg])
+                elif opcode == BINARY:
+                    b = pop()
+                    stack[-1] = arg(errors, stack[-1], b)
+                elif opcode == CALL:
+                    func, argc = arg
+                    args = stack[-argc:]
+                    del stack[-argc:]
+                    push(func(errors, *args))
+                elif opcode == NEG:
+                    stack[-1] = np.negative(stack[-1])
+                elif opcode == STORE:
+                    temps[arg] = stack[-1]
+                elif opcode == RECALL:
+                    push(temps[arg])
+
+        values = np.array(np.broadcast_to(np.asarray(stack[0], dtype=float), shape))
+        values[errors != OK] = np.nan
+        return BatchResult(values, errors)
+
+
+def compile_vectorized(expression: str, variables: Iterable[str], degrees: bool = True,
+                       gradians: bool = False) -> VectorizedExpression:
+    """
+    Compile an expression for vectorized evaluation over named arrays.
+
+    Args:
+        expression (str): Mathematical expression, e.g. "sin(x)*exp(-x/10)"
+        variables (Iterable[str]): Names of the array variables
+        degrees (bool): Angles are in degrees (the default) rather than radians
+        gradians (bool): Angles are in gradians
+
+    Returns:
+        VectorizedExpression: Reusable vectorized evaluator
+
+    Raises:
+        ImportError: If NumPy is not installed
+        ValueError: If the expression is malformed or calls a function with
+            the wrong number of arguments
+    """
+    _require_numpy()
+    if gradians:
+        turn = GRADIANS_PER_TURN
+    else:
+        turn = DEGREES_PER_TURN if degrees else None
+    parser = _vector_parser(turn)
+    variables = tuple(variables)
+    compiled = parser.compile(expression, variables)
+    return VectorizedExpression(expression, variables, compiled.instructions, compiled.slots)
+
+
+def _vector_parser(turn: Optional[int] = DEGREES_PER_TURN) -> ExpressionParser:
+    """Build a parser whose operators and functions are array kernels"""
+    functions = _VectorFunctions(VECTOR_FUNCTIONS)
+    if turn != DEGREES_PER_TURN:
+        for name, func in ANGLE_FUNCTIONS.items():
+            functions[name] = functools.partial(func, turn=turn)
+    parser = ExpressionParser(functions=functions)
+    parser.operators = {
+        symbol: (precedence, VECTOR_OPERATORS[symbol])
+        for symbol, (precedence, _) in parser.operators.items()
+    }
+    # Kernels need an error buffer, so nothing can run at compile time
+    parser.fold_constants = False
+    return parser
@@ -9,10 +9,12 @@ import tkinter as tk
 class CalculatorButtons:
     """Button component for the calculator"""
     
-    def __init__(self, parent, button_callback):
+    def __init__(self, parent, button_callback, angle_mode="DEG"):
         self.parent = parent
         self.button_callback = button_callback
         self.button_frame = None
+        self.angle_mode = angle_mode
+        self.angle_mode_button = None
         self.create_buttons()
     
     def create_buttons(self):
@@ -35,7 +37,8 @@ class CalculatorButtons:
                 ("e", "e", "secondary"),
                 ("C", "clear", "clear"),
                 ("AC", "all_clear", "all_clear"),
-                ("DEL", "delete", "clear")
+                ("DEL", "delete", "clear"),
+                (self.angle_mode, "angle_mode", "secondary")
             ],
             # Row 2: Trigonometric functions
             [
@@ -46,14 +49,20 @@ class CalculatorButtons:
                 ("acos", "acos", "function"),
                 ("atan", "atan", "function")
             ],
-            # Row 3: Logarithmic functions
+            # Row 3: Hyperbolic functions
+            [
+                ("sinh", "sinh", "function"),
+                ("cosh", "cosh", "function"),
+                ("tanh", "tanh", "function")
+            ],
+            # Row 4: Logarithmic functions
             [
                 ("ln", "ln", "function"),
                 ("log", "log10", "function"),
                 ("log2", "log2", "function"),
                 ("e^x", "exp", "function")
             ],
-            # Row 4: Power/Root functions
+            # Row 5: Power/Root functions
             [
                 ("x²", "square", "function"),
                 ("x³", "cube", "function"),
@@ -61,7 +70,7 @@ class CalculatorButtons:
                 ("∛x", "cbrt", "function"),
                 ("x^y", "power", "operator")
             ],
-            # Row 5: Factorial/Fraction functions
+            # Row 6: Factorial/Fraction functions
             [
                 ("x!", "factorial", "function"),
                 ("x!!", "double_factorial", "function"),
@@ -69,7 +78,7 @@ class CalculatorButtons:
                 ("±", "toggle_sign", "function"),
                 ("%", "percentage", "function")
             ],
-            # Row 6: Digits and basic operators
+            # Row 7: Digits and basic operators
             [
                 ("7", "7", "digit"),
                 ("8", "8", "digit"),
@@ -78,21 +87,21 @@ class CalculatorButtons:
                 ("(", "(", "function"),
                 (")", ")", "function")
             ],
-            # Row 7: Digits and basic operators
+            # Row 8: Digits and basic operators
             [
                 ("4", "4", "digit"),
                 ("5", "5", "digit"),
                 ("6", "6", "digit"),
                 ("*", "*", "operator")
             ],
-            # Row 8: Digits and basic operators
+            # Row 9: Digits and basic operators
             [
                 ("1", "1", "digit"),
                 ("2", "2", "digit"),
                 ("3", "3", "digit"),
                 ("-", "-", "operator")
             ],
-            # Row 9: Digits and basic operators
+            # Row 10: Digits and basic operators
             [
                 ("0", "0", "digit"),
                 (".", ".", "digit"),
@@ -120,6 +129,14 @@ class CalculatorButtons:
                     bd=1
                 )
                 btn.grid(row=row_idx, column=col_idx, sticky="nsew", padx=2, pady=2)
+                if command == "angle_mode":
+                    self.angle_mode_button = btn
+    
+    def set_angle_mode(self, mode):
+        """Show the current angle mode on the toggle button"""
+        self.angle_mode = mode
+        if self.angle_mode_button is not None:
+            self.angle_mode_button.config(text=mode)
     
     def get_button_color(self, btn_type):
         """Get button color based on type"""
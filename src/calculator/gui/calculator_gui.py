@@ -13,7 +13,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import controller and GUI components
-from core.calculator import CalculatorController
+from core.calculator import ANGLE_MODES, CalculatorController
 from gui.display import CalculatorDisplay
 from gui.buttons import CalculatorButtons
 
@@ -35,7 +35,8 @@ class ScientificCalculator:
         
         # Create GUI components
         self.display = CalculatorDisplay(self.window)
-        self.buttons = CalculatorButtons(self.window, self.handle_button_click)
+        self.buttons = CalculatorButtons(self.window, self.handle_button_click,
+                                         self.controller.angle_mode)
         
         # Bind keyboard events
         self.bind_keyboard_events()
@@ -65,8 +66,7 @@ class ScientificCalculator:
                 self.append_parenthesis(")")
             elif command == "toggle_sign":
                 self.toggle_sign()
-            elif command in ["sin", "cos", "tan", "asin", "acos", "atan", "ln", "log10", "log2",
-                            "exp", "sqrt", "cbrt", "square", "cube", "factorial", "double_factorial", "reciprocal"]:
+            elif self.is_unary_function(command):
                 self.apply_function(command)
             elif command == "power":
                 self.append_operator("^")
@@ -74,6 +74,8 @@ class ScientificCalculator:
                 self.delete_last_character()
             elif command == "percentage":
                 self.apply_percentage()
+            elif command == "angle_mode":
+                self.toggle_angle_mode()
             else:
                 # For other commands, treat as expression
                 self.current_input = command
@@ -81,6 +83,11 @@ class ScientificCalculator:
         except Exception as e:
             self.show_error(str(e))
     
+    def is_unary_function(self, command):
+        """Check if a command names a registered single-argument function"""
+        spec = self.controller.functions.get(command)
+        return spec is not None and spec.accepts(1)
+    
     def append_digit(self, digit):
         """Append a digit to the current input"""
         if self.reset_next:
@@ -171,6 +178,13 @@ class ScientificCalculator:
         except Exception as e:
             self.show_error(str(e))
     
+    def toggle_angle_mode(self):
+        """Switch to the next angle mode (DEG -> RAD -> GRAD -> DEG)"""
+        modes = ANGLE_MODES
+        mode = modes[(modes.index(self.controller.angle_mode) + 1) % len(modes)]
+        self.controller.angle_mode = mode
+        self.buttons.set_angle_mode(mode)
+    
     def toggle_sign(self):
         """Toggle the sign of the current input or last result"""
         try:
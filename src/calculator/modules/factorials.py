@@ -1,13 +1,122 @@
 """
 Factorials Module for Scientific Calculator
-Provides factorial functions including standard factorial, double factorial, and gamma function.
+Provides factorial functions including standard factorial, double factorial, and gamma function,
+plus log-factorials, binomial coefficients and permutation counts.
 """
 
 import math
+import threading
+from collections import OrderedDict
 from typing import Union
 
 Number = Union[int, float]
 
+# Largest n whose factorial is kept in the always-present table (170! is the
+# largest factorial within float range)
+SMALL_FACTORIALS = 170
+
+class FactorialTable:
+    """
+    Memo of exact factorials.
+    
+    Factorials up to ``SMALL_FACTORIALS`` are precomputed; larger ones up to
+    ``max_n`` are remembered as they are computed, evicting the least
+    recently used entry once ``maxsize`` are held. The memo is shared
+    between threads and guarded by a lock.
+    """
+    
+    def __init__(self, maxsize: int = 256, max_n: int = 10000):
+        """
+        Args:
+            maxsize (int): Large factorials remembered at once
+            max_n (int): Largest n whose factorial is remembered
+        """
+        if maxsize < 0:
+            raise ValueError("Table size must be non-negative")
+        self.maxsize = maxsize
+        self.max_n = max_n
+        self._small = [1]
+        for i in range(1, SMALL_FACTORIALS + 1):
+            self._small.append(self._small[-1] * i)
+        self._entries: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, n: int) -> int:
+        """
+        Get n! for a non-negative integer n.
+        
+        Args:
+            n (int): Non-negative integer
+            
+        Returns:
+            int: Factorial of n
+        """
+        if n <= SMALL_FACTORIALS:
+            return self._small[n]
+        if n > self.max_n or self.maxsize == 0:
+            return math.factorial(n)
+        with self._lock:
+            try:
+                value = self._entries[n]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(n)
+                self.hits += 1
+                return value
+        value = math.factorial(n)
+        with self._lock:
+            self._entries[n] = value
+            self._evict(self.maxsize)
+        return value
+    
+    def resize(self, maxsize: int):
+        """Change the number of large factorials remembered, evicting as needed"""
+        if maxsize < 0:
+            raise ValueError("Table size must be non-negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+    
+    def _evict(self, maxsize: int):
+        """Drop least recently used entries beyond maxsize; the lock must be held"""
+        while len(self._entries) > maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """Forget the large factorials and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def stats(self) -> dict:
+        """Get size and hit/miss/eviction counters of the large-factorial memo"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# Table used by factorial()
+factorial_table = FactorialTable()
+
+def _check_natural(*values):
+    """Validate non-negative integer arguments"""
+    for value in values:
+        if not isinstance(value, int):
+            raise TypeError("Input must be an integer")
+        if value < 0:
+            raise ValueError("Input must be non-negative")
+
 def factorial(n: int) -> int:
     """
     Calculate factorial of a non-negative integer (n!).
@@ -28,13 +137,27 @@ def factorial(n: int) -> int:
     if n < 0:
         raise ValueError("Input must be non-negative")
         
-    return math.factorial(n)
+    return factorial_table.get(n)
+
+def _odd_product(first: int, last: int) -> int:
+    """
+    Multiply the odd numbers first, first+2, ..., last by binary splitting.
+    
+    Splitting the range in halves keeps the two factors of each big-int
+    multiplication about the same size, which is far cheaper than growing
+    one product a term at a time.
+    """
+    count = (last - first) // 2 + 1
+    if count <= 32:
+        return math.prod(range(first, last + 1, 2))
+    middle = first + 2 * (count // 2)
+    return _odd_product(first, middle - 2) * _odd_product(middle, last)
 
 def double_factorial(n: int) -> int:
     """
     Calculate double factorial of a non-negative integer (n!!).
-    For even n: n!! = n * (n-2) * (n-4) * ... * 2
-    For odd n: n!! = n * (n-2) * (n-4) * ... * 1
+    For even n: n!! = n * (n-2) * (n-4) * ... * 2 = 2^(n/2) * (n/2)!
+    For odd n: n!! = n * (n-2) * (n-4) * ... * 1, multiplied as a product tree
     
     Args:
         n (int): Non-negative integer
@@ -55,12 +178,11 @@ def double_factorial(n: int) -> int:
     if n == 0 or n == 1:
         return 1
         
-    result = 1
-    while n > 1:
-        result *= n
-        n -= 2
+    if n % 2 == 0:
+        k = n // 2
+        return math.factorial(k) << k
         
-    return result
+    return _odd_product(1, n)
 
 def gamma(x: Number) -> float:
     """
@@ -84,4 +206,65 @@ def gamma(x: Number) -> float:
     if isinstance(x, int) and x <= 0:
         raise ValueError("Gamma function is undefined for non-positive integers")
         
-    return math.gamma(x)
\ No newline at end of file
+    return math.gamma(x)
+
+def log_factorial(x: Number) -> float:
+    """
+    Calculate the natural logarithm of x! using the log-gamma function.
+    Works for arguments whose factorial is far beyond float range.
+    
+    Args:
+        x (Number): Non-negative real number
+        
+    Returns:
+        float: ln(x!) = ln(gamma(x + 1))
+        
+    Raises:
+        TypeError: If x is not a number
+        ValueError: If x is negative
+    """
+    if not isinstance(x, (int, float)):
+        raise TypeError("Input must be a number")
+    
+    if x < 0:
+        raise ValueError("Input must be non-negative")
+        
+    return math.lgamma(x + 1)
+
+def binomial(n: int, k: int) -> int:
+    """
+    Calculate the binomial coefficient C(n, k) = n! / (k! * (n-k)!).
+    Computed without forming the factorials; 0 if k > n.
+    
+    Args:
+        n (int): Non-negative integer
+        k (int): Non-negative integer
+        
+    Returns:
+        int: Number of ways to choose k items from n
+        
+    Raises:
+        TypeError: If n or k is not an integer
+        ValueError: If n or k is negative
+    """
+    _check_natural(n, k)
+    return math.comb(n, k)
+
+def permutations(n: int, k: int) -> int:
+    """
+    Calculate the number of k-permutations of n, n! / (n-k)!.
+    Computed without forming the factorials; 0 if k > n.
+    
+    Args:
+        n (int): Non-negative integer
+        k (int): Non-negative integer
+        
+    Returns:
+        int: Number of ordered arrangements of k items from n
+        
+    Raises:
+        TypeError: If n or k is not an integer
+        ValueError: If n or k is negative
+    """
+    _check_natural(n, k)
+    return math.perm(n, k)
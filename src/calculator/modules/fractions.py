@@ -3,6 +3,10 @@ Fractions Module for Scientific Calculator
 Provides fraction operations including simplification and arithmetic operations.
 """
 
+import functools
+import math
+import numbers
+import operator
 from fractions import Fraction
 from typing import Union
 
@@ -164,4 +168,273 @@ def decimal_to_fraction(decimal: Number) -> tuple:
         raise TypeError("Input must be a number")
         
     frac = Fraction(decimal).limit_denominator()
-    return (frac.numerator, frac.denominator)
\ No newline at end of file
+    return (frac.numerator, frac.denominator)
+
+def scientific(numerator: int, denominator: int = 1, digits: int = 10) -> str:
+    """
+    Format a fraction in scientific notation without converting it to a string.
+    
+    The leading digits are found by integer division, so the mantissa is
+    exact however many digits the numerator and denominator have.
+    
+    Args:
+        numerator (int): Numerator of the fraction
+        denominator (int): Positive denominator of the fraction
+        digits (int): Significant digits of the mantissa
+        
+    Returns:
+        str: Text of the form "d.ddde+N" (or "0" for zero)
+    """
+    if numerator == 0:
+        return "0"
+    magnitude = abs(numerator)
+    # A lower bound on the decimal exponent, at most a few below it
+    exponent = math.floor((magnitude.bit_length() - denominator.bit_length() - 1) * math.log10(2)) - 1
+    shift = exponent - digits
+    if shift >= 0:
+        leading = magnitude // (denominator * 10 ** shift)
+    else:
+        leading = magnitude * 10 ** -shift // denominator
+    # leading has at most digits + 4 digits, so the float is exact
+    mantissa, power = f"{leading:.{digits - 1}e}".split("e")
+    mantissa = mantissa.rstrip("0").rstrip(".")
+    sign = "-" if numerator < 0 else ""
+    return f"{sign}{mantissa}e{int(power) + shift:+d}"
+
+# Denominator size, in bits, above which arithmetic results are reduced
+# early to keep long chains of operations from growing without bound
+REDUCE_BITS = 1024
+
+class Rational:
+    """
+    Exact fraction whose reduction to lowest terms is deferred.
+    
+    Arithmetic cross-multiplies without taking gcds, so a chain of
+    operations does not normalize at every step. The value is reduced when
+    it is displayed or hashed, when it is raised to a power, or when its
+    denominator grows past REDUCE_BITS.
+    """
+    
+    __slots__ = ("numerator", "denominator")
+    
+    def __init__(self, numerator: int, denominator: int = 1):
+        """
+        Args:
+            numerator (int): Numerator
+            denominator (int): Denominator, not necessarily coprime with
+                the numerator
+            
+        Raises:
+            TypeError: If numerator or denominator is not an integer
+            ZeroDivisionError: If denominator is zero
+        """
+        if not isinstance(numerator, int) or not isinstance(denominator, int):
+            raise TypeError("Numerator and denominator must be integers")
+        if denominator == 0:
+            raise ZeroDivisionError("division by zero")
+        if denominator < 0:
+            numerator, denominator = -numerator, -denominator
+        self.numerator = numerator
+        self.denominator = denominator
+    
+    @classmethod
+    def _make(cls, numerator: int, denominator: int) -> "Rational":
+        """Build from integers already checked, with a positive denominator"""
+        value = object.__new__(cls)
+        value.numerator = numerator
+        value.denominator = denominator
+        if denominator.bit_length() > REDUCE_BITS:
+            value.reduce()
+        return value
+    
+    def reduce(self) -> "Rational":
+        """Reduce to lowest terms in place and return self"""
+        divisor = math.gcd(self.numerator, self.denominator)
+        if divisor != 1:
+            self.numerator //= divisor
+            self.denominator //= divisor
+        return self
+    
+    def __add__(self, other):
+        if isinstance(other, int):
+            return Rational._make(self.numerator + other * self.denominator, self.denominator)
+        if isinstance(other, Rational):
+            if self.denominator == other.denominator:
+                return Rational._make(self.numerator + other.numerator, self.denominator)
+            return Rational._make(self.numerator * other.denominator + other.numerator * self.denominator,
+                                  self.denominator * other.denominator)
+        if isinstance(other, float):
+            return float(self) + other
+        return NotImplemented
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        return self + -other if isinstance(other, (int, float, Rational)) else NotImplemented
+    
+    def __rsub__(self, other):
+        return -self + other
+    
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return Rational._make(self.numerator * other, self.denominator)
+        if isinstance(other, Rational):
+            return Rational._make(self.numerator * other.numerator, self.denominator * other.denominator)
+        if isinstance(other, float):
+            return float(self) * other
+        return NotImplemented
+    
+    __rmul__ = __mul__
+    
+    def __truediv__(self, other):
+        if isinstance(other, (int, Rational)):
+            if other == 0:
+                raise ZeroDivisionError("division by zero")
+            numerator, denominator = other.denominator, other.numerator
+            if denominator < 0:
+                numerator, denominator = -numerator, -denominator
+            return Rational._make(self.numerator * numerator, self.denominator * denominator)
+        if isinstance(other, float):
+            return float(self) / other
+        return NotImplemented
+    
+    def __rtruediv__(self, other):
+        if isinstance(other, int):
+            return Rational(other) / self
+        if isinstance(other, float):
+            return other / float(self)
+        return NotImplemented
+    
+    def __pow__(self, exponent):
+        if isinstance(exponent, Rational):
+            exponent.reduce()
+            if exponent.denominator == 1:
+                exponent = exponent.numerator
+        if not isinstance(exponent, int):
+            return float(self) ** exponent
+        self.reduce()
+        if exponent >= 0:
+            return Rational._make(self.numerator ** exponent, self.denominator ** exponent)
+        if self.numerator == 0:
+            raise ZeroDivisionError("0.0 cannot be raised to a negative power")
+        return Rational(self.denominator ** -exponent, self.numerator ** -exponent)
+    
+    def __rpow__(self, base):
+        self.reduce()
+        if self.denominator == 1:
+            return base ** self.numerator
+        return base ** float(self)
+    
+    def __neg__(self) -> "Rational":
+        return Rational._make(-self.numerator, self.denominator)
+    
+    def __pos__(self) -> "Rational":
+        return self
+    
+    def __abs__(self) -> "Rational":
+        return Rational._make(abs(self.numerator), self.denominator)
+    
+    def __float__(self) -> float:
+        # int / int is correctly rounded, even beyond float precision
+        return self.numerator / self.denominator
+    
+    def __int__(self) -> int:
+        if self.numerator < 0:
+            return -(-self.numerator // self.denominator)
+        return self.numerator // self.denominator
+    
+    def __bool__(self) -> bool:
+        return self.numerator != 0
+    
+    def _compare(self, other, compare):
+        if isinstance(other, numbers.Rational):
+            # Denominators are positive, so cross-multiplying keeps the order
+            return compare(self.numerator * other.denominator, other.numerator * self.denominator)
+        if isinstance(other, float):
+            return compare(Fraction(self.numerator, self.denominator), other)
+        return NotImplemented
+    
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+    
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+    
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+    
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+    
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+    
+    def __hash__(self) -> int:
+        # Equal to the hash of the equal int, Fraction or float
+        return hash(Fraction(self.numerator, self.denominator))
+    
+    def __reduce__(self):
+        return (Rational, (self.numerator, self.denominator))
+    
+    def __str__(self) -> str:
+        self.reduce()
+        try:
+            if self.denominator == 1:
+                return str(self.numerator)
+            return f"{self.numerator}/{self.denominator}"
+        except ValueError:
+            # Beyond the interpreter's str() digit limit
+            return scientific(self.numerator, self.denominator)
+    
+    def __repr__(self) -> str:
+        try:
+            return f"Rational({self.numerator}, {self.denominator})"
+        except ValueError:
+            return f"Rational({scientific(self.numerator, self.denominator)})"
+
+numbers.Rational.register(Rational)
+
+def divide(x, y):
+    """
+    Divide, keeping the quotient of two integers exact.
+    
+    Args:
+        x: Dividend
+        y: Divisor
+        
+    Returns:
+        Rational for integer operands, otherwise x / y
+        
+    Raises:
+        ZeroDivisionError: If y is zero
+    """
+    if type(x) is int and type(y) is int:
+        if y == 0:
+            raise ZeroDivisionError("division by zero")
+        return Rational._make(x, y) if y > 0 else Rational._make(-x, -y)
+    return x / y
+
+def sum_fractions(*terms):
+    """
+    Add numbers, over one common denominator when they are all exact.
+    
+    The numerators of integers and Rationals are scaled to the least
+    common multiple of the denominators and added in one pass, instead of
+    adding fractions pairwise. Other values are added left to right.
+    
+    Args:
+        *terms: Numbers to add
+        
+    Returns:
+        int or Rational for exact terms, otherwise the sum of the terms
+    """
+    for term in terms:
+        if not isinstance(term, (int, Rational)):
+            total = terms[0]
+            for term in terms[1:]:
+                total = total + term
+            return total
+    # math.lcm takes several arguments only from Python 3.9
+    common = functools.reduce(lambda a, b: a // math.gcd(a, b) * b, [term.denominator for term in terms], 1)
+    numerator = sum([term.numerator * (common // term.denominator) for term in terms])
+    return numerator if common == 1 else Rational._make(numerator, common)
@@ -24,7 +24,11 @@ def ln(x: Number) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _ln(x)
+
+def _ln(x: Number) -> float:
+    """ln() without type validation"""
     if x <= 0:
         raise ValueError("Input must be positive")
         
@@ -46,7 +50,11 @@ def log10(x: Number) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _log10(x)
+
+def _log10(x: Number) -> float:
+    """log10() without type validation"""
     if x <= 0:
         raise ValueError("Input must be positive")
         
@@ -68,7 +76,11 @@ def log2(x: Number) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _log2(x)
+
+def _log2(x: Number) -> float:
+    """log2() without type validation"""
     if x <= 0:
         raise ValueError("Input must be positive")
         
@@ -91,11 +103,23 @@ def log(x: Number, base: Number = math.e) -> float:
     """
     if not isinstance(x, (int, float)) or not isinstance(base, (int, float)):
         raise TypeError("Inputs must be numbers")
-    
+        
+    return _log(x, base)
+
+def _log(x: Number, base: Number = math.e) -> float:
+    """log() without type validation"""
     if x <= 0:
         raise ValueError("x must be positive")
         
     if base <= 0 or base == 1:
         raise ValueError("Base must be positive and not equal to 1")
         
-    return math.log(x, base)
\ No newline at end of file
+    return math.log(x, base)
+
+# Public function -> the same function without the type check
+KERNELS = {
+    ln: _ln,
+    log10: _log10,
+    log2: _log2,
+    log: _log,
+}
@@ -26,6 +26,10 @@ def power(x: Number, y: Number) -> float:
     if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
         raise TypeError("Inputs must be numbers")
     
+    return _power(x, y)
+
+def _power(x: Number, y: Number) -> float:
+    """power() without type validation"""
     # Handle negative base with non-integer exponent
     if x < 0 and not isinstance(y, int):
         raise ValueError("Negative base with non-integer exponent is not supported")
@@ -49,6 +53,10 @@ def sqrt(x: Number) -> float:
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
     
+    return _sqrt(x)
+
+def _sqrt(x: Number) -> float:
+    """sqrt() without type validation"""
     if x < 0:
         raise ValueError("Cannot calculate square root of negative number")
         
@@ -70,6 +78,10 @@ def cbrt(x: Number) -> float:
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
     
+    return _cbrt(x)
+
+def _cbrt(x: Number) -> float:
+    """cbrt() without type validation"""
     # Handle negative numbers correctly
     if x < 0:
         return -math.pow(-x, 1/3)
@@ -124,7 +136,6 @@ def exp(x: Number) -> float:
         
     return math.exp(x)
 
-
 def square(x: Number) -> float:
     """
     Calculate the square of a number (x^2).
@@ -133,15 +144,26 @@ def square(x: Number) -> float:
         x (Number): Base number
         
     Returns:
-        float: x squared
+        Number: x squared, exact for integers
         
     Raises:
         TypeError: If x is not a number
+        OverflowError: If a float result is out of range
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
         
-    return power(x, 2)
+    return _square(x)
+
+def _square(x: Number) -> Number:
+    """square() without type validation"""
+    return _in_range(x, x * x)
+
+def _in_range(x: Number, result: Number) -> Number:
+    """Raise OverflowError like math.pow for a finite x with an infinite result"""
+    if (result == math.inf or result == -math.inf) and math.isfinite(x):
+        raise OverflowError("math range error")
+    return result
 
 def cube(x: Number) -> float:
     """
@@ -151,15 +173,20 @@ def cube(x: Number) -> float:
         x (Number): Base number
         
     Returns:
-        float: x cubed
+        Number: x cubed, exact for integers
         
     Raises:
         TypeError: If x is not a number
+        OverflowError: If a float result is out of range
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
         
-    return power(x, 3)
+    return _cube(x)
+
+def _cube(x: Number) -> Number:
+    """cube() without type validation"""
+    return _in_range(x, x * x * x)
 
 def reciprocal(x: Number) -> float:
     """
@@ -178,7 +205,23 @@ def reciprocal(x: Number) -> float:
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
     
+    return _reciprocal(x)
+
+def _reciprocal(x: Number) -> float:
+    """reciprocal() without type validation"""
     if x == 0:
         raise ValueError("Cannot calculate reciprocal of zero")
         
-    return 1 / x
\ No newline at end of file
+    return 1 / x
+
+# Unchecked kernels by public function, for callers that know their
+# arguments are ints or floats
+KERNELS = {
+    power: _power,
+    sqrt: _sqrt,
+    cbrt: _cbrt,
+    exp: math.exp,
+    square: _square,
+    cube: _cube,
+    reciprocal: _reciprocal,
+}
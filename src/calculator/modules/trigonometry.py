@@ -1,20 +1,193 @@
 """
 Trigonometry Module for Scientific Calculator
 Provides trigonometric functions including sin, cos, tan and their inverses/hyperbolic variants.
+
+Angles in degrees (or gradians) are not converted to radians first: they
+are reduced exactly to a quadrant and an offset within it, so sin(180) is
+exactly 0 and sin(30) exactly 0.5, and only the offset is converted. The
+inverse functions return angles in the same unit, exact where the forward
+functions are, so asin(sin(30)) is 30.
 """
 
 import math
-from typing import Union
+import threading
+from collections import OrderedDict
+from typing import Tuple, Union
 
 Number = Union[int, float]
 
-def sin(x: Number, degrees: bool = False) -> float:
+# Units in a full turn
+DEGREES_PER_TURN = 360
+GRADIANS_PER_TURN = 400
+
+_SQRT1_2 = math.sqrt(0.5)
+_SQRT3_2 = math.sqrt(3) / 2
+
+# (sine, cosine) of the offsets within a quadrant whose values are known
+# exactly (to the nearest float), by units per turn
+EXACT_OFFSETS = {
+    DEGREES_PER_TURN: {
+        0: (0.0, 1.0),
+        30: (0.5, _SQRT3_2),
+        45: (_SQRT1_2, _SQRT1_2),
+        60: (_SQRT3_2, 0.5),
+    },
+    GRADIANS_PER_TURN: {
+        0: (0.0, 1.0),
+        50: (_SQRT1_2, _SQRT1_2),
+    },
+}
+
+# Angles in degrees at which sin and tan give these non-negative values
+EXACT_ASIN = {0.0: 0, 0.5: 30, _SQRT1_2: 45, _SQRT3_2: 60, 1.0: 90}
+EXACT_ATAN = {0.0: 0, 0.5 / _SQRT3_2: 30, 1.0: 45, _SQRT3_2 / 0.5: 60}
+
+class AngleReductions:
+    """
+    Memo of reduced angles in degrees or gradians.
+    
+    A non-negative angle is reduced to ``(quadrant, sine, cosine)``: the
+    quadrant of the angle modulo a full turn and the sine and cosine of its
+    offset within the quadrant. Calculators see the same few angles over
+    and over, so the most recently used ``maxsize`` reductions are remembered.
+    The memo is shared between threads and guarded by a lock.
+    """
+    
+    def __init__(self, maxsize: int = 256, turn: int = DEGREES_PER_TURN):
+        """
+        Args:
+            maxsize (int): Reductions remembered at once
+            turn (int): Units in a full turn, 360 or 400
+        """
+        if maxsize < 0:
+            raise ValueError("Cache size must be non-negative")
+        self.maxsize = maxsize
+        self.turn = turn
+        self._quarter = turn // 4
+        self._exact = EXACT_OFFSETS[turn]
+        self._radians_per_unit = math.pi / (turn // 2)
+        self._entries: "OrderedDict[Number, Tuple[int, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, x: Number) -> Tuple[int, float, float]:
+        """
+        Reduce a non-negative angle.
+        
+        Args:
+            x (Number): Angle in this memo's unit, at least 0
+            
+        Returns:
+            Tuple[int, float, float]: Quadrant (0 to 3), and sine and cosine
+            of the angle's offset within it
+        """
+        with self._lock:
+            try:
+                value = self._entries[x]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(x)
+                self.hits += 1
+                return value
+        value = self._reduce(x)
+        if self.maxsize:
+            with self._lock:
+                self._entries[x] = value
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+    
+    def _reduce(self, x: Number) -> Tuple[int, float, float]:
+        """Reduce a non-negative angle without the memo"""
+        if isinstance(x, float):
+            if not math.isfinite(x):
+                # Infinity raises ValueError like math.sin; NaN stays NaN
+                return 0, math.sin(x), math.cos(x)
+            # fmod is exact, and so is subtracting a multiple of the quarter below
+            x = math.fmod(x, self.turn)
+        else:
+            x = x % self.turn
+        quarter = self._quarter
+        quadrant = int(x // quarter)
+        offset = x - quarter * quadrant
+        exact = self._exact.get(offset)
+        if exact is not None:
+            return (quadrant,) + exact
+        if offset <= quarter / 2:
+            radians = offset * self._radians_per_unit
+            return quadrant, math.sin(radians), math.cos(radians)
+        # Near the quarter the complement is small, which keeps the conversion accurate
+        radians = (quarter - offset) * self._radians_per_unit
+        return quadrant, math.cos(radians), math.sin(radians)
+    
+    def clear(self):
+        """Forget the reductions and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+    
+    def stats(self) -> dict:
+        """Get size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# Reductions used by sin, cos and tan in degrees and in gradians
+degree_reductions = AngleReductions()
+gradian_reductions = AngleReductions(turn=GRADIANS_PER_TURN)
+
+# Results are negated by subtracting from 0.0, which never gives -0.0
+def _sin_reduced(x: Number, reductions: AngleReductions) -> float:
+    """Sine of an angle in degrees or gradians"""
+    quadrant, sine, cosine = reductions.get(-x if x < 0 else x)
+    result = (sine, cosine, 0.0 - sine, 0.0 - cosine)[quadrant]
+    return 0.0 - result if x < 0 else result
+
+def _cos_reduced(x: Number, reductions: AngleReductions) -> float:
+    """Cosine of an angle in degrees or gradians"""
+    quadrant, sine, cosine = reductions.get(-x if x < 0 else x)
+    return (cosine, 0.0 - sine, 0.0 - cosine, sine)[quadrant]
+
+def _tan_reduced(x: Number, reductions: AngleReductions) -> float:
+    """Tangent of an angle in degrees or gradians"""
+    quadrant, sine, cosine = reductions.get(-x if x < 0 else x)
+    if quadrant % 2:
+        if sine == 0:
+            raise ValueError("Tangent is undefined for this angle")
+        result = 0.0 - cosine / sine
+    else:
+        result = sine / cosine
+    return 0.0 - result if x < 0 else result
+
+def _angle(radians: float, degrees: bool, gradians: bool) -> float:
+    """Convert the result of an inverse function from radians"""
+    if gradians:
+        return radians * (GRADIANS_PER_TURN / 2) / math.pi
+    return math.degrees(radians) if degrees else radians
+
+def _exact_angle(angle: int, gradians: bool) -> float:
+    """Convert an exact angle in degrees to the requested unit"""
+    return angle * 10 / 9 if gradians else float(angle)
+
+def sin(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate sine of an angle.
     
     Args:
-        x (Number): Angle in radians or degrees
+        x (Number): Angle in radians, degrees or gradians
         degrees (bool): If True, interpret x as degrees. Default is False (radians)
+        gradians (bool): If True, interpret x as gradians
         
     Returns:
         float: Sine of the angle
@@ -24,19 +197,26 @@ def sin(x: Number, degrees: bool = False) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _sin(x, degrees, gradians)
+
+def _sin(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """sin() without type validation"""
     if degrees:
-        x = math.radians(x)
+        return _sin_reduced(x, degree_reductions)
+    if gradians:
+        return _sin_reduced(x, gradian_reductions)
         
     return math.sin(x)
 
-def cos(x: Number, degrees: bool = False) -> float:
+def cos(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate cosine of an angle.
     
     Args:
-        x (Number): Angle in radians or degrees
+        x (Number): Angle in radians, degrees or gradians
         degrees (bool): If True, interpret x as degrees. Default is False (radians)
+        gradians (bool): If True, interpret x as gradians
         
     Returns:
         float: Cosine of the angle
@@ -46,19 +226,26 @@ def cos(x: Number, degrees: bool = False) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _cos(x, degrees, gradians)
+
+def _cos(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """cos() without type validation"""
     if degrees:
-        x = math.radians(x)
+        return _cos_reduced(x, degree_reductions)
+    if gradians:
+        return _cos_reduced(x, gradian_reductions)
         
     return math.cos(x)
 
-def tan(x: Number, degrees: bool = False) -> float:
+def tan(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate tangent of an angle.
     
     Args:
-        x (Number): Angle in radians or degrees
+        x (Number): Angle in radians, degrees or gradians
         degrees (bool): If True, interpret x as degrees. Default is False (radians)
+        gradians (bool): If True, interpret x as gradians
         
     Returns:
         float: Tangent of the angle
@@ -69,9 +256,15 @@ def tan(x: Number, degrees: bool = False) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _tan(x, degrees, gradians)
+
+def _tan(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """tan() without type validation"""
     if degrees:
-        x = math.radians(x)
+        return _tan_reduced(x, degree_reductions)
+    if gradians:
+        return _tan_reduced(x, gradian_reductions)
         
     # Check for undefined values (when cos(x) = 0)
     if abs(math.cos(x)) < 1e-15:
@@ -79,15 +272,17 @@ def tan(x: Number, degrees: bool = False) -> float:
         
     return math.tan(x)
 
-def asin(x: Number) -> float:
+def asin(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate arc sine (inverse sine) of a value.
     
     Args:
         x (Number): Value in the range [-1, 1]
+        degrees (bool): If True, return the angle in degrees. Default is False (radians)
+        gradians (bool): If True, return the angle in gradians
         
     Returns:
-        float: Arc sine in radians
+        float: Arc sine in radians, degrees or gradians
         
     Raises:
         TypeError: If x is not a number
@@ -95,21 +290,31 @@ def asin(x: Number) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _asin(x, degrees, gradians)
+
+def _asin(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """asin() without type validation"""
     if x < -1 or x > 1:
         raise ValueError("Input must be in the range [-1, 1]")
         
-    return math.asin(x)
+    if degrees or gradians:
+        angle = EXACT_ASIN.get(abs(x))
+        if angle is not None:
+            return _exact_angle(angle if x >= 0 else -angle, gradians)
+    return _angle(math.asin(x), degrees, gradians)
 
-def acos(x: Number) -> float:
+def acos(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate arc cosine (inverse cosine) of a value.
     
     Args:
         x (Number): Value in the range [-1, 1]
+        degrees (bool): If True, return the angle in degrees. Default is False (radians)
+        gradians (bool): If True, return the angle in gradians
         
     Returns:
-        float: Arc cosine in radians
+        float: Arc cosine in radians, degrees or gradians
         
     Raises:
         TypeError: If x is not a number
@@ -117,21 +322,31 @@ def acos(x: Number) -> float:
     """
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
-    
+        
+    return _acos(x, degrees, gradians)
+
+def _acos(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """acos() without type validation"""
     if x < -1 or x > 1:
         raise ValueError("Input must be in the range [-1, 1]")
         
-    return math.acos(x)
+    if degrees or gradians:
+        angle = EXACT_ASIN.get(abs(x))
+        if angle is not None:
+            return _exact_angle(90 - angle if x >= 0 else 90 + angle, gradians)
+    return _angle(math.acos(x), degrees, gradians)
 
-def atan(x: Number) -> float:
+def atan(x: Number, degrees: bool = False, gradians: bool = False) -> float:
     """
     Calculate arc tangent (inverse tangent) of a value.
     
     Args:
         x (Number): Any real number
+        degrees (bool): If True, return the angle in degrees. Default is False (radians)
+        gradians (bool): If True, return the angle in gradians
         
     Returns:
-        float: Arc tangent in radians
+        float: Arc tangent in radians, degrees or gradians
         
     Raises:
         TypeError: If x is not a number
@@ -139,7 +354,15 @@ def atan(x: Number) -> float:
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
         
-    return math.atan(x)
+    return _atan(x, degrees, gradians)
+
+def _atan(x: Number, degrees: bool = False, gradians: bool = False) -> float:
+    """atan() without type validation"""
+    if degrees or gradians:
+        angle = EXACT_ATAN.get(abs(x))
+        if angle is not None:
+            return _exact_angle(angle if x >= 0 else -angle, gradians)
+    return _angle(math.atan(x), degrees, gradians)
 
 def sinh(x: Number) -> float:
     """
@@ -193,4 +416,18 @@ def tanh(x: Number) -> float:
     if not isinstance(x, (int, float)):
         raise TypeError("Input must be a number")
         
-    return math.tanh(x)
\ No newline at end of file
+    return math.tanh(x)
+
+# Kernels without validation, by public function; the hyperbolic functions
+# need no checks beyond the type, so their kernels are math's own
+KERNELS = {
+    sin: _sin,
+    cos: _cos,
+    tan: _tan,
+    asin: _asin,
+    acos: _acos,
+    atan: _atan,
+    sinh: math.sinh,
+    cosh: math.cosh,
+    tanh: math.tanh,
+}
@@ -0,0 +1,377 @@
+"""
+Scientific Calculator Evaluation Server
+JSON-over-HTTP evaluation service using only the standard library.
+
+The server listens on a TCP port (localhost by default) or a Unix domain
+socket. Connections are kept alive, so a client can send many requests,
+pipelined or one after another, over one connection. Each connection is a
+session with its own controller, so variables and ``ans`` are private to
+it; sessions share only the cache of compiled expressions, so an
+expression compiled for one client is a cache hit for every other client.
+Sessions evaluate concurrently, one thread per connection.
+
+Endpoints:
+    POST /evaluate  {"expression": "2+3"}          -> {"result": 5}
+                    {"expressions": ["2+3", "1/0"]} -> {"results": [{"result": 5},
+                                                                    {"error": "..."}]}
+    GET  /stats     request counts, throughput, latency percentiles,
+                    cache statistics and, with --timings, per-stage timings
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+# Add the current directory to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.calculation_history import format_integer
+from core.calculator import CalculatorController
+from core.cost_guard import CostLimits
+from core.expression_cache import ExpressionCache
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class EvaluationService:
+    """Creates per-connection sessions sharing compiled expressions, with request statistics"""
+
+    def __init__(self, controller: Optional[CalculatorController] = None,
+                 latency_window: int = 10000):
+        """
+        Args:
+            controller (Optional[CalculatorController]): Template for the
+                sessions: its functions, limits, modes and instrumentation
+                are used, and its cache size sizes the shared cache
+            latency_window (int): Number of recent requests kept for latency
+                percentiles
+        """
+        self.controller = controller if controller is not None else CalculatorController()
+        self.compiled_cache = ExpressionCache(self.controller.expression_cache.maxsize)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._latencies = deque(maxlen=latency_window)
+        self.requests = 0
+        self.expressions = 0
+        self.errors = 0
+        self.connections = 0
+
+    def session(self) -> CalculatorController:
+        """
+        Create the controller of one connection.
+
+        Returns:
+            CalculatorController: Controller with its own variables and
+            history, compiling through the shared cache
+        """
+        template = self.controller
+        session = CalculatorController(functions=template.functions, limits=template.limits,
+                                       compiled_cache=self.compiled_cache)
+        session.angle_mode = template.angle_mode
+        session.precision = template.precision
+        session.rationals = template.rationals
+        if template.instrumentation is not None:
+            session.enable_instrumentation(instrumentation=template.instrumentation)
+        return session
+
+    def evaluate(self, session: CalculatorController, expression: str) -> dict:
+        """
+        Evaluate one expression in a session.
+
+        Args:
+            session (CalculatorController): Controller of the connection
+            expression (str): Expression or assignment
+
+        Returns:
+            dict: {"result": value} or {"error": message}
+        """
+        result = session.process_input(expression)
+        with self._lock:
+            self.expressions += 1
+            if isinstance(result, str):
+                self.errors += 1
+        return _encode_result(result)
+
+    def evaluate_batch(self, session: CalculatorController, expressions: List[str]) -> List[dict]:
+        """
+        Evaluate expressions in order in a session.
+
+        Args:
+            session (CalculatorController): Controller of the connection
+            expressions (List[str]): Expressions or assignments
+
+        Returns:
+            List[dict]: Encoded result of each expression
+        """
+        return [self.evaluate(session, expression) for expression in expressions]
+
+    def record_request(self, seconds: float):
+        """Add one handled request to the statistics"""
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(seconds)
+
+    def stats(self) -> dict:
+        """
+        Get throughput, latency and cache statistics.
+
+        Returns:
+            dict: Statistics since the service started
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._started
+            latencies = sorted(self._latencies)
+            stats = {
+                "uptime": uptime,
+                "connections": self.connections,
+                "requests": self.requests,
+                "expressions": self.expressions,
+                "errors": self.errors,
+                "requests_per_second": self.requests / uptime if uptime > 0 else 0.0,
+                "expressions_per_second": self.expressions / uptime if uptime > 0 else 0.0,
+                "cache": self.compiled_cache.stats(),
+            }
+            timings = self.controller.timing_stats()
+        if timings:
+            stats["stages"] = timings
+        if latencies:
+            stats["latency_ms"] = {
+                "mean": sum(latencies) / len(latencies) * 1000,
+                "p50": _percentile(latencies, 0.50) * 1000,
+                "p90": _percentile(latencies, 0.90) * 1000,
+                "p99": _percentile(latencies, 0.99) * 1000,
+                "max": latencies[-1] * 1000,
+            }
+        return stats
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _encode_result(result) -> dict:
+    """Turn a process_input result into a JSON-ready response entry"""
+    if isinstance(result, str):
+        return {"error": result[len("Error: "):] if result.startswith("Error: ") else result}
+    try:
+        json.dumps(result, allow_nan=False)
+    except TypeError:
+        # Log-space approximation beyond float range
+        return {"result": str(result)}
+    except ValueError:
+        if isinstance(result, int):
+            # Integer beyond the str() digit limit, sent in scientific form
+            return {"result": format_integer(result)}
+        # Non-finite float
+        return {"error": "Result cannot be represented in JSON"}
+    return {"result": result}
+
+
+class EvaluationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler; the connection stays open between requests"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ScientificCalculator"
+
+    def setup(self):
+        super().setup()
+        # Controller of this connection, created on its first evaluation
+        self.session: Optional[CalculatorController] = None
+        service = self.server.service
+        with service._lock:
+            service.connections += 1
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.server.service.stats())
+        else:
+            self._send(404, {"error": "Not found"})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        try:
+            length = self._content_length()
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        if self.path != "/evaluate":
+            self._discard_body(length)
+            self._send(404, {"error": "Not found"})
+            return
+        try:
+            request = self._read_json(length)
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        service = self.server.service
+        if self.session is None:
+            self.session = service.session()
+        if isinstance(request.get("expression"), str):
+            response = service.evaluate(self.session, request["expression"])
+        elif isinstance(request.get("expressions"), list) and all(
+                isinstance(expression, str) for expression in request["expressions"]):
+            response = {"results": service.evaluate_batch(self.session, request["expressions"])}
+        else:
+            self._send(400, {"error": 'Expected "expression" or a list of "expressions"'})
+            return
+        self._send(200, response)
+        service.record_request(time.perf_counter() - started)
+
+    def _content_length(self) -> int:
+        """
+        Read the declared body length.
+
+        Raises:
+            ValueError: If the length is malformed or negative; the
+                connection is closed since the body cannot be skipped
+        """
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            raise ValueError("Invalid Content-Length")
+        return length
+
+    def _read_json(self, length: int) -> dict:
+        """Read and decode the JSON request body"""
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            raise ValueError("Request body too large")
+        body = self.rfile.read(length)
+        try:
+            request = json.loads(body)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ValueError("Request body is not valid JSON")
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        return request
+
+    def _discard_body(self, length: int):
+        """Consume an unused request body so the connection stays usable"""
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+        elif length:
+            self.rfile.read(length)
+
+    def _send(self, status: int, payload: dict):
+        """Send a JSON response with an explicit length, keeping the connection open"""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    """Threaded evaluation server on a TCP address"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service: Optional[EvaluationService] = None, verbose: bool = False):
+        self.service = service if service is not None else EvaluationService()
+        self.verbose = verbose
+        super().__init__(address, EvaluationRequestHandler)
+
+
+class UnixEvaluationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded evaluation server on a Unix domain socket"""
+
+    daemon_threads = True
+
+    def __init__(self, path: str, service: Optional[EvaluationService] = None, verbose: bool = False):
+        """
+        Args:
+            path (str): Socket path; a stale socket there is replaced
+            service (Optional[EvaluationService]): Shared evaluation state
+            verbose (bool): Log each request
+
+        Raises:
+            FileExistsError: If path exists and is not a socket
+        """
+        self.service = service if service is not None else EvaluationService()
+        self.verbose = verbose
+        # Names used by BaseHTTPRequestHandler for the Host header and logs
+        self.server_name = "localhost"
+        self.server_port = 0
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Only a socket left behind by an earlier server may be replaced
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"Not a socket, refusing to replace: {path}")
+            os.remove(path)
+        super().__init__(path, EvaluationRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the evaluation server"""
+    parser = argparse.ArgumentParser(description="Serve calculator evaluations as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix-socket", metavar="PATH",
+                        help="listen on a Unix domain socket instead of TCP")
+    parser.add_argument("--cache-size", type=int, default=4096,
+                        help="compiled expressions shared by all connections (default: 4096)")
+    parser.add_argument("--max-digits", type=int, default=100_000,
+                        help="largest integer result, in digits (default: 100000)")
+    parser.add_argument("--max-factorial", type=int, default=20_000,
+                        help="largest factorial argument (default: 20000)")
+    parser.add_argument("--approximate", action="store_true",
+                        help="approximate results over the limits instead of rejecting them")
+    parser.add_argument("--timings", action="store_true",
+                        help="record per-stage timings and report them in /stats")
+    parser.add_argument("--dump-timings", type=float, metavar="SECONDS",
+                        help="also write the per-stage timings to stderr every SECONDS")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    limits = CostLimits(args.max_digits, args.max_factorial, args.approximate)
+    controller = CalculatorController(cache_size=args.cache_size, limits=limits)
+    if args.timings or args.dump_timings:
+        controller.enable_instrumentation(args.dump_timings)
+    service = EvaluationService(controller)
+    if args.unix_socket:
+        server = UnixEvaluationServer(args.unix_socket, service, args.verbose)
+        where = args.unix_socket
+    else:
+        server = EvaluationServer((args.host, args.port), service, args.verbose)
+        where = f"http://{args.host}:{server.server_port}"
+    print(f"Serving calculator evaluations on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
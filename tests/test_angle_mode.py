@@ -0,0 +1,102 @@
+"""
+Unit tests for the controller's angle mode.
+"""
+
+import unittest
+import math
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.calculator.core.calculator import CalculatorController, ANGLE_MODES
+
+
+class TestAngleMode(unittest.TestCase):
+    """Test cases for switching between degrees, radians and gradians."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+
+    def evaluate(self, expression):
+        return self.controller.process_input(expression)
+
+    def test_modes(self):
+        """Test forward and inverse functions in each mode."""
+        self.assertEqual(ANGLE_MODES, ("DEG", "RAD", "GRAD"))
+        self.assertEqual(self.controller.angle_mode, "DEG")
+        self.assertEqual(self.evaluate("sin(90) + asin(1)"), 91)
+        self.controller.angle_mode = "RAD"
+        self.assertEqual(self.evaluate("sin(pi/2)"), 1)
+        self.assertEqual(self.evaluate("asin(1)"), math.pi / 2)
+        self.controller.angle_mode = "GRAD"
+        self.assertEqual(self.evaluate("cos(200)"), -1)
+        self.assertEqual(self.evaluate("acos(0)"), 100)
+
+    def test_display_of_multiples_of_pi(self):
+        """Test that radian results are shown as computed, without rounding to zero."""
+        self.assertEqual(self.controller.format_output(self.evaluate("sin(180)")), "0")
+        self.controller.angle_mode = "RAD"
+        # pi is not exactly representable, so sin(pi) is its tiny error
+        self.assertEqual(self.controller.format_output(self.evaluate("sin(pi)")), "1.224646799e-16")
+        self.assertEqual(self.controller.format_output(self.evaluate("cos(pi)")), "-1")
+
+    def test_round_trips(self):
+        """Test that inverse functions return angles in the current mode."""
+        self.assertEqual(self.evaluate("asin(sin(30))"), 30)
+        self.assertEqual(self.evaluate("atan(tan(60))"), 60)
+        self.assertEqual(self.evaluate("acos(cos(135))"), 135)
+        self.controller.angle_mode = "GRAD"
+        self.assertEqual(self.evaluate("asin(sin(50))"), 50)
+
+    def test_cache_is_keyed_by_mode(self):
+        """Test that compiled forms for each mode are kept and reused."""
+        self.assertEqual(self.evaluate("asin(1)"), 90)
+        self.controller.angle_mode = "RAD"
+        self.assertEqual(self.evaluate("asin(1)"), math.pi / 2)
+        self.controller.angle_mode = "DEG"
+        self.assertEqual(self.evaluate("asin(1)"), 90)
+        stats = self.controller.cache_stats()
+        self.assertEqual((stats["hits"], stats["size"]), (1, 2))
+
+    def test_formulas_follow_the_mode(self):
+        """Test that formulas are recompiled when the mode changes."""
+        self.evaluate("x = 1")
+        self.evaluate("angle = asin(x)")
+        self.controller.angle_mode = "GRAD"
+        self.assertEqual(self.evaluate("angle"), 100)
+        self.evaluate("x = 0")
+        self.assertEqual(self.evaluate("angle"), 0)
+
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected."""
+        with self.assertRaises(ValueError):
+            self.controller.angle_mode = "turns"
+        self.assertEqual(self.controller.angle_mode, "DEG")
+
+    def test_precision_mode(self):
+        """Test decimal trigonometry in gradians."""
+        self.controller.precision = 30
+        self.controller.angle_mode = "GRAD"
+        self.assertEqual(self.evaluate("sin(100)"), 1)
+        self.assertEqual(self.evaluate("cos(50)"), Decimal("0.707106781186547524400844362105"))
+
+    def test_hyperbolic_functions(self):
+        """Test that hyperbolic functions ignore the angle mode."""
+        self.assertAlmostEqual(self.evaluate("sinh(1)"), math.sinh(1), places=15)
+        self.controller.angle_mode = "RAD"
+        self.assertAlmostEqual(self.evaluate("cosh(1) - tanh(0)"), math.cosh(1), places=15)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_batch_evaluation(self):
+        """Test that batch evaluation uses the current mode."""
+        x = np.array([0.0, 100.0, 200.0])
+        self.controller.angle_mode = "GRAD"
+        result = self.controller.evaluate_batch("sin(x) + asin(1)", x=x)
+        np.testing.assert_array_equal(result.values, [100, 101, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the asyncio front-end.
+"""
+
+import unittest
+from src.calculator.core.async_evaluator import AsyncEvaluator, is_cheap
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.cost_guard import CostLimits
+
+class TestIsCheap(unittest.TestCase):
+    """Test cases for the inline/offload decision."""
+
+    def setUp(self):
+        self.parser = CalculatorController().parser
+
+    def test_decisions(self):
+        """Test which trees are evaluated inline."""
+        heavy = ["factorial"]
+        for expression in ["2 + 3", "sqrt(16) * 2", "2^10", "x^2"]:
+            self.assertTrue(is_cheap(self.parser.parse(expression, ["x"]), heavy_functions=heavy))
+        for expression in ["factorial(5)", "2^x", "9^9^9", "2^1000"]:
+            self.assertFalse(is_cheap(self.parser.parse(expression, ["x"]), heavy_functions=heavy))
+        self.assertFalse(is_cheap(self.parser.parse("+".join(["1"] * 300))))
+
+class TestAsyncEvaluator(unittest.IsolatedAsyncioTestCase):
+    """Test cases for awaiting evaluations."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+        self.evaluator = AsyncEvaluator(self.controller, max_concurrency=1)
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    async def test_inline(self):
+        """Test that cheap expressions stay on the event loop."""
+        self.assertEqual(await self.evaluator.evaluate("2 + 3"), 5)
+        self.assertEqual(await self.evaluator.evaluate("ans * 2"), 10)
+        self.assertTrue((await self.evaluator.evaluate("2 +")).startswith("Error"))
+        self.assertEqual(self.evaluator.offloaded_count, 0)
+
+    async def test_offloaded(self):
+        """Test that expensive expressions run in a worker and are recorded here."""
+        self.controller.set_variable("n", 20)
+        self.assertEqual(await self.evaluator.evaluate("factorial(n)"), 2432902008176640000)
+        self.assertEqual(await self.evaluator.evaluate("m = factorial(5)"), 120)
+        self.assertEqual(self.controller.get_variable("m"), 120)
+        self.assertEqual(self.evaluator.offloaded_count, 2)
+        self.assertEqual(self.controller.last_result, 120)
+        self.assertTrue((await self.evaluator.evaluate("factorial(-1)")).startswith("Error"))
+
+    async def test_controller_functions_stay_inline(self):
+        """Test that functions unknown to the workers are evaluated here."""
+        self.controller.register_function("twice", lambda x: 2 * x)
+        self.assertEqual(await self.evaluator.evaluate("factorial(twice(3))"), 720)
+        self.assertFalse(self.evaluator.is_inline("factorial(cube(2))"))
+        # Replacing a default function also keeps its callers here
+        self.controller.register_function("cube", lambda x: x ** 3 + 1)
+        self.assertEqual(await self.evaluator.evaluate("factorial(cube(2))"), 362880)
+        self.assertEqual(self.evaluator.offloaded_count, 0)
+
+    async def test_timeout(self):
+        """Test that a runaway evaluation is abandoned."""
+        self.controller.limits = CostLimits.unlimited()
+        result = await self.evaluator.evaluate("factorial(10^8)", timeout=0.2)
+        self.assertTrue(result.startswith("Error: Evaluation timed out"))
+        self.assertEqual(await self.evaluator.evaluate("factorial(3)"), 6)
+
+    async def test_stream(self):
+        """Test streaming over plain and async iterables."""
+        expressions = ["1 + 1", "factorial(4)", "2^3"]
+        results = [result async for result in self.controller.astream(expressions)]
+        self.assertEqual(results, [2, 24, 8])
+
+        async def lines():
+            for expression in expressions:
+                yield expression
+        results = dict([item async for item in self.evaluator.stream_unordered(lines())])
+        self.assertEqual(results, {0: 2, 1: 24, 2: 8})
+        self.controller.async_evaluator.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Unit tests for the bounded calculation history.
+"""
+
+import unittest
+from src.calculator.core.calculation_history import CalculationHistory, format_integer
+from src.calculator.core.calculator import CalculatorController
+
+class TestCalculationHistory(unittest.TestCase):
+    """Test cases for the ring-buffer history."""
+
+    def test_format_is_lazy_and_ordered(self):
+        """Test that entries are formatted oldest first."""
+        history = CalculationHistory(maxlen=3)
+        history.append("1+1", 2)
+        history.append("2*3", 6)
+        self.assertEqual(history.format(), ["1+1 = 2", "2*3 = 6"])
+        self.assertEqual(history.entries(), [("1+1", 2), ("2*3", 6)])
+
+    def test_oldest_entries_are_overwritten(self):
+        """Test that the buffer keeps only the newest entries."""
+        history = CalculationHistory(maxlen=3)
+        for i in range(7):
+            history.append(f"{i}+0", i)
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.format(), ["4+0 = 4", "5+0 = 5", "6+0 = 6"])
+
+    def test_clear(self):
+        """Test clearing the buffer."""
+        history = CalculationHistory(maxlen=2)
+        history.append("1+1", 2)
+        history.clear()
+        self.assertEqual(history.format(), [])
+        history.append("2+2", 4)
+        self.assertEqual(history.format(), ["2+2 = 4"])
+
+    def test_invalid_size(self):
+        """Test that a non-positive size is rejected."""
+        with self.assertRaises(ValueError):
+            CalculationHistory(maxlen=0)
+
+    def test_controller_history_is_bounded(self):
+        """Test that the controller keeps a bounded history."""
+        controller = CalculatorController(history_size=2)
+        for expression in ["1+1", "2+2", "3+3"]:
+            controller.process_input(expression)
+        self.assertEqual(controller.get_history(), ["2+2 = 4", "3+3 = 6"])
+        controller.clear_history()
+        self.assertEqual(controller.get_history(), [])
+
+    def test_format_integer_beyond_str_limit(self):
+        """Test the exact scientific form of integers str() refuses."""
+        self.assertEqual(format_integer(12345), "12345")
+        self.assertEqual(format_integer(2 ** 100000), "9.99002093e+30102")
+        self.assertEqual(format_integer(10 ** 5000 - 1), "1e+5000")
+        self.assertEqual(format_integer(-7 * 10 ** 6000 + 3), "-7e+6000")
+
+if __name__ == '__main__':
+    unittest.main()
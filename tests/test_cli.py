@@ -0,0 +1,63 @@
+"""
+Unit tests for the headless batch CLI.
+"""
+
+import io
+import unittest
+from src.calculator.cli import run_batch, stream_results
+
+class TestBatchCli(unittest.TestCase):
+    """Test cases for line-oriented batch evaluation."""
+
+    def test_results_follow_input_lines(self):
+        """Test one output line per input line, including blanks and errors."""
+        source = io.StringIO("2 + 3\n\nsqrt(16)\n5 / 0\n")
+        output = io.StringIO()
+        run_batch(source, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[:3], ["5", "", "4"])
+        self.assertTrue(lines[3].startswith("Error"))
+
+    def test_unprintable_results_do_not_end_the_stream(self):
+        """Test that infinite and huge integer results are formatted per line."""
+        source = io.StringIO("2+3\n1e400\nfactorial(2000)\n4*4\n")
+        output = io.StringIO()
+        run_batch(source, output, workers=2, chunk_size=1)
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["5", "inf", "3.316275092e+5735", "16"])
+
+    def test_small_chunks(self):
+        """Test that chunking does not change the results."""
+        expressions = [f"{i} * 2" for i in range(10)]
+        results = list(stream_results(expressions, chunk_size=3))
+        self.assertEqual(results, [str(i * 2) for i in range(10)])
+
+    def test_process_pool_preserves_order(self):
+        """Test ordered output when fanning out across processes."""
+        expressions = [f"{i} + 1" for i in range(50)]
+        results = list(stream_results(expressions, workers=2, chunk_size=7))
+        self.assertEqual(results, [str(i + 1) for i in range(50)])
+
+    def test_assignments_need_a_single_worker(self):
+        """Test that variables carry over in-process and are rejected across workers."""
+        expressions = ["x = 3", "x * 2", "ans + 1", "2 + 2"]
+        self.assertEqual(list(stream_results(expressions)), ["3", "6", "7", "4"])
+        for workers, chunk_size in ((2, 1), (2, 4)):
+            results = list(stream_results(expressions, workers=workers, chunk_size=chunk_size))
+            self.assertEqual(results[0], "Error: Assignments need a single worker")
+            self.assertTrue(results[1].startswith("Error"))
+            self.assertTrue(results[2].startswith("Error"))
+            self.assertEqual(results[3], "4")
+
+    def test_process_pool_unordered(self):
+        """Test that unordered output numbers every result with its input line."""
+        expressions = [f"{i} + 1" for i in range(50)]
+        results = list(stream_results(expressions, workers=2, chunk_size=7, ordered=False))
+        lines = dict(result.split("\t") for result in results)
+        self.assertEqual(lines, {str(i + 1): str(i + 1) for i in range(50)})
+        results = list(stream_results(["2 * 3", "", "1 / 0"], ordered=False))
+        self.assertEqual(results[:2], ["1\t6", "2\t"])
+        self.assertTrue(results[2].startswith("3\tError"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Unit tests for the cost guard.
+"""
+
+import math
+import time
+import unittest
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.cost_guard import CostLimits, estimate_cost, evaluate_log_space
+
+
+class TestEstimateCost(unittest.TestCase):
+    """Test cases for the static estimator."""
+
+    def setUp(self):
+        self.parser = CalculatorController().parser
+
+    def estimate(self, expression, variables=()):
+        return estimate_cost(self.parser.parse(expression, variables))
+
+    def test_powers(self):
+        """Test digit bounds of integer powers."""
+        self.assertEqual(self.estimate("2^1000").digits, 302)
+        self.assertGreater(self.estimate("9^9^9").digits, 3e8)
+        self.assertGreaterEqual(self.estimate("(10^50000)^3").digits, 150000)
+
+    def test_small_or_float_results(self):
+        """Test that float and negative powers are not counted as big integers."""
+        self.assertLess(self.estimate("2^-100000").digits, 10)
+        self.assertLess(self.estimate("2.5^1000").digits, 10)
+        self.assertLess(self.estimate("sin(30)^100000").digits, 10)
+
+    def test_factorials(self):
+        """Test factorial argument and digit bounds."""
+        estimate = self.estimate("factorial(1000) + 1")
+        self.assertEqual(estimate.factorial, 1000)
+        self.assertEqual(math.floor(estimate.digits), 2568)
+        self.assertAlmostEqual(self.estimate("double_factorial(1000)").digits, 1286, delta=2)
+
+    def test_variables_are_unbounded(self):
+        """Test that values unknown at compile time are left to the guarded kernels."""
+        estimate = self.estimate("2^x + factorial(x)", ["x"])
+        self.assertEqual((estimate.digits, estimate.factorial), (1, 0))
+
+
+class TestCostLimits(unittest.TestCase):
+    """Test cases for limits enforced by the controller."""
+
+    def setUp(self):
+        self.controller = CalculatorController(limits=CostLimits(max_digits=1000, max_factorial=500))
+
+    def test_rejected_before_computing(self):
+        """Test that pathological expressions fail fast."""
+        start = time.perf_counter()
+        for expression in ["9^9^9", "factorial(10^7)", "2^4000", "factorial(501)",
+                           "1 + 2^(2^20) * 0"]:
+            result = self.controller.process_input(expression)
+            self.assertTrue(result.startswith("Error: "), expression)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertIn("limit 1000", self.controller.process_input("2^4000"))
+        self.assertIn("limit 500", self.controller.process_input("factorial(501)"))
+
+    def test_within_limits(self):
+        """Test exact results below the limits."""
+        self.assertEqual(self.controller.process_input("2^100"), 2 ** 100)
+        self.assertEqual(self.controller.process_input("factorial(20)"), 2432902008176640000)
+
+    def test_combinations(self):
+        """Test that binomial and permutations are bounded without computing them."""
+        self.assertEqual(self.controller.process_input("binomial(400000, 3)"), 10666586666800000)
+        self.assertIn("Result too large", self.controller.process_input("binomial(10^6, 500000)"))
+        self.controller.process_input("n = 10^5")
+        self.assertIn("Result too large", self.controller.process_input("permutations(n, n)"))
+        self.assertEqual(self.controller.process_input("permutations(n, 2)"), 9999900000)
+
+    def test_runtime_check_on_variables(self):
+        """Test that values bound after compiling are checked when evaluating."""
+        self.controller.process_input("n = 10")
+        self.assertEqual(self.controller.process_input("2^n"), 1024)
+        self.controller.process_input("n = 10^5")
+        self.assertIn("Result too large", self.controller.process_input("2^n"))
+        self.assertIn("Factorial argument too large", self.controller.process_input("factorial(n)"))
+
+    def test_runtime_check_of_square_and_cube(self):
+        """Test that square and cube of big integer variables are checked."""
+        self.controller.process_input("x = 10^400")
+        self.assertEqual(self.controller.process_input("square(x)"), 10 ** 800)
+        self.assertIn("Result too large", self.controller.process_input("cube(x)"))
+        self.assertIn("Result too large", self.controller.process_input("cube(square(x))"))
+        self.assertEqual(self.controller.process_input("cube(1.5)"), 3.375)
+
+    def test_changing_limits_clears_cache(self):
+        """Test that expressions compiled under old limits are recompiled."""
+        self.assertTrue(self.controller.process_input("2^4000").startswith("Error"))
+        self.controller.limits = CostLimits.unlimited()
+        self.assertEqual(self.controller.process_input("2^4000"), 2 ** 4000)
+
+    def test_largest_allowed_result_is_printable(self):
+        """Test that a result at the default digit limit can be formatted."""
+        controller = CalculatorController()
+        limit = controller.limits.max_digits
+        result = controller.process_input(f"10^{limit - 1} * 7")
+        self.assertIsInstance(result, int)
+        self.assertEqual(controller.format_output(result), f"7e+{limit - 1}")
+        self.assertEqual(controller.format_output(controller.process_input("-factorial(2000)")),
+                         "-3.316275092e+5735")
+
+    def test_approximate(self):
+        """Test log-space evaluation instead of rejection."""
+        self.controller.limits = CostLimits(max_digits=1000, approximate=True)
+        result = self.controller.process_input("factorial(100000)")
+        self.assertEqual((result.sign, str(result)), (1, "2.824229408e+456573"))
+        self.assertEqual(self.controller.format_output(result), "2.824229408e+456573")
+        self.assertAlmostEqual(self.controller.process_input("factorial(100000) / factorial(99999)"),
+                               100000, delta=1e-3)
+        self.assertEqual(str(self.controller.process_input("ans * 0 + 2^5000")),
+                         "1.412467032e+1505")
+        self.assertEqual(str(self.controller.process_input("ans * 2")), "2.824934064e+1505")
+        # Results within the limits stay exact
+        self.assertEqual(self.controller.process_input("2^10"), 1024)
+
+
+class TestLogSpace(unittest.TestCase):
+    """Test cases for log-space evaluation."""
+
+    def setUp(self):
+        self.parser = CalculatorController().parser
+
+    def evaluate(self, expression, **variables):
+        return evaluate_log_space(self.parser.parse(expression, variables), variables)
+
+    def test_matches_exact_results(self):
+        """Test that small results agree with exact evaluation."""
+        for expression, expected in [("2^10 * 3 - 4", 3068), ("-2^3", -8), ("(-2)^3", -8),
+                                     ("factorial(10) / 7", 518400), ("sqrt(16) + 0", 4),
+                                     ("double_factorial(9)", 945), ("x^2 - x^2", 0)]:
+            self.assertAlmostEqual(self.evaluate(expression, x=3), expected, delta=1e-6,
+                                   msg=expression)
+
+    def test_negative_bases(self):
+        """Test the sign of negative bases raised to huge integer exponents."""
+        self.assertEqual(str(self.evaluate("(-2)^1000001")), "-1.980131246e+301030")
+        self.assertEqual(str(self.evaluate("(-3)^999999")), "-5.992367055e+477120")
+        self.assertEqual(str(self.evaluate("(-2)^1000000")), "9.900656229e+301029")
+        with self.assertRaises(ValueError):
+            self.evaluate("(-2)^0.5")
+
+    def test_domain_errors(self):
+        """Test that domain errors are still raised."""
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluate("1 / (2 - 2)")
+        with self.assertRaises(ValueError):
+            self.evaluate("factorial(0 - 1)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit tests for variables and formula bindings.
+"""
+
+import unittest
+from src.calculator.core.environment import Environment
+from src.calculator.core.expression_parser import ExpressionParser
+from src.calculator.core.calculator import CalculatorController
+
+class TestEnvironment(unittest.TestCase):
+    """Test cases for the dependency-tracking environment."""
+
+    def setUp(self):
+        self.calls = []
+        self.parser = ExpressionParser(functions={"slow": self._slow})
+        self.env = Environment(self.parser)
+
+    def _slow(self, x):
+        self.calls.append(x)
+        return x * 10
+
+    def test_values_and_formulas(self):
+        """Test plain values and formulas over them."""
+        self.env.set("price", 100)
+        self.env.set("rate", 0.25)
+        self.env.define("total", "price * (1 + rate)")
+        self.assertEqual(self.env["total"], 125)
+        self.env.set("rate", 0.5)
+        self.assertEqual(self.env["total"], 150)
+        self.assertEqual(self.env.dependencies("total"), frozenset({"price", "rate"}))
+        self.assertEqual(self.env.dependents("rate"), frozenset({"total"}))
+
+    def test_incremental_recomputation(self):
+        """Test that only formulas downstream of a change are recomputed."""
+        self.env.set("a", 1)
+        self.env.set("b", 2)
+        self.env.define("sa", "slow(a)")
+        self.env.define("sb", "slow(b)")
+        self.env.define("both", "sa + sb")
+        self.assertEqual(self.env["both"], 30)
+        self.assertEqual(sorted(self.calls), [1, 2])
+        self.env.set("a", 5)
+        self.assertEqual(self.env["both"], 70)
+        self.assertEqual(sorted(self.calls), [1, 2, 5])
+        count = self.env.recomputations
+        self.assertEqual(self.env["both"], 70)
+        self.assertEqual(self.env.recomputations, count)
+
+    def test_errors(self):
+        """Test cycles, reserved names and undefined variables."""
+        self.env.define("a", "b + 1")
+        with self.assertRaises(ValueError):
+            self.env.define("b", "a * 2")
+        for name in ["pi", "slow", "1x"]:
+            with self.assertRaises(ValueError):
+                self.env.set(name, 1)
+        with self.assertRaises(KeyError):
+            self.env["a"]
+        self.env.set("b", 1)
+        self.assertEqual(self.env["a"], 2)
+        self.env.unset("b")
+        with self.assertRaises(KeyError):
+            self.env["a"]
+
+    def test_unset_formula(self):
+        """Test that removing a formula makes its dependents fail."""
+        self.env.set("x", 2)
+        self.env.define("double", "x * 2")
+        self.env.define("quad", "double * 2")
+        self.assertEqual(self.env["quad"], 8)
+        self.env.unset("double")
+        self.assertNotIn("double", self.env)
+        self.assertEqual(self.env.dependents("x"), frozenset())
+        with self.assertRaises(KeyError):
+            self.env["quad"]
+        self.env.set("double", 5)
+        self.assertEqual(self.env["quad"], 10)
+
+class TestControllerVariables(unittest.TestCase):
+    """Test cases for variables through the controller."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+
+    def test_assignment(self):
+        """Test assignments, formulas and ans."""
+        self.assertEqual(self.controller.process_input("x = 4"), 4)
+        self.assertEqual(self.controller.process_input("y = 2x + 1"), 9)
+        self.assertEqual(self.controller.process_input("x = 10"), 10)
+        self.assertEqual(self.controller.process_input("y"), 21)
+        self.assertEqual(self.controller.process_input("ans * 2"), 42)
+        self.assertEqual(self.controller.process_input("x = x + 1"), 11)
+        self.assertEqual(self.controller.get_variable("y"), 23)
+
+    def test_errors(self):
+        """Test error messages for variables."""
+        self.assertTrue(self.controller.process_input("z + 1").startswith("Error"))
+        self.assertTrue(self.controller.process_input("pi = 3").startswith("Error"))
+        self.assertTrue(self.controller.process_input("w = v + 1").startswith("Error: Undefined variable"))
+        self.controller.set_variable("v", 1)
+        self.assertEqual(self.controller.process_input("w"), 2)
+
+if __name__ == '__main__':
+    unittest.main()
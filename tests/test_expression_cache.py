@@ -0,0 +1,87 @@
+"""
+Unit tests for the compiled expression cache.
+"""
+
+import unittest
+from src.calculator.core.expression_cache import ExpressionCache
+from src.calculator.core.calculator import CalculatorController
+
+class TestExpressionCache(unittest.TestCase):
+    """Test cases for the LRU expression cache."""
+
+    def test_hits_and_misses(self):
+        """Test hit and miss counters."""
+        cache = ExpressionCache(maxsize=2)
+        self.assertIsNone(cache.get("1+1"))
+        cache.put("1+1", "compiled")
+        self.assertEqual(cache.get("1+1"), "compiled")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["size"], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = ExpressionCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_zero_size_disables_cache(self):
+        """Test that a zero-sized cache stores nothing."""
+        cache = ExpressionCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_invalid_size(self):
+        """Test that a negative size is rejected."""
+        with self.assertRaises(ValueError):
+            ExpressionCache(maxsize=-1)
+
+class TestControllerCache(unittest.TestCase):
+    """Test cases for compiled expression reuse in the controller."""
+
+    def test_repeated_expression_hits_cache(self):
+        """Test that repeated inputs reuse the compiled form."""
+        controller = CalculatorController()
+        self.assertEqual(controller.process_input("2 + 3"), 5)
+        self.assertEqual(controller.process_input("2  +  3"), 5)
+        stats = controller.cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_cached_function_call(self):
+        """Test that function calls are cached and still update history."""
+        controller = CalculatorController()
+        controller.process_input("sqrt(16)")
+        self.assertEqual(controller.process_input("sqrt(16)"), 4)
+        self.assertEqual(controller.cache_stats()["hits"], 1)
+        self.assertEqual(len(controller.get_history()), 2)
+
+    def test_errors_are_not_cached(self):
+        """Test that invalid inputs are reported and not stored."""
+        controller = CalculatorController()
+        self.assertTrue(controller.process_input("2 + ").startswith("Error"))
+        self.assertEqual(controller.cache_stats()["size"], 0)
+
+    def test_runtime_errors_are_reported(self):
+        """Test that evaluation errors of cached expressions are reported."""
+        controller = CalculatorController()
+        self.assertTrue(controller.process_input("5 / 0").startswith("Error"))
+        self.assertTrue(controller.process_input("5 / 0").startswith("Error"))
+
+    def test_cache_size_is_bounded(self):
+        """Test that the controller cache honours its size limit."""
+        controller = CalculatorController(cache_size=2)
+        for expression in ["1+1", "2+2", "3+3"]:
+            controller.process_input(expression)
+        stats = controller.cache_stats()
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Unit tests for the expression parser.
+"""
+
+import unittest
+import math
+from src.calculator.core.expression_parser import ExpressionParser, Call, BinaryOp, Constant, STORE, RECALL
+from src.calculator.core.calculator import CalculatorController
+
+class TestExpressionParser(unittest.TestCase):
+    """Test cases for the compiling expression parser."""
+
+    def setUp(self):
+        self.parser = ExpressionParser()
+
+    def test_arithmetic(self):
+        """Test basic arithmetic and operator precedence."""
+        self.assertEqual(self.parser.parse_and_evaluate("2 + 3 * 4"), 14)
+        self.assertEqual(self.parser.parse_and_evaluate("(2 + 3) * 4"), 20)
+        self.assertEqual(self.parser.parse_and_evaluate("10 / 2 + 3"), 8)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("2.5 * 2"), 5.0, places=10)
+
+    def test_power(self):
+        """Test both power operators and right associativity."""
+        self.assertEqual(self.parser.parse_and_evaluate("2^3"), 8)
+        self.assertEqual(self.parser.parse_and_evaluate("2**3"), 8)
+        self.assertEqual(self.parser.parse_and_evaluate("2^3^2"), 512)
+
+    def test_unary_minus(self):
+        """Test unary minus binding."""
+        self.assertEqual(self.parser.parse_and_evaluate("-4"), -4)
+        self.assertEqual(self.parser.parse_and_evaluate("2*-3"), -6)
+        self.assertEqual(self.parser.parse_and_evaluate("-2^2"), -4)
+        self.assertEqual(self.parser.parse_and_evaluate("2^-1"), 0.5)
+        self.assertEqual(self.parser.parse_and_evaluate("+3 - -3"), 6)
+
+    def test_constants(self):
+        """Test constants and implicit multiplication."""
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("pi"), math.pi, places=10)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("2pi"), 2 * math.pi, places=10)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("e + 1"), math.e + 1, places=10)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("2(3 + 1)"), 8, places=10)
+
+    def test_scientific_notation(self):
+        """Test numbers written with an exponent."""
+        self.assertEqual(self.parser.parse_and_evaluate("1e3"), 1000.0)
+        self.assertEqual(self.parser.parse_and_evaluate("2.5E-2 * 4"), 0.1)
+        self.assertEqual(self.parser.parse_and_evaluate("1.5e+2"), 150.0)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("2e"), 2 * math.e, places=10)
+        self.assertAlmostEqual(self.parser.parse_and_evaluate("2e-1"), 0.2, places=10)
+
+    def test_tokens(self):
+        """Test typed tokens with source positions."""
+        self.assertEqual(self.parser._tokenize(" 12 + x1*2.5"), [
+            ("number", 12, 1), ("operator", "+", 4), ("name", "x1", 6),
+            ("operator", "*", 8), ("number", 2.5, 9)])
+        self.assertEqual([value for _, value, _ in self.parser._tokenize("2**3")], [2, "**", 3])
+
+    def test_error_positions(self):
+        """Test that errors report where they occurred."""
+        for expression, position in [("2 $ 3", 2), ("1 + 1..2", 4), ("2 + * 3", 4), ("1 + foo(2)", 4)]:
+            with self.assertRaisesRegex(ValueError, f"at position {position}"):
+                self.parser.parse(expression)
+
+    def test_missing_operator(self):
+        """Test that implicit multiplication only follows a number or joins parentheses."""
+        self.assertEqual(self.parser.parse_and_evaluate("(1 + 2)(3 + 4)"), 21)
+        for expression, position in [("2 3", 2), ("pi e", 3), ("(1 + 2)3", 7), ("2.5 1e3", 4)]:
+            with self.assertRaisesRegex(ValueError, f"missing operator before .* \\(at position {position}\\)"):
+                self.parser.parse(expression)
+
+    def test_comma_outside_call(self):
+        """Test that a stray comma is reported as such."""
+        for expression, position in [("1,2", 1), ("(1, 2)", 2)]:
+            with self.assertRaisesRegex(ValueError, f"Unexpected comma .* \\(at position {position}\\)"):
+                self.parser.parse(expression)
+
+    def test_compiled_reuse(self):
+        """Test that a compiled expression can be evaluated repeatedly."""
+        compiled = self.parser.compile("1 + 2 * 3")
+        self.assertEqual(compiled.evaluate(), 7)
+        self.assertEqual(compiled.evaluate(), 7)
+
+    def test_invalid(self):
+        """Test malformed expressions."""
+        for expression in ["2 + ", "2 + * 3", "(2 + 3", "2 + 3)", "", "1..2", "2 $ 3", "foo(5)"]:
+            with self.assertRaises(ValueError):
+                self.parser.parse_and_evaluate(expression)
+        with self.assertRaises(ZeroDivisionError):
+            self.parser.parse_and_evaluate("5 / 0")
+        with self.assertRaises(ValueError):
+            self.parser.parse_and_evaluate("(-8)^0.5")
+
+class TestFunctionCalls(unittest.TestCase):
+    """Test cases for function calls as expression tree nodes."""
+
+    def setUp(self):
+        self.parser = ExpressionParser(functions={"sqrt": math.sqrt, "square": lambda x: x * x, "max": max})
+
+    def test_call_nodes(self):
+        """Test that calls become nodes in one tree."""
+        tree = self.parser.parse("sqrt(square(3) + square(4))")
+        self.assertIsInstance(tree, Call)
+        self.assertIsInstance(tree.args[0], BinaryOp)
+        self.assertEqual(str(tree), "sqrt((square(3) + square(4)))")
+
+    def test_composed_calls(self):
+        """Test nested, composed and multi-argument calls."""
+        self.assertEqual(self.parser.parse_and_evaluate("sqrt(square(3) + square(4))"), 5)
+        self.assertEqual(self.parser.parse_and_evaluate("2 * max(1, square(2), 3)"), 8)
+        self.assertEqual(self.parser.parse_and_evaluate("2sqrt(16)"), 8)
+
+    def test_deep_nesting(self):
+        """Test that long expressions do not hit the recursion limit."""
+        expression = "+".join(["1"] * 5000)
+        self.assertEqual(self.parser.parse_and_evaluate(expression), 5000)
+        self.assertTrue(str(self.parser.parse(expression)).startswith("(((("))
+
+    def test_call_errors(self):
+        """Test malformed calls."""
+        for expression in ["sqrt()", "max(1,)", "(1, 2)", "foo(1)", "sqrt(4"]:
+            with self.assertRaises(ValueError):
+                self.parser.parse(expression)
+
+    def test_controller_composite_formulas(self):
+        """Test composite formulas through the controller."""
+        controller = CalculatorController()
+        self.assertAlmostEqual(controller.process_input("2*sin(30)"), 1, places=10)
+        self.assertAlmostEqual(controller.process_input("sqrt(square(3)+square(4))"), 5, places=10)
+        self.assertAlmostEqual(controller.process_input("sin(30) + cos(60)"), 1, places=10)
+        self.assertEqual(controller.process_input("factorial(3) + factorial(4)"), 30)
+        self.assertTrue(controller.process_input("sqrt(-1)").startswith("Error"))
+
+    def test_exact_degrees_without_clamping(self):
+        """Test that special angles are exact, so tiny results are shown as computed."""
+        controller = CalculatorController()
+        self.assertEqual(controller.process_input("sin(180) + cos(90) + tan(360)"), 0)
+        self.assertEqual(controller.process_input("2*sin(30)"), 1)
+        self.assertEqual(controller.format_output(1e-12), "1e-12")
+
+class TestOptimizer(unittest.TestCase):
+    """Test cases for constant folding and common sub-expression elimination."""
+
+    def setUp(self):
+        self.calls = []
+        self.parser = ExpressionParser(functions={"ln": math.log, "sqrt": self._counting_sqrt})
+
+    def _counting_sqrt(self, x):
+        self.calls.append(x)
+        return math.sqrt(x)
+
+    def test_constant_folding(self):
+        """Test that constant sub-trees become one constant."""
+        compiled = self.parser.compile("2*pi/360 + ln(10)")
+        self.assertIsInstance(compiled.tree, Constant)
+        self.assertEqual(len(compiled.instructions), 1)
+        self.assertAlmostEqual(compiled.evaluate(), 2 * math.pi / 360 + math.log(10), places=12)
+        self.assertIsInstance(self.parser.compile("2 + 3").evaluate(), int)
+
+    def test_failing_constants_are_not_folded(self):
+        """Test that errors still surface at evaluation time."""
+        compiled = self.parser.compile("1 + 1/0")
+        with self.assertRaises(ZeroDivisionError):
+            compiled.evaluate()
+
+    def test_shared_subexpressions(self):
+        """Test that identical sub-trees are evaluated once per evaluation."""
+        compiled = self.parser.compile("sqrt(x)*sqrt(x) + sqrt(x)", ["x"])
+        opcodes = [opcode for opcode, _ in compiled.instructions]
+        self.assertEqual(opcodes.count(STORE), 1)
+        self.assertEqual(opcodes.count(RECALL), 2)
+        self.assertAlmostEqual(compiled.evaluate({"x": 4}), 6, places=12)
+        self.assertEqual(self.calls, [4])
+
+    def test_impure_functions(self):
+        """Test that impure functions are neither folded nor shared."""
+        controller = CalculatorController()
+        values = iter(range(1, 100))
+        controller.register_function("tick", lambda x: x * next(values), pure=False)
+        self.assertEqual(controller.process_input("tick(1) + tick(1)"), 3)
+        self.assertEqual(controller.process_input("tick(1) + tick(1)"), 7)
+
+    def test_explain(self):
+        """Test the optimization report."""
+        report = self.parser.explain("(x+1)*(x+1) + 2*pi", ["x"])
+        self.assertEqual(report.operations_before, 5)
+        self.assertEqual(report.operations_after, 3)
+        self.assertEqual(report.operations_saved, 2)
+        self.assertEqual(report.constants_folded, 1)
+        self.assertEqual(report.subexpressions_shared, 1)
+        self.assertIn("STORE t0", report.listing)
+        self.assertIn("saved 2", str(report))
+
+    def test_kernels_for_numeric_arguments(self):
+        """Test that calls with arguments known to be numbers skip validation."""
+        controller = CalculatorController()
+        parser = controller.parser
+        kernel = parser.functions.kernel
+        compiled = parser.compile("sqrt(square(x) + 1)", ["x"], optimize=False)
+        self.assertIs(compiled.tree.func, kernel("sqrt"))
+        self.assertIsNot(compiled.tree.args[0].left.func, kernel("square"))
+        self.assertEqual(compiled.evaluate({"x": 0}), 1)
+        compiled = parser.compile("factorial(3) + sqrt(factorial(x))", ["x"], optimize=False)
+        self.assertIsNot(compiled.tree.right.func, kernel("sqrt"))
+        self.assertEqual(controller.process_input("sqrt(square(3) + square(4))"), 5)
+
+    def test_unoptimized(self):
+        """Test that optimization can be turned off."""
+        compiled = self.parser.compile("2*3", optimize=False)
+        self.assertEqual(len(compiled.instructions), 3)
+        self.assertEqual(compiled.evaluate(), 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ Unit tests for the factorials module.
 
 import unittest
 import math
+import threading
 from src.calculator.modules.factorials import *
 
 class TestFactorials(unittest.TestCase):
@@ -33,6 +34,14 @@ class TestFactorials(unittest.TestCase):
         self.assertEqual(double_factorial(6), 48)  # 6 * 4 * 2
         self.assertEqual(double_factorial(8), 384)  # 8 * 6 * 4 * 2
     
+    def test_double_factorial_large(self):
+        """Test the product-tree double factorial against term-by-term multiplication."""
+        for n in list(range(2, 200)) + [1001, 1002, 4097, 10000]:
+            expected = 1
+            for term in range(n, 1, -2):
+                expected *= term
+            self.assertEqual(double_factorial(n), expected, n)
+    
     def test_double_factorial_invalid(self):
         """Test double factorial function with invalid inputs."""
         with self.assertRaises(ValueError):
@@ -42,6 +51,59 @@ class TestFactorials(unittest.TestCase):
         with self.assertRaises(TypeError):
             double_factorial("invalid")
     
+    def test_factorial_table(self):
+        """Test that large factorials are remembered and evicted least recently used first."""
+        table = FactorialTable(maxsize=2, max_n=1000)
+        self.assertEqual(table.get(20), math.factorial(20))
+        for n in (200, 300, 200, 400):
+            self.assertEqual(table.get(n), math.factorial(n))
+        self.assertEqual(table.stats(), {"size": 2, "maxsize": 2, "hits": 1,
+                                         "misses": 3, "evictions": 1})
+        table.get(200)
+        self.assertEqual(table.hits, 2)
+        self.assertEqual(table.get(5000), math.factorial(5000))
+        self.assertEqual(table.stats()["size"], 2)
+        table.resize(0)
+        self.assertEqual(table.stats()["size"], 0)
+    
+    def test_factorial_table_threads(self):
+        """Test that threads sharing a table keep it consistent."""
+        table = FactorialTable(maxsize=4, max_n=1000)
+        def work(start):
+            for i in range(1000):
+                table.get(200 + (start + i) % 20)
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = table.stats()
+        self.assertEqual(stats["size"], 4)
+        self.assertEqual(stats["hits"] + stats["misses"], 4000)
+        self.assertEqual(table.get(210), math.factorial(210))
+    
+    def test_log_factorial(self):
+        """Test log-factorial, including arguments whose factorial overflows floats."""
+        self.assertAlmostEqual(log_factorial(0), 0, places=10)
+        self.assertAlmostEqual(log_factorial(10), math.log(3628800), places=10)
+        self.assertAlmostEqual(log_factorial(10 ** 6), 12815518.384658169, places=3)
+        with self.assertRaises(ValueError):
+            log_factorial(-1)
+    
+    def test_binomial_and_permutations(self):
+        """Test binomial coefficients and permutation counts."""
+        self.assertEqual(binomial(10, 3), 120)
+        self.assertEqual(binomial(10, 0), 1)
+        self.assertEqual(binomial(3, 10), 0)
+        self.assertEqual(binomial(1000, 500), math.factorial(1000) // math.factorial(500) ** 2)
+        self.assertEqual(permutations(10, 3), 720)
+        self.assertEqual(permutations(5, 5), 120)
+        self.assertEqual(permutations(3, 4), 0)
+        with self.assertRaises(ValueError):
+            binomial(-1, 2)
+        with self.assertRaises(TypeError):
+            permutations(5.5, 2)
+    
     def test_gamma(self):
         """Test gamma function."""
         self.assertAlmostEqual(gamma(1), 1, places=10)
@@ -112,5 +112,58 @@ class TestFractions(unittest.TestCase):
         with self.assertRaises(TypeError):
             decimal_to_fraction("invalid")
 
+class TestRational(unittest.TestCase):
+    """Test cases for the deferred-reduction Rational type."""
+    
+    def test_arithmetic_is_exact(self):
+        """Test exact results and deferred reduction."""
+        total = Rational(1, 3) + Rational(1, 6)
+        self.assertEqual((total.numerator, total.denominator), (9, 18))
+        self.assertEqual(total, Rational(1, 2))
+        self.assertEqual(str(total), "1/2")
+        self.assertEqual(str(Rational(4, 2)), "2")
+        self.assertEqual(Rational(2, 3) * 3 - 2, 0)
+        self.assertEqual(Rational(1, 2) / Rational(-1, 4), -2)
+        self.assertEqual(Rational(2, 3) ** -2, Rational(9, 4))
+        self.assertEqual(1 - Rational(1, 3), Rational(2, 3))
+        self.assertEqual(hash(Rational(2, 4)), hash(0.5))
+    
+    def test_mixed_with_floats(self):
+        """Test that floats make results floats."""
+        self.assertEqual(Rational(1, 2) + 0.25, 0.75)
+        self.assertIsInstance(Rational(1, 2) * 2.0, float)
+        self.assertLess(Rational(1, 3), 0.34)
+        self.assertEqual(float(Rational(1, 8)), 0.125)
+        self.assertEqual(int(Rational(-7, 2)), -3)
+    
+    def test_invalid(self):
+        """Test invalid construction and division by zero."""
+        with self.assertRaises(ZeroDivisionError):
+            Rational(1, 0)
+        with self.assertRaises(ZeroDivisionError):
+            Rational(1, 2) / 0
+        with self.assertRaises(TypeError):
+            Rational(1.5, 2)
+    
+    def test_divide(self):
+        """Test that only integer division becomes exact."""
+        self.assertEqual(str(divide(1, 3)), "1/3")
+        self.assertEqual(divide(1.0, 4), 0.25)
+        with self.assertRaises(ZeroDivisionError):
+            divide(1, 0)
+    
+    def test_sum_fractions(self):
+        """Test common-denominator sums."""
+        terms = [Rational(1, k) for k in range(1, 11)]
+        self.assertEqual(str(sum_fractions(*terms)), "7381/2520")
+        self.assertEqual(sum_fractions(1, 2, 3), 6)
+        self.assertEqual(sum_fractions(Rational(1, 2), 0.25, 1), 1.75)
+
+    def test_text_beyond_str_limit(self):
+        """Test that huge fractions are shown in scientific form."""
+        self.assertEqual(str(Rational(1, 3) ** 100000), "7.490797101e-47713")
+        self.assertEqual(repr(Rational(-2) ** 100001), "Rational(-1.998004186e+30103)")
+        self.assertEqual(scientific(22, 7), "3.142857143e+0")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Unit tests for the function registry.
+"""
+
+import unittest
+import math
+from src.calculator.core.function_registry import FunctionRegistry, default_registry
+from src.calculator.core.calculator import CalculatorController
+
+class TestFunctionRegistry(unittest.TestCase):
+    """Test cases for registering and dispatching functions."""
+
+    def test_default_functions(self):
+        """Test that the built-in functions are registered."""
+        for name in ["sin", "ln", "sqrt", "factorial", "power", "log", "reciprocal"]:
+            self.assertIn(name, default_registry)
+        self.assertTrue(default_registry.get("log").accepts(2))
+        self.assertFalse(default_registry.get("power").accepts(1))
+
+    def test_bind_applies_angle_mode_and_coercion(self):
+        """Test that binding passes degrees and coerces arguments."""
+        self.assertAlmostEqual(default_registry.get("sin").bind(degrees=True)(90), 1, places=10)
+        self.assertAlmostEqual(default_registry.get("sin").bind(degrees=False)(math.pi / 2), 1, places=10)
+        self.assertEqual(default_registry.get("factorial").bind()(5.0), 120)
+
+    def test_gradians_and_hyperbolic_functions(self):
+        """Test binding angle functions to gradians and the hyperbolic functions."""
+        bound = default_registry.bound(gradians=True)
+        self.assertFalse(bound.degrees)
+        self.assertEqual(bound["sin"](100), 1)
+        self.assertEqual(bound["acos"](0), 100)
+        self.assertEqual(bound.kernel("asin")(1), 100)
+        self.assertAlmostEqual(bound["tanh"](1), math.tanh(1), places=15)
+        self.assertEqual(default_registry.bound(degrees=False)["sinh"](0), 0)
+
+    def test_kernels(self):
+        """Test that kernels skip validation and bind like the checked function."""
+        bound = default_registry.bound(degrees=True)
+        self.assertAlmostEqual(bound.kernel("sin")(90), 1, places=10)
+        self.assertEqual(bound.kernel("square")(7), 49)
+        self.assertIsNone(bound.kernel("factorial"))
+        registry = FunctionRegistry()
+        registry.register("half", lambda x: x / 2, kernel=lambda x: x * 0.5)
+        bound = registry.bound()
+        self.assertEqual(bound.kernel("half")(3), 1.5)
+        registry.register("half", lambda x: x / 2)
+        self.assertIsNone(bound.kernel("half"))
+
+    def test_decorator_registration(self):
+        """Test registering a function with the decorator form."""
+        registry = FunctionRegistry()
+
+        @registry.register("double")
+        def double(x):
+            return 2 * x
+
+        self.assertEqual(registry.get("double").func(4), 8)
+
+    def test_invalid_name(self):
+        """Test that names unusable in expressions are rejected."""
+        with self.assertRaises(ValueError):
+            FunctionRegistry().register("2x", abs)
+
+class TestControllerDispatch(unittest.TestCase):
+    """Test cases for table-driven dispatch in the controller."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+
+    def test_multi_argument_functions(self):
+        """Test power(x,y) and log(x, base)."""
+        self.assertEqual(self.controller.process_input("power(2,3)"), 8)
+        self.assertAlmostEqual(self.controller.process_input("log(100, 10)"), 2, places=10)
+        self.assertAlmostEqual(self.controller.process_input("log(e)"), 1, places=10)
+
+    def test_wrong_arity(self):
+        """Test that a wrong number of arguments is reported."""
+        self.assertTrue(self.controller.process_input("sqrt(4, 2)").startswith("Error"))
+        self.assertTrue(self.controller.process_input("power(2)").startswith("Error"))
+
+    def test_plugin_function(self):
+        """Test registering a new function on a controller."""
+        self.controller.register_function("hypot", math.hypot, arity=2)
+        self.assertEqual(self.controller.process_input("hypot(3, 4)"), 5)
+        self.assertEqual(self.controller.process_input("1 + hypot(3, 4)"), 6)
+        self.assertNotIn("hypot", default_registry)
+
+    def test_registration_invalidates_cache(self):
+        """Test that replacing a function drops stale compiled forms."""
+        self.controller.register_function("twice", lambda x: 2 * x)
+        self.assertEqual(self.controller.process_input("twice(2)"), 4)
+        self.controller.register_function("twice", lambda x: 3 * x)
+        self.assertEqual(self.controller.process_input("twice(2)"), 6)
+
+if __name__ == '__main__':
+    unittest.main()
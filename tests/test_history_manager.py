@@ -0,0 +1,156 @@
+"""
+Unit tests for the history manager.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from src.calculator.core.history_manager import DEFAULT_HISTORY_FILE, LEGACY_HISTORY_FILE, HistoryManager
+
+class TestHistoryManager(unittest.TestCase):
+    """Test cases for the append-only history log."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "history.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_lines(self):
+        with open(self.path) as f:
+            return f.read().splitlines()
+
+    def test_entries_are_appended(self):
+        """Test that each entry is one appended JSON line."""
+        with HistoryManager(self.path) as manager:
+            manager.add_entry("1+1", "2")
+            manager.add_entry("2*3", "6")
+        self.assertEqual([json.loads(line) for line in self.read_lines()], [["1+1", "2"], ["2*3", "6"]])
+
+    def test_reload(self):
+        """Test that history survives a new manager instance."""
+        with HistoryManager(self.path) as manager:
+            manager.add_entry("1+1", "2")
+        with HistoryManager(self.path) as manager:
+            self.assertEqual(manager.get_history(), [("1+1", "2")])
+
+    def test_truncated_last_line_is_recovered(self):
+        """Test recovery from a crash in the middle of a write."""
+        with open(self.path, "w") as f:
+            f.write('["1+1", "2"]\n["2*3", "6"]\n["4-', )
+        with HistoryManager(self.path) as manager:
+            self.assertEqual(manager.get_history(), [("1+1", "2"), ("2*3", "6")])
+            manager.add_entry("5+5", "10")
+        self.assertEqual(json.loads(self.read_lines()[-1]), ["5+5", "10"])
+        self.assertEqual(len(self.read_lines()), 3)
+
+    def test_legacy_json_file_is_migrated(self):
+        """Test loading a history file in the old single-list format."""
+        with open(self.path, "w") as f:
+            json.dump([["1+1", "2"]], f)
+        with HistoryManager(self.path) as manager:
+            self.assertEqual(manager.get_history(), [("1+1", "2")])
+        self.assertEqual(self.read_lines(), ['["1+1", "2"]'])
+
+    def test_legacy_default_file_is_migrated(self):
+        """Test that the old default history file is picked up by the new default log."""
+        with open(os.path.join(self.directory.name, LEGACY_HISTORY_FILE), "w") as f:
+            json.dump([["1+1", "2"], ["2*3", "6"]], f)
+        path = os.path.join(self.directory.name, DEFAULT_HISTORY_FILE)
+        with HistoryManager(path) as manager:
+            self.assertEqual(manager.get_history(), [("1+1", "2"), ("2*3", "6")])
+            manager.add_entry("4-1", "3")
+        with HistoryManager(path) as manager:
+            self.assertEqual(len(manager), 3)
+        # Other log names never pick up the legacy file
+        with HistoryManager(self.path) as manager:
+            self.assertEqual(len(manager), 0)
+
+    def test_clear_history(self):
+        """Test that clearing empties the log."""
+        with HistoryManager(self.path) as manager:
+            manager.add_entry("1+1", "2")
+            manager.clear_history()
+            self.assertEqual(manager.get_history(), [])
+        self.assertEqual(self.read_lines(), [])
+
+    def test_compaction_keeps_recent_entries(self):
+        """Test that a bounded history compacts the log."""
+        with HistoryManager(self.path, max_entries=5, sync_every=1) as manager:
+            for i in range(100):
+                manager.add_entry(f"{i}+0", str(i))
+        self.assertLess(len(self.read_lines()), 100)
+        with HistoryManager(self.path, max_entries=5) as manager:
+            self.assertEqual(manager.get_history(), [(f"{i}+0", str(i)) for i in range(95, 100)])
+
+    def test_slices_and_last(self):
+        """Test paged access without loading the full history."""
+        with HistoryManager(self.path) as manager:
+            for i in range(10):
+                manager.add_entry(f"{i}+0", str(i))
+            self.assertEqual(len(manager), 10)
+            self.assertEqual(manager.get_history(2, 4), [("2+0", "2"), ("3+0", "3")])
+            self.assertEqual(manager.last(2), [("8+0", "8"), ("9+0", "9")])
+            self.assertEqual(manager[-1], ("9+0", "9"))
+            self.assertEqual(manager[0:1], [("0+0", "0")])
+            with self.assertRaises(IndexError):
+                manager[10]
+
+    def test_unwritable_log_keeps_history_in_memory(self):
+        """Test that history survives in memory when the log cannot be written."""
+        directory = os.path.join(self.directory.name, "missing")
+        path = os.path.join(directory, "history.jsonl")
+        with HistoryManager(path, max_entries=2) as manager:
+            for i in range(3):
+                manager.add_entry(f"{i}+0", str(i))
+            self.assertEqual(manager.get_history(), [("1+0", "1"), ("2+0", "2")])
+            self.assertEqual(manager[-1], ("2+0", "2"))
+            os.mkdir(directory)
+            manager.save_history()
+            manager.add_entry("3+0", "3")
+        with HistoryManager(path) as manager:
+            self.assertEqual(manager.get_history(), [("1+0", "1"), ("2+0", "2"), ("3+0", "3")])
+
+    def test_partial_write_is_not_indexed(self):
+        """Test that a record cut off by a failed write is dropped from the log."""
+        manager = HistoryManager(self.path)
+        manager.add_entry("1+1", "2")
+        log = manager._file
+
+        class FailingFile:
+            def write(self, data):
+                log.write(data[:3])
+                log.flush()
+                raise OSError("No space left on device")
+
+            def __getattr__(self, name):
+                return getattr(log, name)
+
+        manager._file = FailingFile()
+        manager.add_entry("2*3", "6")
+        self.assertEqual(manager.get_history(), [("1+1", "2"), ("2*3", "6")])
+        manager.close()
+        self.assertEqual(self.read_lines(), ['["1+1", "2"]'])
+
+    def test_rewrites_use_private_temp_files(self):
+        """Test that compactions and saves running together leave a consistent log."""
+        with HistoryManager(self.path, max_entries=5, sync_every=1) as manager:
+            for i in range(200):
+                manager.add_entry(f"{i}+0", str(i))
+                if i % 7 == 0:
+                    manager.save_history()
+        self.assertEqual(os.listdir(self.directory.name), ["history.jsonl"])
+        with HistoryManager(self.path, max_entries=5) as manager:
+            self.assertEqual(manager.get_history(), [(f"{i}+0", str(i)) for i in range(195, 200)])
+
+    def test_garbled_record_is_skipped(self):
+        """Test that a corrupted record in the middle is ignored."""
+        with open(self.path, "w") as f:
+            f.write('["1+1", "2"]\n#garbage\n["2*3", "6"]\n')
+        with HistoryManager(self.path) as manager:
+            self.assertEqual(manager.get_history(), [("1+1", "2"), ("2*3", "6")])
+
+if __name__ == '__main__':
+    unittest.main()
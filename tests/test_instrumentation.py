@@ -0,0 +1,89 @@
+"""
+Unit tests for per-stage timing instrumentation.
+"""
+
+import io
+import time
+import unittest
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.instrumentation import Histogram, Instrumentation, STAGES
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the power-of-two histogram."""
+
+    def test_summary(self):
+        """Test counts, extremes and percentile estimates."""
+        histogram = Histogram()
+        for nanoseconds in range(1000, 101000, 1000):
+            histogram.record(nanoseconds)
+        stats = histogram.stats()
+        self.assertEqual(stats["count"], 100)
+        self.assertEqual((stats["min_us"], stats["max_us"]), (1.0, 100.0))
+        self.assertAlmostEqual(stats["mean_us"], 50.5)
+        # Estimates stay within a factor of two of the exact percentiles
+        self.assertTrue(25 <= stats["p50_us"] <= 100)
+        self.assertTrue(stats["p50_us"] <= stats["p90_us"] <= stats["p99_us"] <= 100)
+
+    def test_empty(self):
+        """Test a histogram without samples."""
+        self.assertEqual(Histogram().stats()["p99_us"], 0)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for controller instrumentation."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+
+    def run_inputs(self):
+        for expression in ("1 + 2", "sin(30) * 2", "1 + 2", "x = 4", "x * 2"):
+            self.controller.format_output(self.controller.process_input(expression))
+
+    def test_disabled_by_default(self):
+        """Test that nothing is recorded unless enabled."""
+        self.run_inputs()
+        self.assertIsNone(self.controller.instrumentation)
+        self.assertEqual(self.controller.timing_stats(), {})
+
+    def test_stages(self):
+        """Test that every stage is timed once enabled."""
+        self.controller.process_input("1 + 2")
+        self.controller.enable_instrumentation()
+        self.run_inputs()
+        stats = self.controller.timing_stats()
+        self.assertEqual(list(stats), list(STAGES))
+        # "1 + 2" is recompiled once: enabling clears the cache
+        self.assertEqual(stats["compile"]["count"], 4)
+        self.assertEqual(stats["evaluate"]["count"], 5)
+        self.assertEqual(stats["format"]["count"], 5)
+        self.assertIn("evaluate", self.controller.instrumentation.report())
+
+    def test_disable(self):
+        """Test that disabling stops recording."""
+        instrumentation = self.controller.enable_instrumentation()
+        self.run_inputs()
+        self.controller.disable_instrumentation()
+        self.run_inputs()
+        self.assertEqual(instrumentation.stats()["evaluate"]["count"], 5)
+
+    def test_periodic_dump(self):
+        """Test reports written from the background thread."""
+        output = io.StringIO()
+        instrumentation = self.controller.enable_instrumentation(dump_interval=0.01, output=output)
+        self.addCleanup(instrumentation.stop_dump)
+        self.run_inputs()
+        deadline = time.monotonic() + 2
+        while "evaluate" not in output.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIn("evaluate", output.getvalue())
+
+    def test_custom_stage(self):
+        """Test recording a stage outside the built-in ones."""
+        instrumentation = Instrumentation()
+        instrumentation.record("network", 5000)
+        self.assertEqual(instrumentation.stats()["network"]["max_us"], 5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
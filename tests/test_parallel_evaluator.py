@@ -0,0 +1,45 @@
+"""
+Unit tests for the process-pool parallel evaluator.
+"""
+
+import unittest
+from src.calculator.core.parallel_evaluator import ParallelEvaluator
+
+class TestParallelEvaluator(unittest.TestCase):
+    """Test cases for sharding expressions across worker processes."""
+
+    def test_in_process(self):
+        """Test evaluation without worker processes."""
+        with ParallelEvaluator(workers=1, chunk_size=4) as evaluator:
+            results = evaluator.evaluate(f"{i} * 2" for i in range(10))
+            self.assertEqual(results, [i * 2 for i in range(10)])
+            stats = list(evaluator.stats().values())
+            self.assertEqual(len(stats), 1)
+            self.assertEqual(stats[0].expressions, 10)
+            self.assertEqual(stats[0].chunks, 3)
+
+    def test_ordered(self):
+        """Test that results follow input order across workers."""
+        with ParallelEvaluator(workers=2, chunk_size=7) as evaluator:
+            self.assertEqual(evaluator.evaluate([f"{i} + 1" for i in range(50)]),
+                             [i + 1 for i in range(50)])
+            self.assertTrue(evaluator.evaluate(["1/0"])[0].startswith("Error"))
+
+    def test_unordered_with_indices(self):
+        """Test as-completed results carry their input index."""
+        with ParallelEvaluator(workers=2, chunk_size=5) as evaluator:
+            results = dict(evaluator.imap_unordered(f"{i} ^ 2" for i in range(30)))
+            self.assertEqual(results, {i: i ** 2 for i in range(30)})
+            stats = evaluator.stats()
+            self.assertEqual(sum(s.expressions for s in stats.values()), 30)
+            self.assertIn("expr/s", evaluator.report())
+
+    def test_invalid_configuration(self):
+        """Test rejected worker and chunk counts."""
+        with self.assertRaises(ValueError):
+            ParallelEvaluator(workers=0)
+        with self.assertRaises(ValueError):
+            ParallelEvaluator(chunk_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
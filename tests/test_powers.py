@@ -106,6 +106,17 @@ class TestPowers(unittest.TestCase):
         """Test cube function with invalid inputs."""
         with self.assertRaises(TypeError):
             cube("invalid")
+    
+    def test_square_and_cube_by_multiplication(self):
+        """Test that integer results are exact and float overflow still raises."""
+        self.assertEqual(square(10**20), 10**40)
+        self.assertIsInstance(cube(3), int)
+        self.assertEqual(cube(-3), -27)
+        with self.assertRaises(OverflowError):
+            square(1e200)
+        with self.assertRaises(OverflowError):
+            cube(-1e120)
+        self.assertEqual(square(math.inf), math.inf)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Unit tests for precision mode.
+"""
+
+import unittest
+from decimal import Decimal
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.precision import DECIMAL, INTEGER, RATIONAL
+
+
+class TestBackendSelection(unittest.TestCase):
+    """Test cases for choosing the cheapest exact backend."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+        self.controller.precision = 30
+        self.parser = self.controller.parser
+
+    def kind(self, expression, variables=()):
+        return self.parser.compile(expression, variables).kind
+
+    def test_structure(self):
+        """Test the backend chosen from the expression alone."""
+        self.assertEqual(self.kind("2^100 * 3 - x", ["x"]), INTEGER)
+        self.assertEqual(self.kind("0.1 + 0.2"), RATIONAL)
+        self.assertEqual(self.kind("1 / 3 + 2^-2"), RATIONAL)
+        self.assertEqual(self.kind("sqrt(2)"), DECIMAL)
+        self.assertEqual(self.kind("2 * pi"), DECIMAL)
+        self.assertEqual(self.kind("2^0.5"), DECIMAL)
+
+    def test_variable_values(self):
+        """Test that non-integer variable values move integer expressions to fractions."""
+        compiled = self.parser.compile("x * 3", ["x"])
+        self.assertEqual(compiled.backend({"x": 2}), INTEGER)
+        self.assertEqual(compiled.backend({"x": 0.1}), RATIONAL)
+        self.assertEqual(compiled.backend({"x": float("inf")}), DECIMAL)
+
+
+class TestPrecisionMode(unittest.TestCase):
+    """Test cases for evaluation in precision mode."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+        self.controller.precision = 40
+
+    def evaluate(self, expression):
+        return self.controller.process_input(expression)
+
+    def test_exact_decimals(self):
+        """Test decimal literals without binary rounding."""
+        self.assertEqual(self.evaluate("0.1 + 0.2"), Decimal("0.3"))
+        self.assertEqual(self.evaluate("1.1 * 1.1"), Decimal("1.21"))
+        self.assertEqual(self.evaluate("1.5 * 2"), 3)
+
+    def test_exact_integers_and_rationals(self):
+        """Test results that stay exact regardless of precision."""
+        self.assertEqual(self.evaluate("2^200 + 1"), 2 ** 200 + 1)
+        self.assertEqual(self.evaluate("factorial(30) / factorial(28)"), 870)
+        self.assertEqual(self.evaluate("(1/3) * 3"), 1)
+        self.assertEqual(self.evaluate("1/3"), Decimal("0." + "3" * 40))
+
+    def test_functions_at_precision(self):
+        """Test functions evaluated in decimal arithmetic."""
+        self.assertEqual(self.evaluate("sqrt(2)"),
+                         Decimal("1.414213562373095048801688724209698078570"))
+        self.assertEqual(self.evaluate("pi"), Decimal("3.141592653589793238462643383279502884197"))
+        self.assertEqual(self.evaluate("sin(30)"), Decimal("0.5"))
+        self.assertEqual(self.evaluate("cos(90)"), 0)
+        self.assertEqual(self.evaluate("log(8, 2)"), 3)
+        self.assertEqual(self.evaluate("cbrt(-27)"), -3)
+
+    def test_errors(self):
+        """Test that domain errors match float mode."""
+        self.assertIn("division by zero", self.evaluate("1 / 0"))
+        self.assertIn("Tangent is undefined", self.evaluate("tan(90)"))
+        self.assertIn("square root of negative", self.evaluate("sqrt(0 - 4)"))
+        self.assertIn("Result too large", self.evaluate("9^9^9"))
+        self.assertEqual(self.evaluate("exp(10000000)"), "Error: Invalid expression: Result too large")
+
+    def test_fraction_powers_are_guarded(self):
+        """Test that powers of fractions are checked against the digit limit."""
+        self.assertEqual(self.evaluate("(2/3)^-3"), Decimal("3.375"))
+        self.assertIn("Result too large", self.evaluate("(1/3)^300000"))
+
+    def test_variables_and_formulas(self):
+        """Test formulas over exact values."""
+        self.evaluate("price = 19.99")
+        self.evaluate("total = price * 3")
+        self.assertEqual(self.evaluate("total"), Decimal("59.97"))
+        self.evaluate("price = 0.01")
+        self.assertEqual(self.evaluate("total"), Decimal("0.03"))
+
+    def test_switching_modes(self):
+        """Test that leaving precision mode restores float evaluation."""
+        self.evaluate("x = 0.1")
+        self.evaluate("y = x + 0.2")
+        self.controller.precision = None
+        self.assertIsNone(self.controller.precision)
+        self.assertEqual(self.evaluate("0.1 + 0.2"), 0.1 + 0.2)
+        self.assertEqual(self.evaluate("y"), 0.1 + 0.2)
+        self.assertIsInstance(self.evaluate("x * 2"), float)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit tests for rational arithmetic in expressions.
+"""
+
+import unittest
+from src.calculator.core.calculator import CalculatorController
+
+
+class TestRationalArithmetic(unittest.TestCase):
+    """Test cases for exact integer division in the controller."""
+
+    def setUp(self):
+        self.controller = CalculatorController()
+        self.controller.rationals = True
+
+    def evaluate(self, expression):
+        return self.controller.format_output(self.controller.process_input(expression))
+
+    def test_exact_results(self):
+        """Test fractions that floats would round."""
+        self.assertEqual(self.evaluate("1/3 + 1/6"), "1/2")
+        self.assertEqual(self.evaluate("(1/3) * 3"), "1")
+        self.assertEqual(self.evaluate("(2/3)^3"), "8/27")
+        self.assertEqual(self.evaluate("2^(6/3)"), "4")
+        self.assertEqual(self.evaluate("square(1/3) + reciprocal(3/2)"), "7/9")
+
+    def test_floats_and_functions(self):
+        """Test that inexact operands and functions still give floats."""
+        self.assertEqual(self.controller.process_input("0.5 + 1/4"), 0.75)
+        self.assertEqual(self.controller.process_input("sqrt(1/4)"), 0.5)
+        self.assertEqual(self.controller.process_input("factorial(12/3)"), 24)
+        self.assertIn("division by zero", self.evaluate("1/0"))
+
+    def test_negative_powers(self):
+        """Test that integers raised to negative integers stay exact."""
+        self.assertEqual(self.evaluate("2^-1"), "1/2")
+        self.assertEqual(self.evaluate("(0-3)^-3 + 2^2"), "107/27")
+        self.assertEqual(self.evaluate("(1/2)^-2"), "4")
+        self.assertEqual(self.controller.process_input("2^0.5"), 2 ** 0.5)
+        self.assertIn("Result too large", self.evaluate("2^-(10^6)"))
+
+    def test_user_function_named_sum(self):
+        """Test that a registered sum() does not replace the rewrite's sum."""
+        self.controller.register_function("sum", lambda *args: 0, arity=(1, 8))
+        self.assertEqual(self.evaluate("1/2 + 1/3 + 1/6 + 1"), "2")
+        self.assertEqual(self.evaluate("sum(1, 2) + 1/2"), "1/2")
+
+    def test_long_sums(self):
+        """Test that long sums compile into one common-denominator sum."""
+        terms = " + ".join(f"1/{k}" for k in range(1, 21))
+        self.assertEqual(self.evaluate(terms), "55835135/15519504")
+        compiled = self.controller.parser.compile("a + b - c + d", ["a", "b", "c", "d"])
+        self.assertTrue(str(compiled.tree).startswith("$sum("))
+        self.controller.process_input("x = 1/7")
+        self.assertEqual(self.evaluate("x + x - x + 2*x + 3"), "24/7")
+
+    def test_variables_and_switching_off(self):
+        """Test rational variables and the return to floats."""
+        self.controller.process_input("x = 1/7")
+        self.controller.process_input("y = x * 7")
+        self.assertEqual(self.evaluate("y"), "1")
+        self.controller.rationals = False
+        self.assertEqual(self.controller.process_input("1/4"), 0.25)
+        self.assertIsInstance(self.controller.process_input("x"), float)
+
+
+if __name__ == '__main__':
+    unittest.main()
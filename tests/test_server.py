@@ -0,0 +1,212 @@
+"""
+Unit tests for the JSON evaluation server.
+"""
+
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from src.calculator.server import EvaluationServer, UnixEvaluationServer
+
+
+class UnixConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket"""
+
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+class ServerTestCase(unittest.TestCase):
+    """Starts a server in a background thread for each test."""
+
+    def make_server(self):
+        return EvaluationServer(("127.0.0.1", 0))
+
+    def connect(self):
+        return http.client.HTTPConnection("127.0.0.1", self.server.server_port)
+
+    def setUp(self):
+        self.server = self.make_server()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.connection = self.connect()
+        self.addCleanup(self.connection.close)
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload)
+        self.connection.request(method, path, body, {"Content-Type": "application/json"})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+
+class TestEvaluationServer(ServerTestCase):
+    """Test cases for the TCP server."""
+
+    def test_single_expression(self):
+        """Test evaluating one expression."""
+        self.assertEqual(self.request("POST", "/evaluate", {"expression": "2 + 3"}),
+                         (200, {"result": 5}))
+
+    def test_batch(self):
+        """Test that batch results follow input order and report errors per entry."""
+        status, response = self.request("POST", "/evaluate",
+                                        {"expressions": ["sqrt(16)", "5 / 0", "x = 4", "x * 2"]})
+        self.assertEqual(status, 200)
+        results = response["results"]
+        self.assertEqual(results[0], {"result": 4.0})
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2:], [{"result": 4}, {"result": 8}])
+
+    def test_connection_is_reused(self):
+        """Test that many requests share one keep-alive connection."""
+        for i in range(20):
+            self.assertEqual(self.request("POST", "/evaluate", {"expression": f"{i} * 2"}),
+                             (200, {"result": i * 2}))
+        self.assertEqual(self.request("GET", "/stats")[1]["connections"], 1)
+
+    def test_pipelined_requests(self):
+        """Test requests written back to back before any response is read."""
+        raw = b""
+        for expression in ("1 + 1", "2 + 2", "3 + 3"):
+            body = json.dumps({"expression": expression}).encode()
+            raw += (b"POST /evaluate HTTP/1.1\r\nHost: localhost\r\n"
+                    b"Content-Length: %d\r\n\r\n" % len(body)) + body
+        with socket.create_connection(("127.0.0.1", self.server.server_port)) as sock:
+            sock.sendall(raw)
+            stream = sock.makefile("rb")
+            results = []
+            for _ in range(3):
+                self.assertIn(b" 200 ", stream.readline())
+                headers = http.client.parse_headers(stream)
+                body = stream.read(int(headers["Content-Length"]))
+                results.append(json.loads(body)["result"])
+        self.assertEqual(results, [2, 4, 6])
+
+    def test_cache_shared_across_connections(self):
+        """Test that a second connection hits the cache filled by the first."""
+        self.request("POST", "/evaluate", {"expression": "sin(30) + 1"})
+        other = self.connect()
+        self.addCleanup(other.close)
+        other.request("POST", "/evaluate", json.dumps({"expression": "sin(30) + 1"}))
+        self.assertEqual(json.loads(other.getresponse().read()), {"result": 1.5})
+        self.assertEqual(self.server.service.compiled_cache.stats()["hits"], 1)
+
+    def test_sessions_are_isolated(self):
+        """Test that variables and ans are private to each connection."""
+        other = self.connect()
+        self.addCleanup(other.close)
+
+        def evaluate(connection, expression):
+            connection.request("POST", "/evaluate", json.dumps({"expression": expression}))
+            return json.loads(connection.getresponse().read())
+
+        self.assertEqual(evaluate(self.connection, "x = 5"), {"result": 5})
+        self.assertEqual(evaluate(other, "x = 7"), {"result": 7})
+        self.assertEqual(evaluate(other, "10 * 10"), {"result": 100})
+        self.assertEqual(evaluate(self.connection, "x * 2"), {"result": 10})
+        self.assertEqual(evaluate(self.connection, "ans + 1"), {"result": 11})
+        self.assertEqual(evaluate(other, "ans + x"), {"result": 107})
+
+    def test_stats(self):
+        """Test request, expression and latency statistics."""
+        self.request("POST", "/evaluate", {"expressions": ["1", "2", "1/0"]})
+        status, stats = self.request("GET", "/stats")
+        self.assertEqual(status, 200)
+        self.assertEqual((stats["requests"], stats["expressions"], stats["errors"]), (1, 3, 1))
+        self.assertIn("p99", stats["latency_ms"])
+        self.assertIn("hits", stats["cache"])
+
+    def test_stage_timings(self):
+        """Test that per-stage timings appear in /stats once enabled."""
+        self.assertNotIn("stages", self.request("GET", "/stats")[1])
+        self.server.service.controller.enable_instrumentation()
+        self.request("POST", "/evaluate", {"expression": "2 * 3"})
+        stages = self.request("GET", "/stats")[1]["stages"]
+        self.assertEqual(stages["evaluate"]["count"], 1)
+
+    def test_bad_requests(self):
+        """Test error responses that keep the connection usable."""
+        self.assertEqual(self.request("POST", "/evaluate", {"expr": "1"})[0], 400)
+        self.connection.request("POST", "/evaluate", "not json")
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 400)
+        response.read()
+        self.assertEqual(self.request("POST", "/other", {"expression": "1"})[0], 404)
+        self.assertEqual(self.request("GET", "/")[0], 404)
+        self.assertEqual(self.request("POST", "/evaluate", {"expression": "1 + 1"}),
+                         (200, {"result": 2}))
+
+    def test_negative_content_length(self):
+        """Test that a negative body length is rejected instead of read."""
+        for path in ("/evaluate", "/other"):
+            connection = self.connect()
+            self.addCleanup(connection.close)
+            connection.putrequest("POST", path)
+            connection.putheader("Content-Length", "-1")
+            connection.endheaders()
+            response = connection.getresponse()
+            self.assertEqual((response.status, json.loads(response.read())),
+                             (400, {"error": "Invalid Content-Length"}))
+
+    def test_unencodable_result(self):
+        """Test a result with more digits than JSON encoding allows."""
+        self.assertEqual(self.request("POST", "/evaluate", {"expression": "factorial(3000)"}),
+                         (200, {"result": "4.149359603e+9130"}))
+        self.assertEqual(self.request("POST", "/evaluate", {"expression": "1e400"}),
+                         (200, {"error": "Result cannot be represented in JSON"}))
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets not available")
+class TestUnixEvaluationServer(ServerTestCase):
+    """Test cases for the Unix domain socket server."""
+
+    def make_server(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        return UnixEvaluationServer(os.path.join(directory, "calc.sock"))
+
+    def connect(self):
+        return UnixConnection(self.server.server_address)
+
+    def test_requests_over_one_connection(self):
+        """Test keep-alive requests over a Unix socket."""
+        self.assertEqual(self.request("POST", "/evaluate", {"expression": "2 ** 10"}),
+                         (200, {"result": 1024}))
+        self.assertEqual(self.request("POST", "/evaluate", {"expressions": ["ans + 1"]}),
+                         (200, {"results": [{"result": 1025}]}))
+
+    def test_refuses_to_replace_other_files(self):
+        """Test that only a stale socket at the path is removed."""
+        with tempfile.NamedTemporaryFile() as existing:
+            with self.assertRaises(FileExistsError):
+                UnixEvaluationServer(existing.name)
+            self.assertTrue(os.path.exists(existing.name))
+        path = self.server.server_address
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(stale.close)
+        os.remove(path)
+        stale.bind(path)
+        UnixEvaluationServer(path).server_close()
+        self.assertFalse(os.path.exists(path))
+
+    def test_socket_removed_on_close(self):
+        """Test that closing the server removes the socket file."""
+        path = self.server.server_address
+        self.assertTrue(os.path.exists(path))
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ Unit tests for the trigonometry module.
 
 import unittest
 import math
+import threading
 from src.calculator.modules.trigonometry import *
 
 class TestTrigonometry(unittest.TestCase):
@@ -123,6 +124,76 @@ class TestTrigonometry(unittest.TestCase):
             cosh("invalid")
         with self.assertRaises(TypeError):
             tanh("invalid")
+    
+    def test_exact_special_angles(self):
+        """Test exact results at multiples of 30 and 45 degrees."""
+        self.assertEqual(sin(180, degrees=True), 0)
+        self.assertEqual(sin(30, degrees=True), 0.5)
+        self.assertEqual(sin(-150, degrees=True), -0.5)
+        self.assertEqual(cos(90, degrees=True), 0)
+        self.assertEqual(cos(420, degrees=True), 0.5)
+        self.assertEqual(tan(45, degrees=True), 1)
+        self.assertEqual(tan(-135.0, degrees=True), 1)
+        self.assertEqual(str(cos(270, degrees=True)), "0.0")
+        with self.assertRaises(ValueError):
+            tan(-270, degrees=True)
+    
+    def test_degree_reduction(self):
+        """Test that large and fractional angles are reduced exactly modulo 360."""
+        self.assertEqual(sin(360 * 10**30 + 30, degrees=True), 0.5)
+        self.assertEqual(sin(3600.5, degrees=True), sin(0.5, degrees=True))
+        self.assertAlmostEqual(sin(89.9, degrees=True), math.sin(math.radians(89.9)), places=15)
+        self.assertAlmostEqual(tan(1e-300, degrees=True), math.radians(1e-300))
+        with self.assertRaises(ValueError):
+            sin(math.inf, degrees=True)
+    
+    def test_gradians(self):
+        """Test angles in gradians, exact at multiples of 50."""
+        self.assertEqual(sin(100, gradians=True), 1)
+        self.assertEqual(cos(200, gradians=True), -1)
+        self.assertEqual(sin(-250, gradians=True), math.sqrt(0.5))
+        self.assertAlmostEqual(sin(33, gradians=True), math.sin(33 * math.pi / 200), places=15)
+        with self.assertRaises(ValueError):
+            tan(300, gradians=True)
+    
+    def test_inverse_functions_in_angle_units(self):
+        """Test that inverse functions return the unit their inputs came in."""
+        for angle in (0, 30, 45, 60, 90, -30, -90):
+            self.assertEqual(asin(sin(angle, degrees=True), degrees=True), angle)
+        for angle in (0, 30, 90, 120, 180):
+            self.assertEqual(acos(cos(angle, degrees=True), degrees=True), angle)
+        for angle in (30, 45, 60, -45):
+            self.assertEqual(atan(tan(angle, degrees=True), degrees=True), angle)
+        self.assertEqual(asin(1, gradians=True), 100)
+        self.assertEqual(acos(-1, gradians=True), 200)
+        self.assertAlmostEqual(asin(0.3, degrees=True), math.degrees(math.asin(0.3)), places=12)
+        self.assertEqual(atan(math.inf, degrees=True), 90)
+        self.assertEqual(asin(1), math.pi / 2)
+    
+    def test_reduction_cache(self):
+        """Test that repeated angles reuse their reduction."""
+        reductions = AngleReductions(maxsize=2)
+        self.assertEqual(reductions.get(30), reductions.get(390))
+        reductions.get(30)
+        reductions.get(45)
+        self.assertEqual(reductions.stats(), {"size": 2, "maxsize": 2, "hits": 1,
+                                              "misses": 3, "evictions": 1})
+    
+    def test_reduction_cache_threads(self):
+        """Test that threads sharing a memo keep it consistent."""
+        reductions = AngleReductions(maxsize=8)
+        def work(start):
+            for i in range(2000):
+                reductions.get((start + i) % 50)
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = reductions.stats()
+        self.assertEqual(stats["size"], 8)
+        self.assertEqual(stats["hits"] + stats["misses"], 8000)
+        self.assertEqual(reductions.get(30), reductions._reduce(30))
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
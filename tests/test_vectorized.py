@@ -0,0 +1,99 @@
+"""
+Unit tests for vectorized batch evaluation.
+"""
+
+import unittest
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.calculator.core.calculator import CalculatorController
+from src.calculator.core.vectorized import compile_vectorized, OK, DOMAIN_ERROR, DIVISION_BY_ZERO, OVERFLOW
+from src.calculator.modules.trigonometry import sin, cos
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestVectorized(unittest.TestCase):
+    """Test cases for evaluating expressions over arrays."""
+
+    def test_matches_scalar_formula(self):
+        """Test a formula against element-wise math evaluation."""
+        x = np.linspace(0, 100, 11)
+        result = compile_vectorized("sin(x)*exp(-x/10)", ["x"]).evaluate(x=x)
+        expected = [math.sin(math.radians(v)) * math.exp(-v / 10) for v in x]
+        np.testing.assert_allclose(result.values, expected)
+        self.assertEqual(result.error_count, 0)
+
+    def test_exact_special_angles(self):
+        """Test that degree trigonometry matches the scalar functions."""
+        x = np.array([0, 30, 90, 180, 270, -150, 1e20])
+        result = compile_vectorized("sin(x) + cos(x)", ["x"]).evaluate(x=x)
+        expected = [sin(v, degrees=True) + cos(v, degrees=True) for v in x]
+        np.testing.assert_array_equal(result.values, expected)
+        result = compile_vectorized("tan(x)", ["x"]).evaluate(x=x)
+        self.assertEqual(list(result.errors), [0, 0, 1, 0, 1, 0, 0])
+
+    def test_multiple_variables_broadcast(self):
+        """Test broadcasting between several named arrays."""
+        result = compile_vectorized("a * b + 1", ["a", "b"]).evaluate(a=np.array([1, 2, 3]), b=2)
+        np.testing.assert_allclose(result.values, [3, 5, 7])
+
+    def test_domain_errors_are_masked(self):
+        """Test that domain errors become per-element codes instead of exceptions."""
+        x = np.array([4.0, -1.0, 0.0])
+        result = compile_vectorized("sqrt(x) + 1/x", ["x"]).evaluate(x=x)
+        self.assertEqual(result.errors.tolist(), [OK, DOMAIN_ERROR, DIVISION_BY_ZERO])
+        self.assertEqual(result.mask.tolist(), [False, True, True])
+        self.assertAlmostEqual(result.values[0], 2.25)
+        self.assertTrue(np.isnan(result.values[1]))
+
+    def test_infinite_angles(self):
+        """Test that infinite angles are domain errors, as in scalar evaluation."""
+        x = np.array([math.inf, -math.inf, math.nan, 30.0])
+        for degrees in (True, False):
+            for function in ("sin", "cos", "tan"):
+                result = compile_vectorized(f"{function}(x)", ["x"], degrees=degrees).evaluate(x=x)
+                self.assertEqual(result.errors.tolist(), [DOMAIN_ERROR, DOMAIN_ERROR, OK, OK])
+
+    def test_logarithm_and_overflow(self):
+        """Test logarithm domain and overflow flags."""
+        result = compile_vectorized("ln(x) + exp(x)", ["x"]).evaluate(x=np.array([1.0, -2.0, 1000.0]))
+        self.assertEqual(result.errors.tolist(), [OK, DOMAIN_ERROR, OVERFLOW])
+
+    def test_multi_argument_functions(self):
+        """Test power and log with two arguments."""
+        result = compile_vectorized("power(x, 2) + log(x, 10)", ["x"]).evaluate(x=np.array([10.0, 100.0]))
+        np.testing.assert_allclose(result.values, [101, 10002])
+
+    def test_wrong_number_of_arguments(self):
+        """Test that function arity is checked when compiling."""
+        for expression in ("sin(x, 5)", "sqrt(x, 2)", "power(x)", "log(x, 2, 3)"):
+            for degrees in (True, False):
+                with self.assertRaises(ValueError):
+                    compile_vectorized(expression, ["x"], degrees=degrees)
+
+    def test_arithmetic_overflow(self):
+        """Test that arithmetic overflowing to infinity is flagged."""
+        x = np.array([2.0, 1e200, np.inf])
+        for expression in ("x * x", "square(x)", "cube(x)", "x * 1e200 + x", "x / 1e-200"):
+            result = compile_vectorized(expression, ["x"]).evaluate(x=x)
+            self.assertEqual(result.errors.tolist(), [OK, OVERFLOW, OK], expression)
+
+    def test_missing_variable(self):
+        """Test that a missing variable is reported."""
+        with self.assertRaises(ValueError):
+            compile_vectorized("x + y", ["x", "y"]).evaluate(x=np.array([1.0]))
+
+    def test_controller_caches_batch(self):
+        """Test the controller entry point and its compiled cache."""
+        controller = CalculatorController()
+        x = np.arange(5, dtype=float)
+        controller.evaluate_batch("x^2", x=x)
+        result = controller.evaluate_batch("x^2", x=x)
+        np.testing.assert_allclose(result.values, x ** 2)
+        self.assertEqual(controller.cache_stats()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()